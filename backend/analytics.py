@@ -0,0 +1,228 @@
+"""Client analytics for generated case studies: meta sections, takeaways, sentiment and satisfaction.
+
+The VADER analyzer is created once per process (loading its lexicon from disk is the slow part)
+and all regular expressions are compiled at import, so analysing a summary is pure CPU work that
+can be benchmarked on its own:
+
+    cd backend && python analytics.py client_transcripts/*.txt
+"""
+import re
+import threading
+import time
+
+import lexicon
+import llm_client
+
+# Meta sections the full case study prompt asks for, moved out of the main story
+CONFLICT_PATTERN = re.compile(
+    r"(?:\*\*|__)?Corrected\s*&\s*Conflicted Replies(?:\*\*|__)?\s*[\r\n]+(.*?)(?=(?:\*\*|__)?Quotes? Highlights(?:\*\*|__)?|$)",
+    re.IGNORECASE | re.DOTALL
+)
+QUOTES_PATTERN = re.compile(
+    r"(?:\*\*|__)?Quotes? Highlights(?:\*\*|__)?\s*[\r\n\-:]*([\s\S]*?)(?=(?:\*\*|__)?[A-Z][^:]*:|$)",
+    re.IGNORECASE | re.DOTALL
+)
+# Fallbacks when there is no Quote Highlights section: - **Client:** "..." lines, then any quoted text
+BLOCKQUOTE_PATTERN = re.compile(r'- \*\*(Client|Provider)\*\*:\s*["""]([\s\S]*?)["""]')
+QUOTED_PATTERN = re.compile(r'["""]([\s\S]*?)["""]')
+
+NO_SATISFACTION_STATEMENT = "No explicit satisfaction statement found."
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer():
+    """Return the process-wide VADER analyzer, loading its lexicon on first use."""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+                _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def draft_quote_from_summary(summary, speaker="Client"):
+    # Simple template-based fallback when the case study has no quotes at all
+    return f"As a {speaker.lower()}, I can say this project made a real difference for us. We're very happy with the results."
+
+
+def split_metadata_sections(text, client_summary=None):
+    """Move the Corrected & Conflicted Replies and Quote Highlights sections out of the story.
+
+    Returns ``(main_story, meta_data)`` with ``corrected_conflicts`` and ``quote_highlights``.
+    """
+    conflict_match = CONFLICT_PATTERN.search(text)
+    quotes_match = QUOTES_PATTERN.search(text)
+    corrected_conflicts = conflict_match.group(1).strip() if conflict_match else ""
+    quote_highlights = quotes_match.group(1).strip() if quotes_match else ""
+
+    if not quote_highlights:
+        blockquote_lines = BLOCKQUOTE_PATTERN.findall(text)
+        if blockquote_lines:
+            quote_highlights = "\n".join(f'- **{who}:** "{q.strip()}"' for who, q in blockquote_lines)
+        else:
+            multiline_quotes = QUOTED_PATTERN.findall(text)
+            if multiline_quotes:
+                quote_highlights = "\n".join(f'- "{q.strip()}"' for q in multiline_quotes)
+            elif client_summary:
+                drafted = draft_quote_from_summary(client_summary, speaker="Client")
+                quote_highlights = f'- "{drafted}"'
+
+    text = CONFLICT_PATTERN.sub("", text)
+    text = QUOTES_PATTERN.sub("", text)
+
+    return text.strip(), {
+        "corrected_conflicts": corrected_conflicts,
+        "quote_highlights": quote_highlights,
+    }
+
+
+def extract_client_takeaways(client_summary, model=llm_client.DEFAULT_MODEL):
+    """Extract key takeaways from the client interview summary with the LLM."""
+    try:
+        prompt = f"""
+        Analyze the following client interview summary and extract the 3-5 most important key takeaways.
+        Focus on:
+        - Main pain points or challenges they faced
+        - Most valued aspects of the solution
+        - Key benefits or improvements they experienced
+        - Their overall satisfaction level
+        - Any specific metrics or results they mentioned
+
+        Format the response as a bullet-point list.
+
+        Client Summary:
+        {client_summary}
+        """
+
+        result = llm_client.chat(
+            [{"role": "system", "content": prompt}],
+            model=model,
+            temperature=0.3,
+            max_tokens=500
+        )
+        return result["content"].strip()
+    except Exception as e:
+        print(f"Error extracting client takeaways: {str(e)}")
+        return "Unable to extract key takeaways."
+
+
+def extract_client_satisfaction(client_summary, language=None):
+    """Classify client satisfaction with the weighted lexicon for the summary's language.
+
+    Returns ``category``, the 0-10 ``score`` (0 when no phrase matched), the ``statement``
+    sentence that supports the category and the strongest matched phrases as ``key_factors``.
+    """
+    category, score, statement, hits = lexicon.get_matcher(language).classify(client_summary)
+    key_factors = []
+    for hit in sorted(hits, key=lambda hit: hit.strength, reverse=True):
+        phrase = hit.phrase.lower()
+        if phrase not in key_factors:
+            key_factors.append(phrase)
+    return {
+        "category": category,
+        "score": score or 0,
+        "statement": statement or NO_SATISFACTION_STATEMENT,
+        "key_factors": key_factors[:5]
+    }
+
+
+def fallback_analysis():
+    """Sentiment result used when the analysis fails."""
+    return {
+        "overall_sentiment": {
+            "sentiment": "unknown",
+            "confidence": 0,
+            "score": 0
+        },
+        "emotional_analysis": {
+            "primary_emotion": "unknown",
+            "secondary_emotions": [],
+            "emotional_intensity": 0
+        },
+        "key_points": {
+            "positive": [],
+            "negative": []
+        },
+        "metrics": [],
+        "satisfaction": {
+            "score": 0,
+            "confidence": 0,
+            "key_factors": [],
+            "statement": NO_SATISFACTION_STATEMENT
+        },
+        "visualizations": {}
+    }
+
+
+def analyze_sentiment(client_summary, language=None):
+    """VADER sentiment plus lexicon satisfaction for one client summary.
+
+    ``visualizations`` is left empty; the chart and gauge are rendered separately.
+    """
+    try:
+        scores = get_analyzer().polarity_scores(client_summary)
+        compound = scores['compound']
+        if compound >= 0.05:
+            sentiment = "positive"
+        elif compound <= -0.05:
+            sentiment = "negative"
+        else:
+            sentiment = "neutral"
+
+        satisfaction_info = extract_client_satisfaction(client_summary, language)
+        return {
+            "overall_sentiment": {
+                "sentiment": sentiment,
+                "confidence": abs(compound),
+                "score": round((compound + 1) * 5, 2)  # scale -1..1 to 0..10
+            },
+            "emotional_analysis": {
+                "primary_emotion": sentiment,
+                "secondary_emotions": [],
+                "emotional_intensity": max(scores['pos'], scores['neg'])
+            },
+            "key_points": {
+                "positive": [],
+                "negative": []
+            },
+            "metrics": [],
+            "satisfaction": {
+                "score": satisfaction_info["score"],
+                "confidence": abs(compound),
+                "key_factors": satisfaction_info["key_factors"],
+                "statement": satisfaction_info["statement"],
+                "category": satisfaction_info["category"]
+            },
+            "visualizations": {}
+        }
+    except Exception as e:
+        print(f"Error in sentiment analysis: {str(e)}")
+        return fallback_analysis()
+
+
+def analyze_many(summaries, language=None):
+    """Analyse a batch of client summaries with the shared analyzer; returns results in order."""
+    return [analyze_sentiment(summary, language) if summary else fallback_analysis() for summary in summaries]
+
+
+if __name__ == "__main__":
+    import sys
+
+    texts = [open(path, encoding="utf-8").read() for path in sys.argv[1:]]
+    if not texts:
+        sys.exit("Usage: python analytics.py FILE [FILE ...]")
+
+    started = time.perf_counter()
+    get_analyzer()
+    loaded = time.perf_counter()
+    results = analyze_many(texts)
+    finished = time.perf_counter()
+    print(f"Lexicon load: {(loaded - started) * 1000:.1f} ms")
+    print(f"Analysed {len(results)} summaries in {(finished - loaded) * 1000:.1f} ms "
+          f"({(finished - loaded) * 1000 / len(results):.2f} ms each)")
+    for path, result in zip(sys.argv[1:], results):
+        print(f"  {path}: {result['overall_sentiment']['sentiment']} "
+              f"({result['overall_sentiment']['score']}), {result['satisfaction']['category']}")
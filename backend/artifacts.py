@@ -0,0 +1,105 @@
+"""Memoised sentiment chart and satisfaction gauge artifacts.
+
+There are only five satisfaction categories, and the sentiment chart is drawn for a quantised
+score bucket, so every possible artifact can be rendered once and reused. Charts are written to
+``generated_artifacts/`` under a name derived from the style version and bucket, which makes
+their ``/artifacts/...`` URLs stable and immutable. Pre-render all of them at build time with:
+
+    cd backend && python artifacts.py
+
+With ``CHART_RENDERER=svg`` the charts come from ``svg_charts`` instead and are stored inline in
+``meta_data_text`` (the chart as a ``data:`` URI), so matplotlib and plotly are never loaded.
+"""
+import functools
+import os
+import threading
+
+import renderers
+import svg_charts
+
+CHART_RENDERER = os.getenv("CHART_RENDERER", "raster").lower()  # "raster" (matplotlib/plotly) or "svg"
+# Stage kind for chart lookups: rasterising is CPU work, building an SVG template is not
+STAGE_KIND = "io" if CHART_RENDERER == "svg" else "cpu"
+
+ARTIFACT_DIR = "generated_artifacts"
+# Bump when the chart or gauge style changes so browsers never keep a stale immutable copy
+ARTIFACT_VERSION = "v1"
+SENTIMENT_CHART_BUCKET = float(os.getenv("SENTIMENT_CHART_BUCKET", "0.5"))  # score step on the 0-10 scale
+
+SATISFACTION_CATEGORIES = ["Very Bad", "Bad", "Neutral", "Good", "Very Good"]
+
+_rendered = set()
+_rendered_lock = threading.Lock()
+
+
+def score_bucket(score):
+    """Clamp a 0-10 sentiment score and round it to the nearest chart bucket."""
+    score = min(max(float(score), 0.0), 10.0)
+    return round(round(score / SENTIMENT_CHART_BUCKET) * SENTIMENT_CHART_BUCKET, 2)
+
+
+def chart_filename(bucket):
+    return f"sentiment_chart_{ARTIFACT_VERSION}_{int(round(bucket * 100)):04d}.png"
+
+
+def sentiment_chart_url(score):
+    """Return the URL of the chart for this score's bucket, rendering it on first use."""
+    filename = chart_filename(score_bucket(score))
+    if filename not in _rendered:
+        with _rendered_lock:
+            if filename not in _rendered:
+                if not os.path.exists(os.path.join(ARTIFACT_DIR, filename)):
+                    renderers.generate_sentiment_chart(score_bucket(score), ARTIFACT_DIR, filename=filename)
+                _rendered.add(filename)
+    return f"/artifacts/{filename}"
+
+
+@functools.lru_cache(maxsize=None)
+def satisfaction_gauge(category):
+    """Plotly gauge JSON for a satisfaction category, built once per process."""
+    return renderers.generate_client_satisfaction_gauge(category)
+
+
+@functools.lru_cache(maxsize=None)
+def _svg_chart_src(bucket):
+    return svg_charts.data_uri(svg_charts.sentiment_bar(bucket))
+
+
+def sentiment_chart_src(score):
+    """``<img src>`` for the sentiment chart with the configured renderer."""
+    if CHART_RENDERER == "svg":
+        return _svg_chart_src(score_bucket(score))
+    return sentiment_chart_url(score)
+
+
+@functools.lru_cache(maxsize=None)
+def _svg_gauge(category):
+    return svg_charts.satisfaction_gauge(category)
+
+
+def satisfaction_visualization(category):
+    """Gauge entry for ``visualizations``: ``client_satisfaction_gauge`` (plotly JSON) or
+    ``client_satisfaction_gauge_svg`` with the configured renderer."""
+    if CHART_RENDERER == "svg":
+        return {"client_satisfaction_gauge_svg": _svg_gauge(category)}
+    return {"client_satisfaction_gauge": satisfaction_gauge(category)}
+
+
+def chart_buckets():
+    steps = int(round(10 / SENTIMENT_CHART_BUCKET))
+    return [score_bucket(i * SENTIMENT_CHART_BUCKET) for i in range(steps + 1)]
+
+
+def pregenerate():
+    """Render every raster chart bucket and gauge; returns the number of charts on disk."""
+    if CHART_RENDERER == "svg":
+        return 0
+    for bucket in chart_buckets():
+        sentiment_chart_url(bucket)
+    for category in SATISFACTION_CATEGORIES:
+        satisfaction_gauge(category)
+    return len(_rendered)
+
+
+if __name__ == "__main__":
+    print(f"🖼️ {pregenerate()} sentiment charts ready in {ARTIFACT_DIR}/")
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, update
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -20,13 +20,42 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create Base class
 # Create Base class
-from models import Base
+from models import Base, CaseStudy, Label, User
 
 
+@event.listens_for(SessionLocal, "after_flush")
+def bump_user_data_version(session, flush_context):
+    """Increment ``User.data_version`` for dashboard changes that no ``updated_at`` reveals.
+
+    Edits of a case study move its ``updated_at`` and media job progress moves the job's, and
+    the dashboard ETags already include both maxima. Only added or deleted case studies, label
+    changes and user changes bump the version, so background writes never touch ``users``.
+    """
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, CaseStudy):
+            if obj in session.dirty and not inspect(obj).attrs.labels.history.has_changes():
+                continue
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, Label):
+            user_ids.add(obj.user_id)
+        elif isinstance(obj, User):
+            user_ids.add(obj.id)
+    user_ids.discard(None)
+    if user_ids:
+        session.connection().execute(
+            update(User.__table__)
+            .where(User.__table__.c.id.in_(user_ids))
+            .values(data_version=User.__table__.c.data_version + 1)
+        )
+
 
 def init_db():
-    """Initialize the database by creating all tables."""
-    Base.metadata.create_all(bind=engine)
+    """Create or upgrade the schema to the latest migration (see migrations.py)."""
+    import migrations
+    migrations.upgrade(engine)
 
 def get_db():
     """Get database session."""
@@ -0,0 +1,57 @@
+"""Alembic environment for `flask db ...` and for migrations.upgrade() at boot.
+
+The models use a plain declarative Base rather than Flask-SQLAlchemy, so the metadata and the
+engine come straight from models.py and db.py. migrations.upgrade() passes its own connection in
+``config.attributes["connection"]`` so the whole upgrade runs inside its lock.
+"""
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Base  # noqa: E402
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def configure(**kwargs):
+    context.configure(target_metadata=target_metadata, compare_type=True, **kwargs)
+
+
+def run_migrations_offline():
+    """Emit the SQL instead of running it (``flask db upgrade --sql``)."""
+    from db import DATABASE_URL
+    configure(url=DATABASE_URL, literal_binds=True, dialect_opts={"paramstyle": "named"})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection):
+    # SQLite cannot ALTER most things in place; batch mode recreates the table instead
+    configure(connection=connection, render_as_batch=connection.dialect.name == "sqlite")
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    # Started from the CLI: use alembic.ini's logging and a connection of our own
+    if config.config_file_name:
+        fileConfig(config.config_file_name, disable_existing_loggers=False)
+    from db import engine
+    with engine.connect() as connection:
+        run_migrations(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,187 @@
+"""Baseline: the schema as it was created by create_all and the pre-Alembic boot upgrades
+
+Databases that existed before Alembic are brought to this schema by migrations.upgrade() and
+stamped with this revision instead of running it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade(tables=None):
+    """Create the baseline schema.
+
+    ``tables`` limits it to those tables and their indexes: migrations.upgrade_legacy() uses it
+    to add the tables a pre-Alembic database is missing, as they were at this revision.
+    """
+    def wanted(name):
+        return tables is None or name in tables
+
+    if wanted('users'):
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('first_name', sa.String(100), nullable=False),
+            sa.Column('last_name', sa.String(100), nullable=False),
+            sa.Column('email', sa.String(255), nullable=False, unique=True),
+            sa.Column('password_hash', sa.String(255), nullable=False),
+            sa.Column('company_name', sa.String(255)),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('last_login', sa.DateTime(timezone=True)),
+            sa.Column('failed_login_attempts', sa.Integer()),
+            sa.Column('account_locked_until', sa.DateTime(timezone=True)),
+            sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'),
+        )
+
+    if wanted('case_studies'):
+        op.create_table(
+            'case_studies',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('title', sa.String(200)),
+            sa.Column('final_summary', sa.Text()),
+            sa.Column('final_summary_pdf_path', sa.String(500)),
+            sa.Column('meta_data_text', sa.Text()),
+            sa.Column('linkedin_post', sa.Text()),
+            sa.Column('provider_name', sa.String(255)),
+            sa.Column('client_name', sa.String(255)),
+            sa.Column('project_name', sa.String(255)),
+            sa.Column('language', sa.String(32)),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('video_id', sa.String(100)),
+            sa.Column('video_url', sa.Text()),
+            sa.Column('video_status', sa.String(50)),
+            sa.Column('video_created_at', sa.DateTime(timezone=True)),
+            sa.Column('pictory_storyboard_id', sa.String(100)),
+            sa.Column('pictory_render_id', sa.String(100)),
+            sa.Column('pictory_video_url', sa.Text()),
+            sa.Column('pictory_video_status', sa.String(50)),
+            sa.Column('pictory_video_created_at', sa.DateTime(timezone=True)),
+            sa.Column('podcast_job_id', sa.String(100)),
+            sa.Column('podcast_url', sa.Text()),
+            sa.Column('podcast_status', sa.String(50)),
+            sa.Column('podcast_created_at', sa.DateTime(timezone=True)),
+            sa.Column('podcast_script', sa.Text()),
+        )
+        op.create_index('ix_case_studies_provider_name', 'case_studies', ['provider_name'])
+        op.create_index('ix_case_studies_client_name', 'case_studies', ['client_name'])
+        op.create_index('ix_case_studies_project_name', 'case_studies', ['project_name'])
+        op.create_index('ix_case_studies_user_updated_id', 'case_studies', ['user_id', 'updated_at', 'id'])
+        op.create_index('ix_case_studies_user_created_id', 'case_studies', ['user_id', 'created_at', 'id'])
+
+    if wanted('solution_provider_interviews'):
+        op.create_table(
+            'solution_provider_interviews',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('case_study_id', sa.Integer(), sa.ForeignKey('case_studies.id', ondelete='CASCADE'),
+                      nullable=False, unique=True),
+            sa.Column('session_id', sa.String(36), nullable=False, unique=True),
+            sa.Column('transcript', sa.Text()),
+            sa.Column('summary', sa.Text()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('client_link_url', sa.String(500)),
+        )
+
+    if wanted('client_interviews'):
+        op.create_table(
+            'client_interviews',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('case_study_id', sa.Integer(), sa.ForeignKey('case_studies.id', ondelete='CASCADE'),
+                      nullable=False, unique=True),
+            sa.Column('session_id', sa.String(36), nullable=False, unique=True),
+            sa.Column('transcript', sa.Text()),
+            sa.Column('summary', sa.Text()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if wanted('invite_tokens'):
+        op.create_table(
+            'invite_tokens',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('case_study_id', sa.Integer(), sa.ForeignKey('case_studies.id', ondelete='CASCADE'),
+                      nullable=False),
+            sa.Column('token', sa.String(36), nullable=False, unique=True),
+            sa.Column('used', sa.Boolean()),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if wanted('labels'):
+        op.create_table(
+            'labels',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(64), nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if wanted('case_study_labels'):
+        op.create_table(
+            'case_study_labels',
+            sa.Column('case_study_id', sa.Integer(), sa.ForeignKey('case_studies.id', ondelete='CASCADE'),
+                      primary_key=True),
+            sa.Column('label_id', sa.Integer(), sa.ForeignKey('labels.id', ondelete='CASCADE'),
+                      primary_key=True),
+        )
+
+    if wanted('feedbacks'):
+        op.create_table(
+            'feedbacks',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+            sa.Column('content', sa.Text(), nullable=False),
+            sa.Column('rating', sa.Integer()),
+            sa.Column('created_at', sa.DateTime()),
+            sa.Column('feedback_type', sa.String(50)),
+            sa.Column('status', sa.String(20)),
+        )
+
+    if wanted('name_extraction_cache'):
+        op.create_table(
+            'name_extraction_cache',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('text_hash', sa.String(64), nullable=False, unique=True),
+            sa.Column('names_json', sa.Text(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    if wanted('jobs'):
+        op.create_table(
+            'jobs',
+            sa.Column('id', sa.String(36), primary_key=True),
+            sa.Column('kind', sa.String(50), nullable=False),
+            sa.Column('payload', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(20), nullable=False),
+            sa.Column('result', sa.Text()),
+            sa.Column('error', sa.Text()),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('max_attempts', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE')),
+            sa.Column('case_study_id', sa.Integer(), sa.ForeignKey('case_studies.id', ondelete='CASCADE')),
+            sa.Column('run_after', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('locked_until', sa.DateTime(timezone=True)),
+            sa.Column('locked_by', sa.String(100)),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column('finished_at', sa.DateTime(timezone=True)),
+        )
+        op.create_index('ix_jobs_user_id', 'jobs', ['user_id'])
+        op.create_index('ix_jobs_case_study_id', 'jobs', ['case_study_id'])
+        op.create_index('ix_jobs_status_run_after', 'jobs', ['status', 'run_after'])
+
+
+def downgrade():
+    for table in ('jobs', 'name_extraction_cache', 'feedbacks', 'case_study_labels', 'labels',
+                  'invite_tokens', 'client_interviews', 'solution_provider_interviews',
+                  'case_studies', 'users'):
+        op.drop_table(table)
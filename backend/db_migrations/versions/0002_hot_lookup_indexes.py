@@ -0,0 +1,35 @@
+"""Index the hot lookup columns: media job ids, labels by user and feedback by user
+
+The status polls look case studies up by video_id, pictory_storyboard_id and podcast_job_id.
+One (user_id, name) index on labels serves both the per-user label list and the lookup by
+name when labelling. Feedback is listed per user, newest first. CaseStudy.user_id filters are
+already served by ix_case_studies_user_updated_id, whose leading column is user_id.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_case_studies_video_id', 'case_studies', ['video_id'])
+    op.create_index('ix_case_studies_pictory_storyboard_id', 'case_studies', ['pictory_storyboard_id'])
+    op.create_index('ix_case_studies_podcast_job_id', 'case_studies', ['podcast_job_id'])
+    op.create_index('ix_labels_user_id_name', 'labels', ['user_id', 'name'])
+    op.create_index('ix_feedbacks_user_created', 'feedbacks', ['user_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_feedbacks_user_created', table_name='feedbacks')
+    op.drop_index('ix_labels_user_id_name', table_name='labels')
+    op.drop_index('ix_case_studies_podcast_job_id', table_name='case_studies')
+    op.drop_index('ix_case_studies_pictory_storyboard_id', table_name='case_studies')
+    op.drop_index('ix_case_studies_video_id', table_name='case_studies')
@@ -0,0 +1,38 @@
+"""Media job errors and status indexes for the background reconciler
+
+The reconciler picks in-flight HeyGen, Pictory and Wondercraft jobs by their status columns
+and stores vendor failures next to them.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('case_studies') as batch_op:
+        batch_op.add_column(sa.Column('video_error', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('pictory_video_error', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('podcast_error', sa.Text(), nullable=True))
+    op.create_index('ix_case_studies_video_status', 'case_studies', ['video_status'])
+    op.create_index('ix_case_studies_pictory_video_status', 'case_studies', ['pictory_video_status'])
+    op.create_index('ix_case_studies_podcast_status', 'case_studies', ['podcast_status'])
+
+
+def downgrade():
+    op.drop_index('ix_case_studies_podcast_status', table_name='case_studies')
+    op.drop_index('ix_case_studies_pictory_video_status', table_name='case_studies')
+    op.drop_index('ix_case_studies_video_status', table_name='case_studies')
+    with op.batch_alter_table('case_studies') as batch_op:
+        batch_op.drop_column('podcast_error')
+        batch_op.drop_column('pictory_video_error')
+        batch_op.drop_column('video_error')
@@ -0,0 +1,32 @@
+"""Per-user event log behind the /api/events stream
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'events',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_events_user_id_id', 'events', ['user_id', 'id'])
+    op.create_index('ix_events_created_at', 'events', ['created_at'])
+
+
+def downgrade():
+    op.drop_table('events')
@@ -0,0 +1,29 @@
+"""Shared store for vendor OAuth access tokens
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 13:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'api_tokens',
+        sa.Column('provider', sa.String(50), primary_key=True),
+        sa.Column('access_token', sa.Text(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table('api_tokens')
@@ -0,0 +1,29 @@
+"""Timestamps of the Pictory storyboard -> render state transitions
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 14:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('case_studies') as batch_op:
+        batch_op.add_column(sa.Column('pictory_storyboard_done_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('pictory_render_started_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('pictory_finished_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('case_studies') as batch_op:
+        batch_op.drop_column('pictory_finished_at')
+        batch_op.drop_column('pictory_render_started_at')
+        batch_op.drop_column('pictory_storyboard_done_at')
@@ -0,0 +1,184 @@
+"""Media jobs table replacing the per-vendor video, Pictory and podcast columns
+
+Every HeyGen video, Pictory video and Wondercraft podcast that a case study has becomes a
+media_jobs row; vendor-specific fields go to its JSON details. The case_studies columns are
+dropped once their data has been copied.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 15:00:00
+"""
+import json
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# provider -> (external id, status, url, error, created_at columns, status when missing, {details key: column})
+VENDORS = {
+    'heygen': ('video_id', 'video_status', 'video_url', 'video_error', 'video_created_at', 'pending', {}),
+    'pictory': (
+        'pictory_storyboard_id', 'pictory_video_status', 'pictory_video_url', 'pictory_video_error',
+        'pictory_video_created_at', 'storyboard_processing', {
+            'render_id': 'pictory_render_id',
+            'storyboard_done_at': 'pictory_storyboard_done_at',
+            'render_started_at': 'pictory_render_started_at',
+            'finished_at': 'pictory_finished_at',
+        }
+    ),
+    'wondercraft': (
+        'podcast_job_id', 'podcast_status', 'podcast_url', 'podcast_error', 'podcast_created_at', 'processing',
+        {'script': 'podcast_script'}
+    ),
+}
+
+# Columns of case_studies moved to media_jobs, with their types
+VENDOR_COLUMNS = [
+    ('video_id', sa.String(100)),
+    ('video_url', sa.Text()),
+    ('video_status', sa.String(50)),
+    ('video_error', sa.Text()),
+    ('video_created_at', sa.DateTime(timezone=True)),
+    ('pictory_storyboard_id', sa.String(100)),
+    ('pictory_render_id', sa.String(100)),
+    ('pictory_video_url', sa.Text()),
+    ('pictory_video_status', sa.String(50)),
+    ('pictory_video_error', sa.Text()),
+    ('pictory_video_created_at', sa.DateTime(timezone=True)),
+    ('pictory_storyboard_done_at', sa.DateTime(timezone=True)),
+    ('pictory_render_started_at', sa.DateTime(timezone=True)),
+    ('pictory_finished_at', sa.DateTime(timezone=True)),
+    ('podcast_job_id', sa.String(100)),
+    ('podcast_url', sa.Text()),
+    ('podcast_status', sa.String(50)),
+    ('podcast_error', sa.Text()),
+    ('podcast_created_at', sa.DateTime(timezone=True)),
+    ('podcast_script', sa.Text()),
+]
+
+VENDOR_INDEXES = [
+    ('ix_case_studies_video_id', 'video_id'),
+    ('ix_case_studies_pictory_storyboard_id', 'pictory_storyboard_id'),
+    ('ix_case_studies_podcast_job_id', 'podcast_job_id'),
+    ('ix_case_studies_video_status', 'video_status'),
+    ('ix_case_studies_pictory_video_status', 'pictory_video_status'),
+    ('ix_case_studies_podcast_status', 'podcast_status'),
+]
+
+BATCH_SIZE = 1000
+
+case_studies = sa.table(
+    'case_studies',
+    sa.column('id', sa.Integer()),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+    sa.column('updated_at', sa.DateTime(timezone=True)),
+    *(sa.column(name, type_) for name, type_ in VENDOR_COLUMNS)
+)
+
+media_jobs = sa.table(
+    'media_jobs',
+    sa.column('id', sa.Integer()),
+    sa.column('case_study_id', sa.Integer()),
+    sa.column('provider', sa.String(20)),
+    sa.column('external_id', sa.String(100)),
+    sa.column('status', sa.String(50)),
+    sa.column('url', sa.Text()),
+    sa.column('error', sa.Text()),
+    sa.column('details', sa.Text()),
+    sa.column('created_at', sa.DateTime(timezone=True)),
+    sa.column('updated_at', sa.DateTime(timezone=True)),
+)
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        # SQLite hands back naive datetimes
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+    return value
+
+
+def _insert(rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        op.bulk_insert(media_jobs, rows[start:start + BATCH_SIZE])
+
+
+def upgrade():
+    op.create_table(
+        'media_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('case_study_id', sa.Integer(), sa.ForeignKey('case_studies.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('provider', sa.String(20), nullable=False),
+        sa.Column('external_id', sa.String(100), nullable=False),
+        sa.Column('status', sa.String(50), nullable=False),
+        sa.Column('url', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_media_jobs_case_study_id', 'media_jobs', ['case_study_id'])
+    op.create_index('ix_media_jobs_provider_external_id', 'media_jobs', ['provider', 'external_id'])
+    op.create_index('ix_media_jobs_status_updated', 'media_jobs', ['status', 'updated_at'])
+
+    conn = op.get_bind()
+    rows = []
+    for provider, (id_column, status, url, error, created_at, default_status, details) in VENDORS.items():
+        for cs in conn.execute(sa.select(case_studies).where(case_studies.c[id_column].isnot(None))).mappings():
+            detail_values = {key: _json_value(cs[column]) for key, column in details.items() if cs[column] is not None}
+            rows.append({
+                'case_study_id': cs['id'],
+                'provider': provider,
+                'external_id': cs[id_column],
+                'status': cs[status] or default_status,
+                'url': cs[url],
+                'error': cs[error],
+                'details': json.dumps(detail_values, ensure_ascii=False) if detail_values else None,
+                'created_at': cs[created_at] or cs['created_at'],
+                'updated_at': cs['updated_at'] or cs[created_at] or cs['created_at'],
+            })
+    # In creation order, so the newest job of a case study also has the highest id
+    rows.sort(key=lambda row: (row['created_at'] is not None, row['created_at'] or 0))
+    _insert(rows)
+
+    with op.batch_alter_table('case_studies') as batch_op:
+        for name, _ in VENDOR_INDEXES:
+            batch_op.drop_index(name)
+        for name, _ in reversed(VENDOR_COLUMNS):
+            batch_op.drop_column(name)
+
+
+def downgrade():
+    with op.batch_alter_table('case_studies') as batch_op:
+        for name, type_ in VENDOR_COLUMNS:
+            batch_op.add_column(sa.Column(name, type_, nullable=True))
+        for name, column in VENDOR_INDEXES:
+            batch_op.create_index(name, [column])
+
+    # Only the newest job of each vendor fits back into the columns
+    conn = op.get_bind()
+    latest = {}
+    for job in conn.execute(sa.select(media_jobs).order_by(media_jobs.c.id)).mappings():
+        latest[(job['case_study_id'], job['provider'])] = job
+    types = dict(VENDOR_COLUMNS)
+    for (case_study_id, provider), job in latest.items():
+        if provider not in VENDORS:
+            continue
+        id_column, status, url, error, created_at, _, details = VENDORS[provider]
+        values = {id_column: job['external_id'], status: job['status'], url: job['url'], error: job['error'],
+                  created_at: job['created_at']}
+        stored = json.loads(job['details']) if job['details'] else {}
+        for key, column in details.items():
+            value = stored.get(key)
+            if value is not None and isinstance(types[column], sa.DateTime):
+                value = datetime.fromisoformat(value)
+            values[column] = value
+        conn.execute(case_studies.update().where(case_studies.c.id == case_study_id).values(**values))
+
+    op.drop_table('media_jobs')
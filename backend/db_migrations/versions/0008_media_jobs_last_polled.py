@@ -0,0 +1,32 @@
+"""When the media reconciler last polled each job
+
+updated_at only moves when a poll changes something, so ordering the reconciler's batches by it
+kept picking the same jobs. Batches are now ordered by last_polled_at on a per-vendor index;
+jobs never polled (NULL) come first.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 16:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('media_jobs', sa.Column('last_polled_at', sa.DateTime(timezone=True), nullable=True))
+    op.drop_index('ix_media_jobs_status_updated', table_name='media_jobs')
+    op.create_index('ix_media_jobs_provider_status_polled', 'media_jobs', ['provider', 'status', 'last_polled_at'])
+
+
+def downgrade():
+    op.drop_index('ix_media_jobs_provider_status_polled', table_name='media_jobs')
+    op.create_index('ix_media_jobs_status_updated', 'media_jobs', ['status', 'updated_at'])
+    with op.batch_alter_table('media_jobs') as batch_op:
+        batch_op.drop_column('last_polled_at')
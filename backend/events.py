@@ -0,0 +1,102 @@
+"""Per-user event log streamed to the dashboard as server-sent events.
+
+Background code ``record``s an event in the same transaction as the change it describes: media
+job transitions from the reconciler (``media``) and generation job status from the job queue
+(``job``). ``/api/events`` streams a user's events in id order. The id is the SSE event id, so a
+reconnecting browser sends it back as ``Last-Event-ID`` and resumes right after the last event
+it saw. Each stream is closed after ``EVENTS_STREAM_SECONDS`` and the browser reconnects, so
+no worker thread is held indefinitely.
+
+An open stream holds a gunicorn thread and polls the database every ``EVENTS_POLL_INTERVAL``
+seconds, so the dashboard only opens it while it waits on a job or media render and closes it
+shortly afterwards; an idle tab costs nothing.
+"""
+import json
+import os
+import time
+from datetime import datetime, timedelta, UTC
+
+from db import SessionLocal
+from models import Event
+
+EVENTS_POLL_INTERVAL = float(os.getenv("EVENTS_POLL_INTERVAL", "2"))  # seconds between checks for new events
+EVENTS_STREAM_SECONDS = int(os.getenv("EVENTS_STREAM_SECONDS", "300"))  # lifetime of one SSE response
+EVENTS_HEARTBEAT_SECONDS = 15  # comment line that keeps proxies from closing an idle stream
+EVENTS_RETRY_MS = 3000  # reconnect delay suggested to the browser
+EVENTS_RETENTION_HOURS = int(os.getenv("EVENTS_RETENTION_HOURS", "24"))
+EVENTS_BATCH_SIZE = 100
+
+
+def record(session_db, user_id, kind, **payload):
+    """Add an event to ``session_db``; it is stored when the caller commits."""
+    if user_id is None:
+        return
+    session_db.add(Event(user_id=user_id, kind=kind, payload=json.dumps(payload, ensure_ascii=False)))
+
+
+def latest_id(user_id):
+    """Id of the user's newest event, or 0."""
+    session_db = SessionLocal()
+    try:
+        return session_db.query(Event.id).filter_by(user_id=user_id).order_by(Event.id.desc()).limit(1).scalar() or 0
+    finally:
+        session_db.close()
+
+
+def since(user_id, cursor, limit=EVENTS_BATCH_SIZE):
+    """``(id, kind, payload)`` of the user's events after ``cursor``, oldest first."""
+    session_db = SessionLocal()
+    try:
+        return (
+            session_db.query(Event.id, Event.kind, Event.payload)
+            .filter(Event.user_id == user_id, Event.id > cursor)
+            .order_by(Event.id)
+            .limit(limit)
+            .all()
+        )
+    finally:
+        session_db.close()
+
+
+def format_event(event_id, kind, data):
+    return f"id: {event_id}\nevent: {kind}\ndata: {data}\n\n"
+
+
+def stream(user_id, cursor=None):
+    """Yield the SSE lines for the user's events after ``cursor`` (or from now on)."""
+    if cursor is None:
+        cursor = latest_id(user_id)
+    yield f"retry: {EVENTS_RETRY_MS}\n"
+    # Hands the browser its starting cursor, so a reconnect never misses an event
+    yield format_event(cursor, "ready", "{}")
+
+    deadline = time.monotonic() + EVENTS_STREAM_SECONDS
+    last_sent = time.monotonic()
+    while time.monotonic() < deadline:
+        rows = since(user_id, cursor)
+        for event_id, kind, payload in rows:
+            yield format_event(event_id, kind, payload)
+            cursor = event_id
+        if rows:
+            last_sent = time.monotonic()
+            if len(rows) == EVENTS_BATCH_SIZE:
+                continue
+        elif time.monotonic() - last_sent >= EVENTS_HEARTBEAT_SECONDS:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        time.sleep(EVENTS_POLL_INTERVAL)
+
+
+def prune():
+    """Delete events older than ``EVENTS_RETENTION_HOURS``; returns the number deleted."""
+    session_db = SessionLocal()
+    try:
+        cutoff = datetime.now(UTC) - timedelta(hours=EVENTS_RETENTION_HOURS)
+        deleted = session_db.query(Event).filter(Event.created_at < cutoff).delete(synchronize_session=False)
+        session_db.commit()
+        return deleted
+    except Exception:
+        session_db.rollback()
+        raise
+    finally:
+        session_db.close()
@@ -0,0 +1,32 @@
+"""Gunicorn hooks, loaded automatically when gunicorn is started from the backend directory.
+
+With ``--preload`` the app is imported once in the master, which then warms the heavy
+dependencies so the forked workers share those pages copy-on-write (``WARM_ON_PRELOAD=0``
+turns the warm-up off).
+
+Each worker serves requests from a pool of threads, so the long-lived ``/api/events`` streams
+only hold a thread each instead of a whole worker. Browsers open a stream only while a job or
+media render is in flight (see events.py), so the threads bound concurrent renders being
+watched, not open dashboard tabs.
+"""
+import os
+
+# More than one thread per worker makes gunicorn use its threaded (gthread) worker
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+
+def when_ready(server):
+    """Warm the lazily imported dependencies in the master before workers are forked."""
+    if server.cfg.preload_app and os.getenv("WARM_ON_PRELOAD", "1") == "1":
+        import startup
+        startup.warm()
+
+
+def post_fork(server, worker):
+    """Give each worker its own LLM connection pool and open it before the first request."""
+    if server.cfg.preload_app:
+        # Connections opened by init_db() in the master must not be shared with the workers
+        import db
+        db.engine.dispose()
+    import llm_client
+    llm_client.warm()
@@ -0,0 +1,208 @@
+"""Query plans and latencies of the hot lookups before and after the index migration.
+
+Builds a scratch database at the baseline revision, seeds it with ~100k case studies, times
+the dashboard, status-poll, label and feedback lookups, applies the index migration and times
+them again:
+
+    cd backend && python index_benchmark.py [--case-studies 100000] [--url postgresql://...]
+
+Without ``--url`` it uses a temporary SQLite file. A given ``--url`` must point at an empty,
+disposable database.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+import migrations
+
+# The revision that added the indexes; later ones moved the status-poll columns to media_jobs
+INDEX_REVISION = "0002"
+
+# name -> (SQL, parameter factory)
+QUERIES = {
+    "dashboard count": (
+        "SELECT count(*) FROM case_studies WHERE user_id = :user_id",
+        lambda s: {"user_id": s.user_id()},
+    ),
+    "dashboard page": (
+        "SELECT id, title, updated_at FROM case_studies WHERE user_id = :user_id"
+        " ORDER BY updated_at DESC, id DESC LIMIT 50",
+        lambda s: {"user_id": s.user_id()},
+    ),
+    "heygen status": (
+        "SELECT id FROM case_studies WHERE video_id = :video_id",
+        lambda s: {"video_id": random.choice(s.video_ids)},
+    ),
+    "pictory status": (
+        "SELECT id FROM case_studies WHERE pictory_storyboard_id = :storyboard_id",
+        lambda s: {"storyboard_id": random.choice(s.storyboard_ids)},
+    ),
+    "podcast status": (
+        "SELECT id FROM case_studies WHERE podcast_job_id = :job_id",
+        lambda s: {"job_id": random.choice(s.podcast_ids)},
+    ),
+    "labels list": (
+        "SELECT id, name FROM labels WHERE user_id = :user_id",
+        lambda s: {"user_id": s.user_id()},
+    ),
+    "label by name": (
+        "SELECT id FROM labels WHERE name = :name AND user_id = :user_id",
+        lambda s: {"name": f"label-{random.randrange(s.labels_per_user)}", "user_id": s.user_id()},
+    ),
+    "feedback list": (
+        "SELECT id, rating, created_at FROM feedbacks WHERE user_id = :user_id ORDER BY created_at DESC",
+        lambda s: {"user_id": s.user_id()},
+    ),
+}
+
+
+class Seed:
+    """Ids of the seeded rows that the queries look up."""
+
+    def __init__(self, users, labels_per_user):
+        self.users = users
+        self.labels_per_user = labels_per_user
+        self.video_ids = []
+        self.storyboard_ids = []
+        self.podcast_ids = []
+
+    def user_id(self):
+        return random.randint(1, self.users)
+
+
+def seed(engine, case_studies, users, labels_per_user, feedback_per_user, batch=5000):
+    data = Seed(users, labels_per_user)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO users (id, first_name, last_name, email, password_hash, data_version)"
+                 " VALUES (:id, 'Bench', 'User', :email, 'x', 0)"),
+            [{"id": i, "email": f"bench{i}@example.com"} for i in range(1, users + 1)],
+        )
+        conn.execute(
+            text("INSERT INTO labels (name, user_id) VALUES (:name, :user_id)"),
+            [{"name": f"label-{n}", "user_id": u} for u in range(1, users + 1) for n in range(labels_per_user)],
+        )
+        conn.execute(
+            text("INSERT INTO feedbacks (user_id, content, rating, created_at, status)"
+                 " VALUES (:user_id, 'Benchmark feedback', 4, :created_at, 'pending')"),
+            [{"user_id": u, "created_at": now - timedelta(minutes=random.randrange(100000))}
+             for u in range(1, users + 1) for _ in range(feedback_per_user)],
+        )
+
+        insert = text(
+            "INSERT INTO case_studies (user_id, title, created_at, updated_at, video_id,"
+            " pictory_storyboard_id, podcast_job_id) VALUES (:user_id, :title, :created_at,"
+            " :updated_at, :video_id, :storyboard_id, :podcast_id)"
+        )
+        rows = []
+        for i in range(case_studies):
+            created = now - timedelta(minutes=random.randrange(500000))
+            row = {
+                "user_id": random.randint(1, users),
+                "title": f"Provider {i} x Client {i}: Project {i}",
+                "created_at": created,
+                "updated_at": created + timedelta(minutes=random.randrange(1000)),
+                # Most stories never get a video or podcast, as in production
+                "video_id": uuid.uuid4().hex if i % 3 == 0 else None,
+                "storyboard_id": uuid.uuid4().hex if i % 4 == 0 else None,
+                "podcast_id": uuid.uuid4().hex if i % 5 == 0 else None,
+            }
+            for key, ids in (("video_id", data.video_ids), ("storyboard_id", data.storyboard_ids),
+                             ("podcast_id", data.podcast_ids)):
+                if row[key]:
+                    ids.append(row[key])
+            rows.append(row)
+            if len(rows) >= batch:
+                conn.execute(insert, rows)
+                rows = []
+        if rows:
+            conn.execute(insert, rows)
+    analyze(engine)
+    return data
+
+
+def analyze(engine):
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def query_plan(conn, sql, params):
+    if conn.dialect.name == "sqlite":
+        return "; ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params))
+    return "; ".join(row[0].strip() for row in conn.execute(text("EXPLAIN " + sql), params))
+
+
+def measure(engine, data, repeats):
+    """Return ``{name: (plan, median_ms, p95_ms)}`` for every query."""
+    results = {}
+    with engine.connect() as conn:
+        for name, (sql, make_params) in QUERIES.items():
+            plan = query_plan(conn, sql, make_params(data))
+            samples = []
+            for _ in range(repeats):
+                params = make_params(data)
+                started = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            results[name] = (plan, statistics.median(samples), samples[int(len(samples) * 0.95) - 1])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hot lookups before and after the index migration.")
+    parser.add_argument("--url", help="Empty, disposable database (default: a temporary SQLite file).")
+    parser.add_argument("--case-studies", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--labels-per-user", type=int, default=20)
+    parser.add_argument("--feedback-per-user", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    random.seed(0)
+
+    scratch = None
+    url = args.url
+    if not url:
+        scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        scratch.close()
+        url = f"sqlite:///{scratch.name}"
+    engine = create_engine(url)
+
+    try:
+        migrations.upgrade(engine, migrations.BASELINE_REVISION)
+        started = time.perf_counter()
+        data = seed(engine, args.case_studies, args.users, args.labels_per_user, args.feedback_per_user)
+        print(f"🌱 Seeded {args.case_studies} case studies for {args.users} users "
+              f"in {time.perf_counter() - started:.1f} s ({engine.dialect.name})")
+
+        before = measure(engine, data, args.repeats)
+        started = time.perf_counter()
+        migrations.upgrade(engine, INDEX_REVISION)
+        analyze(engine)
+        print(f"🛠️ Migrated to {INDEX_REVISION} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        after = measure(engine, data, args.repeats)
+
+        print(f"\n{'query':<16} {'before ms (p50/p95)':>20} {'after ms (p50/p95)':>20} {'speed-up':>9}")
+        for name in QUERIES:
+            _, b50, b95 = before[name]
+            _, a50, a95 = after[name]
+            print(f"{name:<16} {b50:>10.3f}/{b95:<9.3f} {a50:>10.3f}/{a95:<9.3f} {b50 / a50 if a50 else 0:>8.1f}x")
+        print("\nQuery plans")
+        for name in QUERIES:
+            print(f"  {name}\n    before: {before[name][0]}\n    after:  {after[name][0]}")
+    finally:
+        engine.dispose()
+        if scratch:
+            os.unlink(scratch.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""Durable background job queue stored in the application database.
+
+Web endpoints ``enqueue`` work and return a job id; ``worker.py`` claims jobs, runs the
+registered handler and records the result. A claimed job is invisible to other workers until
+its visibility timeout expires, after which it is picked up again (counting as an attempt).
+While the handler runs, a heartbeat keeps extending the timeout, so only a crashed or stuck
+worker loses its job. ``complete`` and ``fail`` are fenced on the claimed attempt and worker,
+so a stale attempt can never overwrite a newer one.
+Failed attempts are retried with exponential backoff until ``max_attempts`` is reached.
+Every status change is recorded as a ``job`` event for the owner's dashboard event stream.
+"""
+import json
+import os
+import threading
+import traceback
+import uuid
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy import and_, or_
+
+import events
+from db import SessionLocal
+from models import Job
+
+JOB_VISIBILITY_TIMEOUT = int(os.getenv("JOB_VISIBILITY_TIMEOUT", "600"))  # seconds a claimed job stays hidden
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = int(os.getenv("JOB_RETRY_DELAY", "15"))  # seconds, doubled after every failed attempt
+JOB_HEARTBEAT_INTERVAL = JOB_VISIBILITY_TIMEOUT / 3  # seconds between lease extensions of a running job
+
+_handlers = {}
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures that a retry cannot fix (bad input, missing rows)."""
+
+
+def handler(kind):
+    """Register a function ``fn(payload) -> result`` as the handler for jobs of this kind."""
+    def decorator(fn):
+        _handlers[kind] = fn
+        return fn
+    return decorator
+
+
+def record_event(session_db, job, status, **details):
+    events.record(
+        session_db, job.user_id, 'job',
+        job_id=job.id, job_kind=job.kind, status=status, case_study_id=job.case_study_id, **details
+    )
+
+
+def enqueue(kind, payload, user_id=None, case_study_id=None, max_attempts=None):
+    """Store a new job and return its id."""
+    session_db = SessionLocal()
+    try:
+        job = Job(
+            id=str(uuid.uuid4()),
+            kind=kind,
+            payload=json.dumps(payload),
+            status='queued',
+            attempts=0,
+            max_attempts=max_attempts or JOB_MAX_ATTEMPTS,
+            user_id=user_id,
+            case_study_id=case_study_id,
+            run_after=datetime.now(UTC)
+        )
+        session_db.add(job)
+        session_db.commit()
+        print(f"📥 Queued {kind} job {job.id}")
+        return job.id
+    except Exception:
+        session_db.rollback()
+        raise
+    finally:
+        session_db.close()
+
+
+def get(job_id):
+    """Return the job as a dict, or None if it does not exist."""
+    session_db = SessionLocal()
+    try:
+        job = session_db.query(Job).filter_by(id=job_id).first()
+        if not job:
+            return None
+        result = job.to_dict()
+        result['user_id'] = job.user_id
+        return result
+    finally:
+        session_db.close()
+
+
+def claim(worker_id):
+    """Claim the next runnable job for this worker.
+
+    Returns ``(job_id, kind, payload, attempt)`` or None when nothing is runnable. Claims use a
+    compare-and-set on ``attempts`` so concurrent workers never run the same attempt twice.
+    """
+    session_db = SessionLocal()
+    try:
+        while True:
+            now = datetime.now(UTC)
+            job = (
+                session_db.query(Job)
+                .filter(or_(
+                    and_(Job.status == 'queued', Job.run_after <= now),
+                    and_(Job.status == 'running', Job.locked_until < now)
+                ))
+                .order_by(Job.run_after)
+                .first()
+            )
+            if not job:
+                return None
+
+            # A running job whose lock expired was abandoned by a crashed or stuck worker
+            if job.status == 'running' and job.attempts >= job.max_attempts:
+                expired = session_db.query(Job).filter(
+                    Job.id == job.id, Job.status == 'running', Job.attempts == job.attempts
+                ).update({
+                    'status': 'failed',
+                    'error': f"Timed out after {job.attempts} attempts",
+                    'locked_until': None,
+                    'finished_at': now
+                }, synchronize_session=False)
+                if expired:
+                    record_event(session_db, job, 'failed', error=f"Timed out after {job.attempts} attempts")
+                session_db.commit()
+                if expired:
+                    print(f"⌛ Job {job.id} exceeded its visibility timeout on the last attempt")
+                continue
+
+            attempt = job.attempts + 1
+            claimed = session_db.query(Job).filter(
+                Job.id == job.id, Job.status == job.status, Job.attempts == job.attempts
+            ).update({
+                'status': 'running',
+                'attempts': attempt,
+                'locked_by': worker_id,
+                'locked_until': now + timedelta(seconds=JOB_VISIBILITY_TIMEOUT)
+            }, synchronize_session=False)
+            if claimed:
+                record_event(session_db, job, 'running', attempt=attempt)
+            session_db.commit()
+            if claimed:
+                return job.id, job.kind, json.loads(job.payload), attempt
+            # Another worker won the race for this job; look for the next one
+            session_db.expire_all()
+    except Exception:
+        session_db.rollback()
+        raise
+    finally:
+        session_db.close()
+
+
+def _claimed(session_db, job_id, attempt, worker_id):
+    """The job row, locked, if this worker still holds the given attempt."""
+    return (
+        session_db.query(Job)
+        .filter(Job.id == job_id, Job.status == 'running', Job.attempts == attempt, Job.locked_by == worker_id)
+        .with_for_update()
+        .first()
+    )
+
+
+def extend_lease(job_id, attempt, worker_id):
+    """Push back the visibility timeout of a running attempt. Returns False if the attempt was lost."""
+    session_db = SessionLocal()
+    try:
+        extended = session_db.query(Job).filter(
+            Job.id == job_id, Job.status == 'running', Job.attempts == attempt, Job.locked_by == worker_id
+        ).update({
+            'locked_until': datetime.now(UTC) + timedelta(seconds=JOB_VISIBILITY_TIMEOUT)
+        }, synchronize_session=False)
+        session_db.commit()
+        return bool(extended)
+    except Exception:
+        session_db.rollback()
+        raise
+    finally:
+        session_db.close()
+
+
+def complete(job_id, attempt, worker_id, result):
+    """Mark a job as succeeded and store its JSON-serialisable result."""
+    session_db = SessionLocal()
+    try:
+        job = _claimed(session_db, job_id, attempt, worker_id)
+        if not job:
+            print(f"⚠️ Job {job_id} attempt {attempt} finished after losing its lease; result discarded")
+            return
+        job.status = 'succeeded'
+        job.result = json.dumps(result, ensure_ascii=False)
+        job.error = None
+        job.locked_until = None
+        job.finished_at = datetime.now(UTC)
+        record_event(session_db, job, 'succeeded')
+        session_db.commit()
+    except Exception:
+        session_db.rollback()
+        raise
+    finally:
+        session_db.close()
+
+
+def fail(job_id, attempt, worker_id, error, permanent=False):
+    """Record a failed attempt; requeue it with backoff unless it is permanent or out of attempts."""
+    session_db = SessionLocal()
+    try:
+        job = _claimed(session_db, job_id, attempt, worker_id)
+        if not job:
+            print(f"⚠️ Job {job_id} attempt {attempt} failed after losing its lease: {error}")
+            return
+        now = datetime.now(UTC)
+        job.error = str(error)
+        job.locked_until = None
+        if permanent or job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            job.finished_at = now
+        else:
+            job.status = 'queued'
+            job.run_after = now + timedelta(seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1))
+        record_event(session_db, job, job.status, error=job.error)
+        session_db.commit()
+        print(f"❌ Job {job_id} attempt {job.attempts}/{job.max_attempts} failed ({job.status}): {error}")
+    except Exception:
+        session_db.rollback()
+        raise
+    finally:
+        session_db.close()
+
+
+def _heartbeat(job_id, attempt, worker_id, stop):
+    """Extend the attempt's lease every JOB_HEARTBEAT_INTERVAL seconds until ``stop`` is set."""
+    while not stop.wait(JOB_HEARTBEAT_INTERVAL):
+        try:
+            if not extend_lease(job_id, attempt, worker_id):
+                print(f"⚠️ Job {job_id} attempt {attempt} lost its lease")
+                return
+        except Exception as e:
+            print(f"❌ Could not extend the lease of job {job_id}: {str(e)}")
+
+
+def run_next(worker_id):
+    """Claim and run one job. Returns False when the queue had nothing runnable."""
+    claimed = claim(worker_id)
+    if not claimed:
+        return False
+
+    job_id, kind, payload, attempt = claimed
+    fn = _handlers.get(kind)
+    if fn is None:
+        fail(job_id, attempt, worker_id, f"No handler registered for job kind '{kind}'", permanent=True)
+        return True
+
+    started = datetime.now(UTC)
+    print(f"▶️ {worker_id} running {kind} job {job_id}")
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat, args=(job_id, attempt, worker_id, stop), name=f"heartbeat-{job_id}", daemon=True)
+    heartbeat.start()
+    try:
+        try:
+            result = fn(payload)
+        finally:
+            stop.set()
+            heartbeat.join()
+    except PermanentJobError as e:
+        fail(job_id, attempt, worker_id, e, permanent=True)
+    except Exception as e:
+        traceback.print_exc()
+        fail(job_id, attempt, worker_id, e)
+    else:
+        complete(job_id, attempt, worker_id, result)
+        print(f"✅ {kind} job {job_id} finished in {(datetime.now(UTC) - started).total_seconds():.1f}s")
+    return True
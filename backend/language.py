@@ -0,0 +1,98 @@
+"""Cached, deterministic language detection for transcripts and summaries.
+
+langdetect is probabilistic (random unless seeded) and slow on long texts, so detection runs
+on a bounded sample (start, middle and end of the text) with a fixed seed, and results are kept
+in a per-process LRU keyed by the hash of that sample. Case studies store the result in
+``CaseStudy.language`` so later generation steps do not detect again.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+LANGUAGE_SAMPLE_CHARS = int(os.getenv("LANGUAGE_SAMPLE_CHARS", "3000"))
+LANGUAGE_CACHE_SIZE = int(os.getenv("LANGUAGE_CACHE_SIZE", "1024"))
+LANGUAGE_SEED = 0
+DEFAULT_LANGUAGE = "English"
+
+# langdetect codes -> the language names used in prompts and lexicons
+LANGUAGE_NAMES = {
+    'en': 'English',
+    'es': 'Spanish',
+    'fr': 'French',
+    'de': 'German',
+    'it': 'Italian',
+    'pt': 'Portuguese',
+    'ru': 'Russian',
+    'zh-cn': 'Chinese',
+    'zh-tw': 'Chinese',
+    'ja': 'Japanese',
+    'ko': 'Korean',
+    'ar': 'Arabic',
+    'hi': 'Hindi',
+    'pl': 'Polish',
+    'sq': 'Albanian',
+}
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+_factory_ready = False
+
+
+def sample(text):
+    """Up to LANGUAGE_SAMPLE_CHARS characters taken from the start, middle and end of the text."""
+    text = text.strip()
+    if len(text) <= LANGUAGE_SAMPLE_CHARS:
+        return text
+    part = LANGUAGE_SAMPLE_CHARS // 3
+    middle = len(text) // 2 - part // 2
+    return "\n".join((text[:part], text[middle:middle + part], text[-part:]))
+
+
+def warm():
+    """Load the langdetect profiles and fix its seed; called before the first detection."""
+    global _factory_ready
+    if not _factory_ready:
+        with _lock:
+            if not _factory_ready:
+                from langdetect import DetectorFactory
+                from langdetect.detector_factory import init_factory
+                DetectorFactory.seed = LANGUAGE_SEED
+                init_factory()
+                _factory_ready = True
+
+
+def detect_language(text):
+    """Return the language name of the text (e.g. "German"), defaulting to English."""
+    if not text or not text.strip():
+        return DEFAULT_LANGUAGE
+
+    text_sample = sample(text)
+    key = hashlib.sha256(text_sample.encode("utf-8")).hexdigest()
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return _cache[key]
+        _stats["misses"] += 1
+
+    try:
+        warm()
+        from langdetect import detect
+        language = LANGUAGE_NAMES.get(detect(text_sample), DEFAULT_LANGUAGE)
+    except Exception:
+        # langdetect raises on texts without letters; those are not worth caching either
+        return DEFAULT_LANGUAGE
+
+    with _lock:
+        _cache[key] = language
+        _cache.move_to_end(key)
+        while len(_cache) > LANGUAGE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return language
+
+
+def stats():
+    with _lock:
+        return dict(_stats, size=len(_cache))
@@ -0,0 +1,231 @@
+"""Single-pass weighted keyword matcher used to classify client satisfaction.
+
+A lexicon maps categories to ``{phrase: weight}``. All phrases of a lexicon are compiled into
+one alternation (longest first, so "not bad" wins over "bad"), and ``LexiconMatcher.find``
+returns every hit with its sentence span in one linear scan of the text. A hit preceded by a
+negation word ("not excellent") is mirrored around Neutral at half strength.
+
+Lexicons exist for the languages the app writes case studies in and can be extended or
+overridden with a JSON file named by ``SATISFACTION_LEXICON_FILE``::
+
+    {"German": {"negations": ["nicht"], "categories": {"Good": {"gut": 1.0}}}}
+"""
+import bisect
+import json
+import os
+import re
+import threading
+
+# Category -> position on the 0-10 satisfaction scale (matches the gauge)
+CATEGORY_VALUES = {
+    "Very Bad": 1,
+    "Bad": 3,
+    "Neutral": 5,
+    "Good": 7,
+    "Very Good": 9
+}
+DEFAULT_LANGUAGE = "English"
+SATISFACTION_LEXICON_FILE = os.getenv("SATISFACTION_LEXICON_FILE")
+
+# How many words before a hit are checked for a negation
+NEGATION_WINDOW = 3
+
+LEXICONS = {
+    "English": {
+        "negations": ["not", "never", "no", "hardly", "barely", "cannot", "don't", "didn't", "doesn't", "isn't",
+                      "wasn't", "weren't", "aren't", "won't", "wouldn't", "couldn't", "can't"],
+        "categories": {
+            "Very Bad": {"terrible": 1.0, "awful": 1.0, "horrible": 1.0, "very disappointed": 1.0,
+                         "extremely dissatisfied": 1.0, "never again": 1.0, "worst": 1.0},
+            "Bad": {"bad": 0.8, "disappointed": 0.8, "dissatisfied": 0.8, "not happy": 0.8, "not satisfied": 0.8,
+                    "issues": 0.4, "problems": 0.4, "concerns": 0.4},
+            "Neutral": {"okay": 0.5, "neutral": 0.5, "average": 0.5, "fine": 0.3, "acceptable": 0.5,
+                        "neither good nor bad": 0.8},
+            "Good": {"good": 0.6, "satisfied": 0.8, "happy": 0.8, "pleased": 0.8, "helpful": 0.6, "positive": 0.6,
+                     "recommend": 0.8, "valuable": 0.6, "improved": 0.6, "great help": 0.8, "not bad": 0.5,
+                     "no complaints": 0.6},
+            "Very Good": {"excellent": 1.0, "outstanding": 1.0, "amazing": 1.0, "fantastic": 1.0, "very happy": 1.0,
+                          "very satisfied": 1.0, "delighted": 1.0, "impressed": 0.8, "exceptional": 1.0,
+                          "game changer": 1.0, "highly recommend": 1.0, "best": 0.6}
+        }
+    },
+    "Spanish": {
+        "negations": ["no", "nunca", "jamás", "tampoco"],
+        "categories": {
+            "Very Bad": {"terrible": 1.0, "horrible": 1.0, "pésimo": 1.0, "muy decepcionado": 1.0, "nunca más": 1.0},
+            "Bad": {"malo": 0.8, "mal": 0.6, "decepcionado": 0.8, "insatisfecho": 0.8, "problemas": 0.4},
+            "Neutral": {"aceptable": 0.5, "normal": 0.4, "regular": 0.5},
+            "Good": {"bueno": 0.6, "bien": 0.4, "satisfecho": 0.8, "contento": 0.8, "útil": 0.6, "recomiendo": 0.8,
+                     "no está mal": 0.5},
+            "Very Good": {"excelente": 1.0, "increíble": 1.0, "fantástico": 1.0, "muy satisfecho": 1.0,
+                          "muy contento": 1.0, "impresionado": 0.8, "excepcional": 1.0}
+        }
+    },
+    "French": {
+        "negations": ["ne", "pas", "jamais", "aucun"],
+        "categories": {
+            "Very Bad": {"terrible": 1.0, "horrible": 1.0, "catastrophique": 1.0, "très déçu": 1.0},
+            "Bad": {"mauvais": 0.8, "déçu": 0.8, "insatisfait": 0.8, "problèmes": 0.4},
+            "Neutral": {"correct": 0.5, "moyen": 0.5, "acceptable": 0.5},
+            "Good": {"bon": 0.6, "bien": 0.4, "satisfait": 0.8, "content": 0.8, "utile": 0.6, "recommande": 0.8,
+                     "pas mal": 0.5},
+            "Very Good": {"excellent": 1.0, "exceptionnel": 1.0, "fantastique": 1.0, "très satisfait": 1.0,
+                          "ravi": 1.0, "impressionné": 0.8}
+        }
+    },
+    "German": {
+        "negations": ["nicht", "nie", "niemals", "kein", "keine"],
+        "categories": {
+            "Very Bad": {"schrecklich": 1.0, "furchtbar": 1.0, "katastrophal": 1.0, "sehr enttäuscht": 1.0},
+            "Bad": {"schlecht": 0.8, "enttäuscht": 0.8, "unzufrieden": 0.8, "probleme": 0.4},
+            "Neutral": {"okay": 0.5, "durchschnittlich": 0.5, "akzeptabel": 0.5},
+            "Good": {"gut": 0.6, "zufrieden": 0.8, "hilfreich": 0.6, "empfehlen": 0.8, "nicht schlecht": 0.5},
+            "Very Good": {"ausgezeichnet": 1.0, "hervorragend": 1.0, "fantastisch": 1.0, "sehr zufrieden": 1.0,
+                          "begeistert": 1.0, "beeindruckt": 0.8}
+        }
+    },
+    "Italian": {
+        "negations": ["non", "mai"],
+        "categories": {
+            "Very Bad": {"terribile": 1.0, "orribile": 1.0, "pessimo": 1.0, "molto deluso": 1.0},
+            "Bad": {"cattivo": 0.8, "male": 0.6, "deluso": 0.8, "insoddisfatto": 0.8, "problemi": 0.4},
+            "Neutral": {"accettabile": 0.5, "normale": 0.4, "nella media": 0.5},
+            "Good": {"buono": 0.6, "bene": 0.4, "soddisfatto": 0.8, "contento": 0.8, "utile": 0.6,
+                     "consiglio": 0.8, "non male": 0.5},
+            "Very Good": {"eccellente": 1.0, "straordinario": 1.0, "fantastico": 1.0, "molto soddisfatto": 1.0,
+                          "entusiasta": 1.0, "colpito": 0.8}
+        }
+    },
+    "Albanian": {
+        "negations": ["nuk", "jo", "kurrë"],
+        "categories": {
+            "Very Bad": {"i tmerrshëm": 1.0, "tmerrshëm": 1.0, "shumë i zhgënjyer": 1.0, "më i keqi": 1.0},
+            "Bad": {"keq": 0.8, "i zhgënjyer": 0.8, "i pakënaqur": 0.8, "probleme": 0.4},
+            "Neutral": {"në rregull": 0.5, "mesatar": 0.5, "i pranueshëm": 0.5},
+            "Good": {"mirë": 0.6, "i kënaqur": 0.8, "e kënaqur": 0.8, "të kënaqur": 0.8, "i dobishëm": 0.6, "rekomandoj": 0.8,
+                     "jo keq": 0.5},
+            "Very Good": {"shkëlqyer": 1.0, "i shkëlqyer": 1.0, "fantastik": 1.0, "shumë i kënaqur": 1.0,
+                          "shumë e kënaqur": 1.0, "shumë të kënaqur": 1.0, "shumë mirë": 1.0, "i jashtëzakonshëm": 1.0}
+        }
+    }
+}
+
+_SENTENCE_END = re.compile(r"[.!?]+|\n{2,}")
+_WORD = re.compile(r"[\w']+")
+
+
+class Hit:
+    """One lexicon phrase found in a text, with the sentence it belongs to."""
+
+    __slots__ = ("phrase", "category", "weight", "value", "negated", "start", "end", "sentence_start", "sentence_end")
+
+    def __init__(self, phrase, category, weight, value, negated, start, end, sentence_start, sentence_end):
+        self.phrase = phrase
+        self.category = category
+        self.weight = weight
+        self.value = value
+        self.negated = negated
+        self.start = start
+        self.end = end
+        self.sentence_start = sentence_start
+        self.sentence_end = sentence_end
+
+    @property
+    def strength(self):
+        """How strongly this hit pulls the score away from Neutral."""
+        return self.weight * abs(self.value - CATEGORY_VALUES["Neutral"])
+
+
+class LexiconMatcher:
+    """Finds all phrases of a ``{category: {phrase: weight}}`` lexicon in one pass."""
+
+    def __init__(self, categories, negations=()):
+        self.entries = {}
+        for category, phrases in categories.items():
+            if category not in CATEGORY_VALUES:
+                raise ValueError(f"Unknown satisfaction category: {category}")
+            for phrase, weight in phrases.items():
+                self.entries[phrase.lower()] = (category, float(weight))
+        self.negations = {n.lower() for n in negations}
+
+        # Longest phrases first so multi-word phrases win over the words they contain
+        alternation = "|".join(re.escape(p) for p in sorted(self.entries, key=len, reverse=True))
+        self.pattern = re.compile(r"(?<!\w)(?:" + alternation + r")(?!\w)", re.IGNORECASE)
+
+    def _negated(self, text, sentence_start, start):
+        words = _WORD.findall(text[max(sentence_start, start - 40):start].lower())
+        return any(word in self.negations or word.endswith("n't") for word in words[-NEGATION_WINDOW:])
+
+    def find(self, text):
+        """Return every ``Hit`` in the text, in order."""
+        text = text.replace("’", "'")
+        ends = [m.end() for m in _SENTENCE_END.finditer(text)]
+        hits = []
+        for match in self.pattern.finditer(text):
+            index = bisect.bisect_right(ends, match.start())
+            sentence_start = ends[index - 1] if index else 0
+            sentence_end = ends[index] if index < len(ends) else len(text)
+
+            category, weight = self.entries[match.group(0).lower()]
+            value = CATEGORY_VALUES[category]
+            negated = self._negated(text, sentence_start, match.start())
+            if negated:
+                # "not excellent" reads as mildly negative, "not terrible" as mildly positive
+                value = CATEGORY_VALUES["Neutral"] - (value - CATEGORY_VALUES["Neutral"]) / 2
+                weight /= 2
+            hits.append(Hit(match.group(0), category, weight, value, negated,
+                            match.start(), match.end(), sentence_start, sentence_end))
+        return hits
+
+    def classify(self, text):
+        """Weighted satisfaction for the text.
+
+        Returns ``(category, score, statement, hits)``: ``score`` is the weight-averaged position
+        on the 0-10 scale (None without hits), ``category`` the nearest category to it and
+        ``statement`` the sentence holding the strongest hit that agrees with the category.
+        """
+        hits = self.find(text)
+        if not hits:
+            return "Neutral", None, "", hits
+
+        total_weight = sum(hit.weight for hit in hits)
+        score = sum(hit.weight * hit.value for hit in hits) / total_weight
+        category = min(CATEGORY_VALUES, key=lambda c: abs(CATEGORY_VALUES[c] - score))
+
+        agreeing = [hit for hit in hits if (hit.value - 5) * (score - 5) > 0] or hits
+        best = max(agreeing, key=lambda hit: (hit.strength, hit.weight))
+        statement = text.replace("’", "'")[best.sentence_start:best.sentence_end].strip(" \n\t.!?")
+        return category, round(score, 2), statement, hits
+
+
+_matchers = {}
+_matchers_lock = threading.Lock()
+
+
+def load_lexicons():
+    """Built-in lexicons merged with the overrides from ``SATISFACTION_LEXICON_FILE``."""
+    lexicons = {language: {"negations": list(lexicon["negations"]),
+                           "categories": {c: dict(p) for c, p in lexicon["categories"].items()}}
+                for language, lexicon in LEXICONS.items()}
+    if SATISFACTION_LEXICON_FILE:
+        with open(SATISFACTION_LEXICON_FILE, encoding="utf-8") as f:
+            overrides = json.load(f)
+        for language, lexicon in overrides.items():
+            target = lexicons.setdefault(language, {"negations": [], "categories": {}})
+            target["negations"].extend(lexicon.get("negations", []))
+            for category, phrases in lexicon.get("categories", {}).items():
+                target["categories"].setdefault(category, {}).update(phrases)
+    return lexicons
+
+
+def get_matcher(language=None):
+    """Return the compiled matcher for a language name such as "German", falling back to English."""
+    language = language or DEFAULT_LANGUAGE
+    matcher = _matchers.get(language)
+    if matcher is None:
+        with _matchers_lock:
+            if not _matchers:
+                for name, lexicon in load_lexicons().items():
+                    _matchers[name] = LexiconMatcher(lexicon["categories"], lexicon["negations"])
+            matcher = _matchers.get(language) or _matchers[DEFAULT_LANGUAGE]
+    return matcher
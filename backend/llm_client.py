@@ -0,0 +1,182 @@
+"""Shared OpenAI chat client with one pooled, keep-alive HTTP session per worker process."""
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_API_BASE_URL = os.getenv("OPENAI_API_BASE_URL", "https://api.openai.com/v1")
+
+# Connection pool and timeout settings (seconds)
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "100"))
+LLM_CONNECT_RETRIES = int(os.getenv("LLM_CONNECT_RETRIES", "2"))
+
+DEFAULT_MODEL = "gpt-4"
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+class LLMError(Exception):
+    """Raised when the chat completions API does not return a usable completion."""
+
+
+def get_session():
+    """Return this process's pooled session, creating it after a fork if needed."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=LLM_POOL_SIZE,
+                    max_retries=LLM_CONNECT_RETRIES
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({
+                    "Authorization": f"Bearer {OPENAI_API_KEY}",
+                    "Content-Type": "application/json",
+                    "Connection": "keep-alive"
+                })
+                _session = session
+                _session_pid = pid
+    return _session
+
+
+def default_timeout():
+    """(connect, read) timeout tuple used for every OpenAI request."""
+    return (LLM_CONNECT_TIMEOUT, LLM_READ_TIMEOUT)
+
+
+def warm():
+    """Open a TLS connection to the API so the first real request skips the handshake."""
+    try:
+        started = time.perf_counter()
+        get_session().head(OPENAI_API_BASE_URL, timeout=(LLM_CONNECT_TIMEOUT, LLM_CONNECT_TIMEOUT))
+        print(f"🔥 LLM connection warmed in {(time.perf_counter() - started) * 1000:.0f} ms (pid {os.getpid()})")
+    except requests.RequestException as e:
+        print(f"⚠️ LLM connection warm-up failed: {str(e)}")
+
+
+def chat(messages, model=DEFAULT_MODEL, timeout=None, **params):
+    """Run a chat completion and return its content together with timing and token usage.
+
+    Extra keyword arguments (temperature, max_tokens, ...) are passed through in the payload.
+    Returns a dict with ``content``, ``model``, ``usage``, ``elapsed_ms`` and the ``raw`` response.
+    """
+    payload = {"model": model, "messages": messages}
+    payload.update(params)
+
+    started = time.perf_counter()
+    response = get_session().post(
+        f"{OPENAI_API_BASE_URL}/chat/completions",
+        json=payload,
+        timeout=timeout or default_timeout()
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    try:
+        result = response.json()
+    except ValueError:
+        raise LLMError(f"OpenAI API returned {response.status_code}: {response.text[:200]}")
+
+    if not result.get("choices"):
+        raise LLMError(f"OpenAI API error ({response.status_code}): {result.get('error', result)}")
+
+    usage = result.get("usage", {})
+    print(f"🤖 LLM {model}: {elapsed_ms:.0f} ms, "
+          f"{usage.get('prompt_tokens', 0)} prompt + {usage.get('completion_tokens', 0)} completion tokens")
+
+    return {
+        "content": result["choices"][0]["message"]["content"],
+        "model": result.get("model", model),
+        "usage": usage,
+        "elapsed_ms": round(elapsed_ms, 1),
+        "raw": result
+    }
+
+
+class ChatStream:
+    """Iterates over the content deltas of a streamed chat completion.
+
+    Timing and usage are filled in while iterating: ``first_token_ms`` once the first delta
+    arrives, ``elapsed_ms``, ``usage`` and ``content`` once the stream is finished.
+    """
+
+    def __init__(self, response, model, started):
+        self.response = response
+        self.model = model
+        self.started = started
+        self.first_token_ms = None
+        self.elapsed_ms = None
+        self.usage = {}
+        self.parts = []
+
+    @property
+    def content(self):
+        return "".join(self.parts)
+
+    def __iter__(self):
+        try:
+            for line in self.response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    self.usage = chunk["usage"]
+                for choice in chunk.get("choices", []):
+                    delta = choice.get("delta", {}).get("content")
+                    if not delta:
+                        continue
+                    if self.first_token_ms is None:
+                        self.first_token_ms = round((time.perf_counter() - self.started) * 1000, 1)
+                    self.parts.append(delta)
+                    yield delta
+        finally:
+            self.response.close()
+            self.elapsed_ms = round((time.perf_counter() - self.started) * 1000, 1)
+            print(f"🤖 LLM {self.model} (stream): first token {self.first_token_ms} ms, total {self.elapsed_ms:.0f} ms, "
+                  f"{self.usage.get('prompt_tokens', 0)} prompt + {self.usage.get('completion_tokens', 0)} completion tokens")
+
+
+def chat_stream(messages, model=DEFAULT_MODEL, timeout=None, **params):
+    """Start a streamed chat completion and return a ChatStream over its content deltas.
+
+    The read timeout applies between chunks, so a stalled stream still fails instead of hanging.
+    """
+    payload = {"model": model, "messages": messages, "stream": True, "stream_options": {"include_usage": True}}
+    payload.update(params)
+
+    started = time.perf_counter()
+    response = get_session().post(
+        f"{OPENAI_API_BASE_URL}/chat/completions",
+        json=payload,
+        timeout=timeout or default_timeout(),
+        stream=True
+    )
+    if response.status_code != 200:
+        try:
+            error = response.json().get("error", response.text[:200])
+        except ValueError:
+            error = response.text[:200]
+        response.close()
+        raise LLMError(f"OpenAI API error ({response.status_code}): {error}")
+
+    # SSE bodies are UTF-8 but are not always labelled with a charset
+    response.encoding = "utf-8"
+    return ChatStream(response, model, started)
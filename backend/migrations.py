@@ -0,0 +1,99 @@
+"""Schema migrations, run at boot by ``db.init_db()``.
+
+The schema is managed by Alembic through Flask-Migrate; the revisions live in
+``db_migrations/versions``. After changing models.py, generate and review a revision with:
+
+    cd backend && FLASK_APP=server.py flask db migrate -m "what changed"
+
+``upgrade`` applies every pending revision. Databases created before Alembic (by
+``create_all`` plus the column and index patches below) are first brought to the baseline
+schema and stamped with ``BASELINE_REVISION``, so their tables are never created twice.
+"""
+import os
+
+from alembic import command
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_migrations")
+BASELINE_REVISION = "0001"
+# Arbitrary key for the Postgres advisory lock that serialises upgrades across workers
+UPGRADE_LOCK_ID = 7264001
+
+# Pre-Alembic patches, frozen: the baseline revision already includes them.
+# (table, column, DDL type)
+LEGACY_COLUMNS = [
+    ("case_studies", "provider_name", "VARCHAR(255)"),
+    ("case_studies", "client_name", "VARCHAR(255)"),
+    ("case_studies", "project_name", "VARCHAR(255)"),
+    ("case_studies", "language", "VARCHAR(32)"),
+    ("users", "data_version", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+# (index name, table, columns)
+LEGACY_INDEXES = [
+    ("ix_case_studies_provider_name", "case_studies", ["provider_name"]),
+    ("ix_case_studies_client_name", "case_studies", ["client_name"]),
+    ("ix_case_studies_project_name", "case_studies", ["project_name"]),
+    ("ix_case_studies_user_updated_id", "case_studies", ["user_id", "updated_at", "id"]),
+    ("ix_case_studies_user_created_id", "case_studies", ["user_id", "created_at", "id"]),
+]
+
+# Tables in the baseline revision; a pre-Alembic database may be missing some of them
+LEGACY_TABLES = [
+    "users", "case_studies", "solution_provider_interviews", "client_interviews", "invite_tokens",
+    "labels", "case_study_labels", "feedbacks", "name_extraction_cache", "jobs",
+]
+
+
+def alembic_config(connection=None):
+    config = Config(os.path.join(MIGRATIONS_DIR, "alembic.ini"))
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_legacy(conn):
+    """Bring a database created before Alembic to the baseline schema."""
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    missing = [name for name in LEGACY_TABLES if name not in tables]
+    if missing:
+        # As the baseline revision creates them, not as models.py defines them today: the
+        # revisions after the stamp add the rest
+        baseline = ScriptDirectory.from_config(alembic_config()).get_revision(BASELINE_REVISION).module
+        with Operations.context(MigrationContext.configure(conn)):
+            baseline.upgrade(tables=missing)
+        print(f"🛠️ Created tables {', '.join(missing)}")
+
+    for table, column, ddl_type in LEGACY_COLUMNS:
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        if column not in existing:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+            print(f"🛠️ Added column {table}.{column}")
+
+    for name, table, columns in LEGACY_INDEXES:
+        existing = {ix["name"] for ix in inspector.get_indexes(table)}
+        if name not in existing:
+            conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+            print(f"🛠️ Created index {name}")
+
+
+def upgrade(engine, revision="head"):
+    """Apply the pending Alembic revisions, adopting a pre-Alembic database first."""
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Every gunicorn worker boots through here; only one of them migrates at a time
+            conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": UPGRADE_LOCK_ID})
+
+        tables = set(inspect(conn).get_table_names())
+        if "users" in tables and "alembic_version" not in tables:
+            upgrade_legacy(conn)
+            command.stamp(alembic_config(conn), BASELINE_REVISION)
+            print(f"🛠️ Adopted the existing schema as revision {BASELINE_REVISION}")
+
+        command.upgrade(alembic_config(conn), revision)
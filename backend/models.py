@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, DateTime, func, Table
+from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, DateTime, func, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import json
 
 Base = declarative_base()
 
@@ -17,6 +18,8 @@ class User(Base):
     last_login = Column(DateTime(timezone=True))
     failed_login_attempts = Column(Integer, default=0)
     account_locked_until = Column(DateTime(timezone=True))
+    # Bumped whenever the user's row, case studies or labels change; part of the dashboard ETags
+    data_version = Column(Integer, nullable=False, default=0, server_default='0')
 
     case_studies = relationship('CaseStudy', back_populates='user')
 
@@ -32,34 +35,25 @@ class CaseStudy(Base):
     final_summary_pdf_path = Column(String(500))  # ✅ Add this line
     meta_data_text = Column(Text, nullable=True)  # <-- Added for meta data storage
     linkedin_post = Column(Text, nullable=True)  # Store the generated LinkedIn post
+    provider_name = Column(String(255), nullable=True, index=True)  # Solution provider parsed from the title
+    client_name = Column(String(255), nullable=True, index=True)  # Client parsed from the title
+    project_name = Column(String(255), nullable=True, index=True)  # Project parsed from the title
+    language = Column(String(32), nullable=True)  # Detected language the case study is written in
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
-    # HeyGen video fields
-    video_id = Column(String(100), nullable=True)  # Store HeyGen video ID
-    video_url = Column(Text, nullable=True)  # Store video URL
-    video_status = Column(String(50), nullable=True)  # Store video generation status
-    video_created_at = Column(DateTime(timezone=True), nullable=True)  # When video was created
-
-    # Pictory video fields
-    pictory_storyboard_id = Column(String(100), nullable=True)  # Store Pictory storyboard job ID
-    pictory_render_id = Column(String(100), nullable=True)  # Store Pictory render job ID
-    pictory_video_url = Column(Text, nullable=True)  # Store Pictory video URL
-    pictory_video_status = Column(String(50), nullable=True)  # Store Pictory video generation status
-    pictory_video_created_at = Column(DateTime(timezone=True), nullable=True)  # When Pictory video was created
-
-    # Wondercraft podcast fields
-    podcast_job_id = Column(String(100), nullable=True)  # Store Wondercraft podcast job ID
-    podcast_url = Column(Text, nullable=True)  # Store podcast audio URL
-    podcast_status = Column(String(50), nullable=True)  # Store podcast generation status
-    podcast_created_at = Column(DateTime(timezone=True), nullable=True)  # When podcast was created
-    podcast_script = Column(Text, nullable=True)  # Store the generated podcast script
+    __table_args__ = (
+        # Keyset pagination of a user's case studies (see /api/case_studies)
+        Index('ix_case_studies_user_updated_id', 'user_id', 'updated_at', 'id'),
+        Index('ix_case_studies_user_created_id', 'user_id', 'created_at', 'id'),
+    )
 
     user = relationship('User', back_populates='case_studies')
     solution_provider_interview = relationship('SolutionProviderInterview', uselist=False, back_populates='case_study')
     client_interview = relationship('ClientInterview', uselist=False, back_populates='case_study')
     invite_tokens = relationship('InviteToken', back_populates='case_study')
     labels = relationship('Label', secondary='case_study_labels', back_populates='case_studies')
+    media_jobs = relationship('MediaJob', back_populates='case_study', order_by='MediaJob.id')
 
 
 class SolutionProviderInterview(Base):
@@ -112,6 +106,11 @@ class Label(Base):
     user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Serves both the per-user label list and the (name, user_id) lookup when labelling by name
+        Index('ix_labels_user_id_name', 'user_id', 'name'),
+    )
+
     user = relationship('User')
     case_studies = relationship('CaseStudy', secondary=case_study_labels, back_populates='labels')
 
@@ -124,7 +123,11 @@ class Feedback(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     feedback_type = Column(String(50))  # e.g., 'feature', 'bug', 'improvement'
     status = Column(String(20), default='pending')  # pending, reviewed, addressed
-    
+
+    __table_args__ = (
+        Index('ix_feedbacks_user_created', 'user_id', 'created_at'),
+    )
+
     # Relationship with User
     user = relationship('User', backref='feedbacks')
 
@@ -138,3 +141,98 @@ class Feedback(Base):
             'feedback_type': self.feedback_type,
             'status': self.status
         }
+
+
+class NameExtractionCache(Base):
+    __tablename__ = 'name_extraction_cache'
+    id = Column(Integer, primary_key=True)
+    text_hash = Column(String(64), nullable=False, unique=True)  # sha256 of the intro text sent to the LLM
+    names_json = Column(Text, nullable=False)  # {"lead_entity", "partner_entity", "project_title"}
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Job(Base):
+    __tablename__ = 'jobs'
+    id = Column(String(36), primary_key=True)  # UUID handed to the client
+    kind = Column(String(50), nullable=False)  # Registered handler name, e.g. 'full_case_study'
+    payload = Column(Text, nullable=False)  # JSON arguments for the handler
+    status = Column(String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    result = Column(Text, nullable=True)  # JSON result of a succeeded job
+    error = Column(Text, nullable=True)  # Last error message
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=True, index=True)
+    case_study_id = Column(Integer, ForeignKey('case_studies.id', ondelete='CASCADE'), nullable=True, index=True)
+    run_after = Column(DateTime(timezone=True), nullable=False)  # Not picked up before this time (retry backoff)
+    locked_until = Column(DateTime(timezone=True), nullable=True)  # Visibility timeout of the current attempt
+    locked_by = Column(String(100), nullable=True)  # Worker that holds the current attempt
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'case_study_id': self.case_study_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class Event(Base):
+    __tablename__ = 'events'
+    id = Column(Integer, primary_key=True)  # Also the SSE event id / reconnect cursor
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    kind = Column(String(20), nullable=False)  # 'media' (vendor job transition) or 'job' (generation job status)
+    payload = Column(Text, nullable=False)  # JSON sent as the event data
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        Index('ix_events_user_id_id', 'user_id', 'id'),
+    )
+
+
+class ApiToken(Base):
+    __tablename__ = 'api_tokens'
+    provider = Column(String(50), primary_key=True)  # e.g. 'pictory'
+    access_token = Column(Text, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class MediaJob(Base):
+    __tablename__ = 'media_jobs'
+    id = Column(Integer, primary_key=True)
+    case_study_id = Column(Integer, ForeignKey('case_studies.id', ondelete='CASCADE'), nullable=False, index=True)
+    provider = Column(String(20), nullable=False)  # 'heygen', 'pictory' or 'wondercraft'
+    external_id = Column(String(100), nullable=False)  # HeyGen video ID, Pictory storyboard job ID or Wondercraft job ID
+    status = Column(String(50), nullable=False)  # Vendor-specific; 'completed' and 'failed' are final
+    url = Column(Text, nullable=True)  # The finished video or audio
+    error = Column(Text, nullable=True)  # Why the job failed
+    details = Column(Text, nullable=True)  # JSON of vendor-specific fields, e.g. the Pictory render job ID
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    last_polled_at = Column(DateTime(timezone=True), nullable=True)  # When the media reconciler last asked the vendor
+
+    __table_args__ = (
+        # Status endpoints look jobs up by the vendor's ID
+        Index('ix_media_jobs_provider_external_id', 'provider', 'external_id'),
+        # The media reconciler picks each vendor's least recently polled in-flight jobs
+        Index('ix_media_jobs_provider_status_polled', 'provider', 'status', 'last_polled_at'),
+    )
+
+    case_study = relationship('CaseStudy', back_populates='media_jobs')
+
+    def detail(self, key, default=None):
+        return json.loads(self.details).get(key, default) if self.details else default
@@ -0,0 +1,115 @@
+"""Content-addressed cache for provider/client/project name extraction.
+
+Results are keyed by a hash of the exact intro text that is sent to the LLM. Lookups go
+through an in-process LRU first and then, if enabled, a table shared by all workers.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from sqlalchemy.exc import IntegrityError
+
+from db import SessionLocal
+from models import NameExtractionCache
+
+NAME_CACHE_SIZE = int(os.getenv("NAME_CACHE_SIZE", "512"))
+NAME_CACHE_PERSISTENT = os.getenv("NAME_CACHE_PERSISTENT", "1") == "1"
+
+# Bump when the extraction prompt or model changes so old entries are not reused
+NAME_CACHE_VERSION = "v1"
+
+_entries = OrderedDict()
+_lock = threading.Lock()
+_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+
+def intro_text(text):
+    """Return the slice of a case study that name extraction looks at (first 20 lines / 2000 chars)."""
+    lines = text.split('\n')
+    intro = '\n'.join(lines[:20])
+    if len(intro) > 2000:
+        intro = intro[:2000]
+    return intro
+
+
+def cache_key(intro):
+    return hashlib.sha256(f"{NAME_CACHE_VERSION}\n{intro}".encode("utf-8")).hexdigest()
+
+
+def _remember(key, names):
+    with _lock:
+        _entries[key] = names
+        _entries.move_to_end(key)
+        while len(_entries) > NAME_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+
+def get(intro):
+    """Return cached names for this intro text, or None on a miss."""
+    key = cache_key(intro)
+    with _lock:
+        names = _entries.get(key)
+        if names is not None:
+            _entries.move_to_end(key)
+            _stats["memory_hits"] += 1
+            return dict(names)
+
+    if NAME_CACHE_PERSISTENT:
+        session_db = SessionLocal()
+        try:
+            row = session_db.query(NameExtractionCache).filter_by(text_hash=key).first()
+            if row:
+                names = json.loads(row.names_json)
+                _remember(key, names)
+                with _lock:
+                    _stats["db_hits"] += 1
+                return dict(names)
+        except Exception as e:
+            print(f"⚠️ Name cache lookup failed: {str(e)}")
+        finally:
+            session_db.close()
+
+    with _lock:
+        _stats["misses"] += 1
+    return None
+
+
+def put(intro, names):
+    """Store extracted names for this intro text in every enabled tier."""
+    key = cache_key(intro)
+    _remember(key, dict(names))
+
+    if not NAME_CACHE_PERSISTENT:
+        return
+    session_db = SessionLocal()
+    try:
+        session_db.add(NameExtractionCache(text_hash=key, names_json=json.dumps(names, ensure_ascii=False)))
+        session_db.commit()
+    except IntegrityError:
+        # Another worker stored the same intro first
+        session_db.rollback()
+    except Exception as e:
+        session_db.rollback()
+        print(f"⚠️ Name cache store failed: {str(e)}")
+    finally:
+        session_db.close()
+
+
+def stats():
+    """Hit/miss counters for this worker process."""
+    with _lock:
+        result = dict(_stats)
+        result["size"] = len(_entries)
+    lookups = result["memory_hits"] + result["db_hits"] + result["misses"]
+    result["hit_rate"] = round((result["memory_hits"] + result["db_hits"]) / lookups, 3) if lookups else 0.0
+    return result
+
+
+def clear():
+    """Drop the in-process tier and reset the counters."""
+    with _lock:
+        _entries.clear()
+        for k in _stats:
+            _stats[k] = 0
@@ -0,0 +1,168 @@
+"""Local, deterministic parser for "[Provider] x [Client]: [Project]" case study titles.
+
+Summaries from /generate_summary start with that title line (often wrapped in markdown bold),
+and full case studies put it in an ALL-CAPS title block. Parsing it locally lets name
+extraction skip the LLM whenever the title is well-formed.
+"""
+import re
+
+UNKNOWN_NAMES = {
+    "lead_entity": "Unknown",
+    "partner_entity": "",
+    "project_title": "Unknown Project"
+}
+
+# Unicode dashes/hyphens and the multiplication sign that sometimes replaces " x "
+_DASHES = re.compile(r"[‐‑‒–—―−]")
+_TIMES = re.compile(r"\s*×\s*")
+
+# Markdown wrappers and title prefixes around the title line
+_MARKDOWN_WRAP = re.compile(r"^(?:#{1,6}\s*)?(?:\*\*|__|\*|_)?(.*?)(?:\*\*|__|\*|_)?$")
+_TITLE_PREFIX = re.compile(r"^(?:title|logo\s*&\s*title\s*block)\s*[:\-]\s*", re.IGNORECASE)
+
+# Headers that introduce the title block in full case studies and carry no names themselves
+_TITLE_BLOCK_HEADER = re.compile(r"^(?:\d+\.\s*)?(?:LOGO\s*&\s*)?TITLE(?:\s*BLOCK)?\s*:?$", re.IGNORECASE)
+
+_TITLE = re.compile(r"^(?P<provider>.+?)\s+[xX]\s+(?P<client>.+?)\s*:\s*(?P<project>.+)$")
+_TITLE_DASH = re.compile(r"^(?P<provider>.+?)\s+[xX]\s+(?P<client>.+?)\s+-\s+(?P<project>.+)$")
+_PROVIDER_PROJECT = re.compile(r"^(?P<provider>[^:]+?)\s*:\s*(?P<project>.+)$")
+
+_PLACEHOLDER = re.compile(r"\[[^\]]*\]")
+# Clause or sentence punctuation: a capture containing it is prose, not a company name
+_PROSE_PUNCTUATION = re.compile(r"[,:;!?]|\.\s")
+# Markdown or a "Title:" prefix marks a line as the title
+_TITLE_MARKUP = re.compile(r"^\s*(?:#{1,6}\s|\*\*|__)")
+
+# How many leading non-empty lines to inspect for the title
+MAX_TITLE_LINES = 4
+# Longest unmarked first line that is still taken for a title
+MAX_TITLE_WORDS = 20
+
+
+def normalize_line(line):
+    """Strip markdown, quotes and title prefixes, and normalise dashes in a single line."""
+    line = _DASHES.sub("-", line)
+    line = _TIMES.sub(" x ", line)
+    line = line.strip()
+    line = _MARKDOWN_WRAP.match(line).group(1).strip()
+    line = line.replace("**", "").replace("__", "")
+    line = _TITLE_PREFIX.sub("", line)
+    return line.strip().strip('"').strip()
+
+
+def _plausible(name, max_words=25, max_chars=200):
+    return bool(name) and len(name) <= max_chars and len(name.split()) <= max_words and not _PLACEHOLDER.search(name)
+
+
+def _plausible_company(name):
+    return _plausible(name, max_words=5, max_chars=60) and not _PROSE_PUNCTUATION.search(name)
+
+
+def _is_title_line(raw):
+    return bool(_TITLE_MARKUP.match(raw) or _TITLE_PREFIX.match(raw.strip().strip("*_#").strip()))
+
+
+def _score(provider, client, project, line_index, marked, guessed_case=False):
+    """Confidence that the parsed names are what the LLM would return.
+
+    Only a line marked as the title (markdown, a "Title:" prefix or a title block) or a short
+    first line scores above the LLM threshold; a pattern match inside prose does not. Neither
+    do names from an ALL-CAPS title whose casing had to be guessed.
+    """
+    if not (_plausible_company(provider) and _plausible(project)):
+        return 0.3
+    if not client:
+        # "Provider: Project" - the client name is missing, let the LLM look at the prose
+        return 0.5
+    if not _plausible_company(client):
+        return 0.3
+    if not marked or guessed_case:
+        return 0.6
+    # The title is expected on the first line; each extra line scanned lowers confidence a little
+    return max(0.95 - 0.05 * line_index, 0.8)
+
+
+def _recase_word(word, body):
+    """``(word as the body spells it, whether that is a guess)`` for one word of an ALL-CAPS title."""
+    pattern = re.compile(rf"(?<!\w){re.escape(word)}(?!\w)", re.IGNORECASE)
+    spellings = [match.group(0) for match in pattern.finditer(body)]
+    for spelled in spellings:
+        if not spelled.isupper() and not spelled.islower():
+            return spelled, False
+    if any(spelled.isupper() for spelled in spellings):
+        # An acronym such as NASA
+        return word, False
+    if spellings:
+        # An ordinary word, written in lower case in the body
+        return word.capitalize(), False
+    return (word if len(word) <= 3 else word.capitalize()), True
+
+
+def _recase(name, body):
+    """``(name cased the way the body spells it, whether any word's casing is a guess)``.
+
+    ``name`` comes from an ALL-CAPS title line and ``body`` is the text without its ALL-CAPS lines.
+    """
+    words = [_recase_word(word, body) for word in name.split()]
+    return " ".join(word for word, _ in words), any(guessed for _, guessed in words)
+
+
+def parse_names(text):
+    """Parse provider, client and project names from the title of a case study.
+
+    Returns ``(names, confidence)`` where ``names`` has the same keys as the LLM extractor and
+    ``confidence`` is between 0 and 1.
+    """
+    if not text:
+        return dict(UNKNOWN_NAMES), 0.0
+
+    # (line, whether it is marked as the title)
+    candidates = []
+    in_title_block = False
+    for raw in text.splitlines():
+        line = normalize_line(raw)
+        if not line or set(line) <= set("-=*_#"):
+            continue
+        if _TITLE_BLOCK_HEADER.match(line):
+            in_title_block = True
+            continue
+        marked = in_title_block or _is_title_line(raw) or (
+            not candidates and len(line.split()) <= MAX_TITLE_WORDS and not line.endswith("."))
+        candidates.append((line, marked))
+        in_title_block = False
+        if len(candidates) >= MAX_TITLE_LINES:
+            break
+
+    best = (dict(UNKNOWN_NAMES), 0.0)
+    for index, (line, marked) in enumerate(candidates):
+        match = _TITLE.match(line) or _TITLE_DASH.match(line)
+        if match:
+            provider = match.group("provider").strip()
+            client = match.group("client").strip()
+            project = match.group("project").strip()
+        else:
+            match = _PROVIDER_PROJECT.match(line)
+            if not match or index > 0:
+                continue
+            provider, client, project = match.group("provider").strip(), "", match.group("project").strip()
+
+        guessed_case = False
+        if line.isupper():
+            # ALL-CAPS lines (this one, section headers) say nothing about how a word is cased
+            body = "\n".join(raw for raw in text.splitlines() if not raw.isupper())
+            recased = [_recase(name, body) if name else (name, False) for name in (provider, client, project)]
+            (provider, _), (client, _), (project, _) = recased
+            # Only the company names go into the prompts; a guessed project title is cosmetic
+            guessed_case = recased[0][1] or recased[1][1]
+
+        confidence = _score(provider, client, project, index, marked, guessed_case)
+        if confidence > best[1]:
+            best = ({
+                "lead_entity": provider or "Unknown",
+                "partner_entity": client,
+                "project_title": project or "Unknown Project"
+            }, confidence)
+        if confidence >= 0.8:
+            break
+
+    return best
@@ -0,0 +1,250 @@
+"""Background reconciliation of in-flight HeyGen, Pictory and Wondercraft jobs.
+
+Vendors are registered with ``provider``: the statuses that mean "still in flight" and a poll
+function ``fn(job) -> updates``. ``run`` (started by ``worker.py``) repeatedly fetches the least
+recently polled in-flight ``MediaJob`` rows of every vendor that is due, one query per vendor
+on the (provider, status, last_polled_at) index, polls them concurrently and writes the returned
+column updates back. Every polled job gets a new ``last_polled_at``, changed or not, so the
+batches rotate through all in-flight jobs. The status endpoints only read what the reconciler stored, so browsers never wait on a
+vendor.
+
+A poll function raises ``VendorError`` when the vendor itself is unavailable (network errors,
+rate limits, 5xx, rejected credentials); that vendor is then polled with exponential backoff
+until it answers again. Any other exception only affects the job being polled.
+
+Every stored transition is also recorded as a ``media`` event for the dashboard's event stream.
+A job that moves on to another in-flight status (e.g. a Pictory storyboard that is done and
+now needs its render started) is polled again right away instead of after the interval.
+"""
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, UTC
+
+import requests
+from sqlalchemy import text, update
+
+import events
+from db import SessionLocal, engine
+from models import CaseStudy, MediaJob
+
+RECONCILE_INTERVAL = float(os.getenv("MEDIA_RECONCILE_INTERVAL", "10"))  # seconds between polls of a healthy vendor
+RECONCILE_MAX_BACKOFF = float(os.getenv("MEDIA_RECONCILE_MAX_BACKOFF", "300"))  # seconds
+RECONCILE_BATCH_SIZE = int(os.getenv("MEDIA_RECONCILE_BATCH_SIZE", "25"))  # jobs per vendor per round
+RECONCILE_CONCURRENCY = int(os.getenv("MEDIA_RECONCILE_CONCURRENCY", "4"))  # vendor calls in flight per round
+MEDIA_JOB_TIMEOUT = int(os.getenv("MEDIA_JOB_TIMEOUT", "7200"))  # seconds before an in-flight job is failed
+VENDOR_TIMEOUT = (5, 30)  # (connect, read) seconds for every vendor request
+# Arbitrary key for the Postgres advisory lock that keeps a single reconciler active
+RECONCILER_LOCK_ID = 7264002
+EVENTS_PRUNE_INTERVAL = 3600  # seconds between deletions of expired events
+
+_providers = {}
+_session = None
+_session_lock = threading.Lock()
+
+
+class VendorError(Exception):
+    """Raised by a poll function when the vendor, not the job, is the problem."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class Provider:
+    def __init__(self, name, in_flight, poll):
+        self.name = name
+        self.in_flight = tuple(in_flight)
+        self.poll = poll
+        self.delay = RECONCILE_INTERVAL
+        self.next_poll = 0.0
+
+
+def provider(name, in_flight):
+    """Register ``fn(job) -> dict`` as the poller of one vendor's media jobs.
+
+    ``job`` is a detached ``MediaJob`` whose ``provider`` is ``name``. The returned dict maps
+    MediaJob attribute names to new values; an empty dict means nothing changed. Jobs still in
+    flight ``MEDIA_JOB_TIMEOUT`` seconds after they were created are failed.
+    """
+    def decorator(fn):
+        _providers[name] = Provider(name, in_flight, fn)
+        return fn
+    return decorator
+
+
+def get_session():
+    """Pooled keep-alive HTTP session shared by the poll functions."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = requests.Session()
+    return _session
+
+
+def request(method, url, **kwargs):
+    """Send a vendor request; raise VendorError when the vendor cannot answer right now."""
+    kwargs.setdefault("timeout", VENDOR_TIMEOUT)
+    try:
+        response = get_session().request(method, url, **kwargs)
+    except requests.RequestException as e:
+        raise VendorError(str(e))
+    if response.status_code in (401, 403, 429) or response.status_code >= 500:
+        raise VendorError(f"{response.status_code}: {response.text[:200]}", response.status_code)
+    return response
+
+
+def in_flight_batch(session_db, providers):
+    """``(job, user_id)`` of the least recently polled in-flight jobs of ``providers``.
+
+    Each vendor gets its own query and LIMIT, so a vendor with a long backlog of old jobs does
+    not crowd out the others.
+    """
+    batch = []
+    for p in providers:
+        batch.extend(
+            session_db.query(MediaJob, CaseStudy.user_id)
+            .join(CaseStudy, CaseStudy.id == MediaJob.case_study_id)
+            .filter(MediaJob.provider == p.name, MediaJob.status.in_(p.in_flight))
+            .order_by(MediaJob.last_polled_at.asc().nullsfirst(), MediaJob.id)
+            .limit(RECONCILE_BATCH_SIZE)
+            .all()
+        )
+    return batch
+
+
+def poll_one(job, now):
+    """Return ``(updates, vendor_error)`` for one job."""
+    created = job.created_at
+    if created and created.tzinfo is None:
+        created = created.replace(tzinfo=UTC)
+    if created and now - created > timedelta(seconds=MEDIA_JOB_TIMEOUT):
+        return {"status": "failed", "error": f"Timed out after {MEDIA_JOB_TIMEOUT // 60} minutes"}, None
+    try:
+        return _providers[job.provider].poll(job) or {}, None
+    except VendorError as e:
+        return {}, e
+    except Exception:
+        print(f"❌ {job.provider} poll of media job {job.id} failed")
+        traceback.print_exc()
+        return {}, None
+
+
+def reconcile(providers, executor):
+    """Poll one batch of the in-flight jobs of ``providers`` and store what changed.
+
+    Returns the names of the vendors with a job that moved to another in-flight status.
+    """
+    session_db = SessionLocal()
+    try:
+        batch = in_flight_batch(session_db, providers)
+        session_db.expunge_all()
+    finally:
+        session_db.close()
+    now = datetime.now(UTC)
+    results = list(executor.map(lambda item: poll_one(item[0], now), batch))
+    unavailable = {}
+    for (job, _), (_, error) in zip(batch, results):
+        if error:
+            unavailable.setdefault(job.provider, error)
+    for p in providers:
+        if p.name in unavailable:
+            p.delay = min(p.delay * 2, RECONCILE_MAX_BACKOFF)
+            print(f"⚠️ {p.name} unavailable ({unavailable[p.name]}); next poll in {p.delay:.0f}s")
+        else:
+            p.delay = RECONCILE_INTERVAL
+
+    advanced = set()
+    session_db = SessionLocal()
+    try:
+        if batch:
+            # Keep updated_at: it tracks changes the dashboard shows, and a poll may have none
+            session_db.execute(
+                update(MediaJob)
+                .where(MediaJob.id.in_([job.id for job, _ in batch]))
+                .values(last_polled_at=now, updated_at=MediaJob.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+        for (job, user_id), (updates, _) in zip(batch, results):
+            if not updates:
+                continue
+            row = session_db.query(MediaJob).filter_by(id=job.id).with_for_update().first()
+            # Skip rows that a request (e.g. a retry) changed while the vendor was being polled
+            if not row or row.status != job.status:
+                continue
+            for column, value in updates.items():
+                setattr(row, column, value)
+            events.record(
+                session_db, user_id, "media",
+                case_study_id=row.case_study_id,
+                provider=row.provider,
+                status=row.status,
+                url=row.url,
+                error=row.error
+            )
+            # A vendor in backoff is not polled again early
+            if row.status != job.status and row.status in _providers[row.provider].in_flight \
+                    and row.provider not in unavailable:
+                advanced.add(row.provider)
+            print(f"🔄 {row.provider} case study {row.case_study_id}: {job.status} → {row.status}")
+        session_db.commit()
+    except Exception:
+        session_db.rollback()
+        raise
+    finally:
+        session_db.close()
+    return advanced
+
+
+def _acquire_leadership():
+    """On Postgres, hold an advisory lock so only one reconciler polls the vendors.
+
+    Returns the connection holding the lock (None on other databases), or False if another
+    reconciler is active.
+    """
+    if engine.dialect.name != "postgresql":
+        return None
+    connection = engine.connect()
+    if connection.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": RECONCILER_LOCK_ID}).scalar():
+        return connection
+    connection.close()
+    return False
+
+
+def run(stop_event):
+    """Reconcile every registered vendor until ``stop_event`` is set."""
+    leader = _acquire_leadership()
+    while leader is False and not stop_event.is_set():
+        stop_event.wait(RECONCILE_INTERVAL)
+        leader = _acquire_leadership()
+
+    print(f"🔄 Media reconciler polling {', '.join(_providers) or 'no vendors'} every {RECONCILE_INTERVAL:.0f}s")
+    next_prune = 0.0
+    with ThreadPoolExecutor(max_workers=RECONCILE_CONCURRENCY, thread_name_prefix="reconcile") as executor:
+        try:
+            while not stop_event.is_set():
+                if time.monotonic() >= next_prune:
+                    try:
+                        events.prune()
+                    except Exception as e:
+                        print(f"❌ Could not prune old events: {str(e)}")
+                    next_prune = time.monotonic() + EVENTS_PRUNE_INTERVAL
+                due = [p for p in _providers.values() if time.monotonic() >= p.next_poll]
+                if due:
+                    advanced = set()
+                    try:
+                        advanced = reconcile(due, executor)
+                    except Exception as e:
+                        for p in due:
+                            p.delay = min(p.delay * 2, RECONCILE_MAX_BACKOFF)
+                        print(f"❌ Could not reconcile media jobs: {str(e)}")
+                    for p in due:
+                        p.next_poll = time.monotonic() + (0 if p.name in advanced else p.delay)
+                next_poll = min((p.next_poll for p in _providers.values()), default=time.monotonic() + RECONCILE_INTERVAL)
+                stop_event.wait(max(next_poll - time.monotonic(), 0.5))
+        finally:
+            if leader:
+                leader.close()
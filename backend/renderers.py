@@ -0,0 +1,99 @@
+"""CPU-bound renderers for generated case studies: sentiment chart, satisfaction gauge and PDF.
+
+These are top-level functions with plain arguments so ``stages`` can run them in its process
+pool; they must not depend on the Flask app or the database. matplotlib, plotly and fpdf are
+imported on first use, so processes that use the SVG charts (``CHART_RENDERER=svg``) never load
+the charting libraries.
+"""
+import os
+import uuid
+from datetime import datetime
+
+OUTPUT_DIR = "generated_pdfs"
+
+
+def generate_sentiment_chart(sentiment_score, output_dir=OUTPUT_DIR, filename=None):
+    """Render the 0-10 sentiment score as a bar chart PNG and return its filename.
+
+    Without a ``filename`` the chart gets a unique one. A given filename is written atomically
+    so concurrent workers rendering the same chart never serve a half-written file.
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-GUI backend to avoid Tkinter and main thread errors
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(4, 1.5))
+    color = 'green' if sentiment_score > 6 else 'yellow' if sentiment_score > 4 else 'red'
+    ax.barh(['Sentiment'], [sentiment_score], color=color)
+    ax.set_xlim(0, 10)
+    ax.set_xlabel('Score (0-10)')
+    ax.set_title('Sentiment Score')
+    plt.tight_layout()
+    os.makedirs(output_dir, exist_ok=True)
+    if filename is None:
+        filename = f"sentiment_chart_{uuid.uuid4().hex}.png"
+    filepath = os.path.join(output_dir, filename)
+    tmp_path = f"{filepath}.{uuid.uuid4().hex}.tmp"
+    plt.savefig(tmp_path, format="png")
+    plt.close(fig)
+    os.replace(tmp_path, filepath)
+    return filename
+
+
+def generate_client_satisfaction_gauge(category):
+    """Return the Plotly figure JSON of the client satisfaction gauge for a category."""
+    import plotly.graph_objects as go
+
+    # Map categories to values and colors for the gauge
+    category_map = {
+        "Very Bad": (1, "#ef4444"),
+        "Bad": (3, "#f59e42"),
+        "Neutral": (5, "#fbbf24"),
+        "Good": (7, "#a3e635"),
+        "Very Good": (9, "#22c55e")
+    }
+    value, color = category_map.get(category, (5, "#fbbf24"))
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=value,
+        number={'valueformat': '', 'font': {'size': 1}, 'suffix': ''},  # Hide the number
+        title={'text': f"Client Satisfaction: <b>{category}</b>", 'font': {'size': 22}},
+        gauge={
+            'axis': {'range': [0, 10], 'tickvals': [1, 3, 5, 7, 9], 'ticktext': ["Very Bad", "Bad", "Neutral", "Good", "Very Good"], 'tickwidth': 2, 'tickcolor': "#888"},
+            'bar': {'color': color, 'thickness': 0.3},
+            'steps': [
+                {'range': [0, 2], 'color': "#ef4444"},
+                {'range': [2, 4], 'color': "#f59e42"},
+                {'range': [4, 6], 'color': "#fbbf24"},
+                {'range': [6, 8], 'color': "#a3e635"},
+                {'range': [8, 10], 'color': "#22c55e"},
+            ],
+            'threshold': {
+                'line': {'color': "black", 'width': 8},
+                'thickness': 0.9,
+                'value': value
+            }
+        }
+    ))
+    fig.update_layout(height=300, margin=dict(t=40, b=0, l=0, r=0))
+    return fig.to_json()
+
+
+def render_case_study_pdf(main_story, output_dir=OUTPUT_DIR):
+    """Render the case study text to a PDF and return ``(pdf_filename, pdf_path)``."""
+    from fpdf import FPDF
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    pdf_filename = f"final_case_study_{timestamp}.pdf"
+    pdf_path = os.path.join(output_dir, pdf_filename)
+    os.makedirs(output_dir, exist_ok=True)
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font("Arial", size=12)
+    for line in main_story.split("\n"):
+        pdf.multi_cell(0, 10, line)
+
+    pdf.output(pdf_path)
+    return pdf_filename, pdf_path
@@ -1,14 +1,28 @@
-from flask import Flask, jsonify, send_from_directory, request, send_file, session, Response
+import startup
+from flask import Flask, jsonify, send_from_directory, request, send_file, session, Response, stream_with_context
 import requests
 import os
 from datetime import datetime, timedelta, UTC  # Add UTC import
 from dotenv import load_dotenv
-from fpdf import FPDF
 import re
 import uuid
 import json
-from langdetect import detect
+import time
 from db import SessionLocal, init_db
+import migrations
+import llm_client
+import name_cache
+import name_parser
+from language import detect_language
+import jobs
+import events
+import reconciler
+import token_cache
+import analytics
+import artifacts
+import renderers
+import stages
+from stages import Stage
 from models import (
     User,
     CaseStudy,
@@ -16,22 +30,23 @@ from models import (
     ClientInterview,
     InviteToken,
     Label,
-    Feedback
+    Feedback,
+    MediaJob,
+    Base
 )
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import load_only, selectinload
 from functools import wraps
 from flask_jwt_extended import jwt_required, get_jwt_identity
-import matplotlib
-matplotlib.use('Agg')  # Use non-GUI backend to avoid Tkinter and main thread errors
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-import plotly.express as px
-import io
-import base64
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from flask_migrate import Migrate
 from flask_cors import CORS
+import click
+import base64
+import hashlib
+
+startup.mark("imports")
 
 load_dotenv()
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
@@ -60,6 +75,10 @@ WONDERCRAFT_API_KEY = os.getenv("WONDERCRAFT_API_KEY")
 WONDERCRAFT_API_BASE_URL = "https://api.wondercraft.ai/v1"
 
 init_db()
+startup.mark("init_db")
+
+# `flask db migrate/upgrade/downgrade`; db_migrations/env.py reads the engine and metadata itself
+migrate = Migrate(app, Base, directory=migrations.MIGRATIONS_DIR)
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
@@ -83,6 +102,13 @@ openai_config = {
     "frequency_penalty": 0.2   # Keeps phrasing varied
 }
 
+# Long endpoints queue a background job instead of running inline when the caller passes
+# "async": true; this makes that the default for callers that do not say either way
+JOBS_ASYNC_DEFAULT = os.getenv("JOBS_ASYNC_DEFAULT", "0") == "1"
+
+# Titles parsed locally with at least this confidence skip the LLM name extraction
+NAME_PARSER_MIN_CONFIDENCE = float(os.getenv("NAME_PARSER_MIN_CONFIDENCE", "0.8"))
+
 # Initialize feedback sessions dictionary
 feedback_sessions = {}
 
@@ -98,16 +124,9 @@ def clean_text(text):
             .replace("£", "GBP ")
     )
 
-def extract_names_from_case_study_llm(text):
-    """Extract solution provider name, client name, and project name using OpenAI LLM for maximum accuracy."""
+def extract_names_from_intro_llm(intro_text):
+    """Ask the LLM for the names in an intro excerpt. Returns None if the call or parsing fails."""
     try:
-        # Take only the first part of the text to save tokens and focus on the most relevant content
-        lines = text.split('\n')
-        # Get the first 20 lines or first 2000 characters, whichever comes first
-        intro_text = '\n'.join(lines[:20])
-        if len(intro_text) > 2000:
-            intro_text = intro_text[:2000]
-        
         # Add debugging output
         print(f"🔍 Analyzing case study excerpt for name extraction:")
         print(f"📝 Intro text: {intro_text}")
@@ -137,25 +156,15 @@ Return ONLY a JSON object with these exact keys:
 
 If any entity cannot be found, use "Unknown" for that field. Ensure the JSON is valid and properly formatted."""
 
-        headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": openai_config["model"],
-            "messages": [{"role": "system", "content": prompt}],
-            "temperature": 0.1,  # Lower temperature for more consistent extraction
-            "max_tokens": 200
-        }
-
-        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-        result = response.json()
-        
-        print(f"🤖 OpenAI API response: {result}")
+        result = llm_client.chat(
+            [{"role": "system", "content": prompt}],
+            model=openai_config["model"],
+            temperature=0.1,  # Lower temperature for more consistent extraction
+            max_tokens=200
+        )
         
-        if "choices" in result and len(result["choices"]) > 0:
-            extracted_text = result["choices"][0]["message"]["content"].strip()
+        if result["content"]:
+            extracted_text = result["content"].strip()
             print(f"✅ LLM extracted text: '{extracted_text}'")
             
             # Try to parse JSON response
@@ -188,53 +197,76 @@ If any entity cannot be found, use "Unknown" for that field. Ensure the JSON is
             except json.JSONDecodeError as e:
                 print(f"❌ Failed to parse JSON response: {e}")
                 print(f"Raw response: {extracted_text}")
-                # Fallback to old method
-                return extract_names_from_case_study_fallback(text)
+                return None
         else:
-            print(f"❌ OpenAI API error: {result}")
-            # Fallback to old method
-            return extract_names_from_case_study_fallback(text)
+            print(f"❌ OpenAI API returned an empty completion")
+            return None
             
     except Exception as e:
         print(f"❌ Error extracting names with LLM: {str(e)}")
-        # Fallback to old method
-        return extract_names_from_case_study_fallback(text)
+        return None
 
 def extract_names_from_case_study_fallback(text):
-    """Fallback method using the original regex-based extraction."""
-    # normalize dashes
-    text = text.replace("—", "-").replace("–", "-")
-    lines = text.splitlines()
-    if lines:
-        first = lines[0].strip()
-        # strip markdown bold if present
-        if first.startswith("**") and first.endswith("**"):
-            first = first[2:-2].strip()
-
-        # now expect "Provider x Client: Project Name"
-        if ":" in first:
-            left, proj = first.split(":", 1)
-            proj = proj.strip()
-            if " x " in left:
-                provider, client = left.split(" x ", 1)
-            else:
-                provider, client = left.strip(), ""
-            return {
-                "lead_entity": provider.strip() or "Unknown",
-                "partner_entity": client.strip(),
-                "project_title": proj or "Unknown Project"
-            }
+    """Fallback method using the local title parser."""
+    names, _confidence = name_parser.parse_names(text)
+    return names
+
+def extract_names_with_method(text):
+    """Extract names through the tiers: local title parser, cache, then LLM.
+
+    Returns ``(names, method)`` where method is "parser", "cache", "llm" or "fallback".
+    """
+    names, confidence = name_parser.parse_names(text)
+    if confidence >= NAME_PARSER_MIN_CONFIDENCE:
+        return names, "parser"
+
+    intro_text = name_cache.intro_text(text)
+    cached = name_cache.get(intro_text)
+    if cached:
+        print(f"🗂️ Name cache hit: {name_cache.stats()}")
+        return cached, "cache"
+
+    llm_names = extract_names_from_intro_llm(intro_text)
+    if llm_names is None:
+        # Failures are not cached so the next call retries the LLM
+        return names, "fallback"
+    name_cache.put(intro_text, llm_names)
+    return llm_names, "llm"
 
-    # fallback to old logic (if you really need it)
+def extract_names_from_case_study(text):
+    """Extract names, only calling the LLM when the title cannot be parsed confidently."""
+    names, method = extract_names_with_method(text)
+    print(f"🏷️ Names extracted via {method}: {names}")
+    return names
+
+def apply_names_to_case_study(case_study, names):
+    """Store extracted names on the case study and rebuild its title from them."""
+    case_study.provider_name = names["lead_entity"]
+    case_study.client_name = names["partner_entity"]
+    case_study.project_name = names["project_title"]
+    case_study.title = f"{names['lead_entity']} x {names['partner_entity']}: {names['project_title']}"
+
+def stored_names(case_study):
+    """Names persisted on the case study, or None if they have not been stored yet."""
+    if case_study.provider_name is None and case_study.project_name is None:
+        return None
     return {
-        "lead_entity": "Unknown",
-        "partner_entity": "",
-        "project_title": "Unknown Project"
+        "lead_entity": case_study.provider_name or "Unknown",
+        "partner_entity": case_study.client_name or "",
+        "project_title": case_study.project_name or "Unknown Project"
     }
 
-def extract_names_from_case_study(text):
-    """Extract names using LLM with fallback to regex method."""
-    return extract_names_from_case_study_llm(text)
+def case_study_names(case_study):
+    """Stored names for a case study, extracting and storing them once if they are missing."""
+    names = stored_names(case_study)
+    if names is None:
+        provider_interview = case_study.solution_provider_interview
+        source = case_study.final_summary or (provider_interview.summary if provider_interview else "") or ""
+        names = extract_names_from_case_study(source)
+        case_study.provider_name = names["lead_entity"]
+        case_study.client_name = names["partner_entity"]
+        case_study.project_name = names["project_title"]
+    return names
 
 @app.route("/")
 def serve_index():
@@ -250,7 +282,12 @@ def create_session():
         "model": "gpt-4o-realtime-preview-2024-12-17",
         "voice": "coral"
     }
-    response = requests.post("https://api.openai.com/v1/realtime/sessions", headers=headers, json=data)
+    response = llm_client.get_session().post(
+        f"{llm_client.OPENAI_API_BASE_URL}/realtime/sessions",
+        headers=headers,
+        json=data,
+        timeout=llm_client.default_timeout()
+    )
     return jsonify(response.json())
 
 @app.route("/save_transcript", methods=["POST"])
@@ -298,51 +335,9 @@ def save_transcript():
     finally:
         session.close()
 
-from langdetect import detect
-
-def detect_language(text):
-    try:
-        # Get the language code
-        lang_code = detect(text)
-        
-        # Map language codes to full names
-        language_map = {
-            'en': 'English',
-            'es': 'Spanish',
-            'fr': 'French',
-            'de': 'German',
-            'it': 'Italian',
-            'pt': 'Portuguese',
-            'ru': 'Russian',
-            'zh': 'Chinese',
-            'ja': 'Japanese',
-            'ko': 'Korean',
-            'ar': 'Arabic',
-            'hi': 'Hindi',
-            'pl': 'Polish',
-            'sq': 'Albanian',  # Added Albanian
-            # Add more languages as needed
-        }
-        
-        return language_map.get(lang_code, 'English')  # Default to English if language not in map
-    except:
-        return 'English'  # Default to English if detection fails
-
-@app.route("/generate_summary", methods=["POST"])
-def generate_summary():
-    try:
-        data = request.get_json()
-        transcript = data.get("transcript", "")
-
-        if not transcript:
-            return jsonify({"status": "error", "message": "Transcript is missing."}), 400
-
-        # Detect language from transcript
-        detected_language = detect_language(transcript)
-        print(detected_language)
-        
-        # Use the detected language in the prompt
-        prompt = f"""
+def build_provider_summary_prompt(transcript, detected_language):
+    """Prompt that turns a provider interview transcript into the structured case study summary."""
+    return f"""
         You are a professional case study writer. Your job is to generate a **rich, structured, human-style business case study** from a transcript of a real voice interview.
 
         IMPORTANT: Write the entire case study in {detected_language}. This includes all sections, quotes, and any additional content.
@@ -416,28 +411,36 @@ def generate_summary():
         {transcript}
         """
 
-        headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "Content-Type": "application/json"
-        }
+@app.route("/generate_summary", methods=["POST"])
+def generate_summary():
+    try:
+        data = request.get_json()
+        transcript = data.get("transcript", "")
 
-        payload = {
-            "model": openai_config["model"],
-            "messages": [{"role": "system", "content": prompt}],
-            "temperature": openai_config["temperature"],
-            "top_p": openai_config["top_p"],
-            "presence_penalty": openai_config["presence_penalty"],
-            "frequency_penalty": openai_config["frequency_penalty"]
-        }
+        if not transcript:
+            return jsonify({"status": "error", "message": "Transcript is missing."}), 400
 
-        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-        result = response.json()
-        case_study = result["choices"][0]["message"]["content"]
+        # Detect language from transcript
+        detected_language = detect_language(transcript)
+        print(detected_language)
+        
+        # Use the detected language in the prompt
+        prompt = build_provider_summary_prompt(transcript, detected_language)
+
+        result = llm_client.chat(
+            [{"role": "system", "content": prompt}],
+            model=openai_config["model"],
+            temperature=openai_config["temperature"],
+            top_p=openai_config["top_p"],
+            presence_penalty=openai_config["presence_penalty"],
+            frequency_penalty=openai_config["frequency_penalty"]
+        )
+        case_study = result["content"]
         cleaned = clean_text(case_study)
         names = extract_names_from_case_study(cleaned)
         # First save to DB and get case_study_id
         provider_session_id = str(uuid.uuid4())  # 🔁 Generate a session ID now
-        case_study_id = store_solution_provider_session(provider_session_id, cleaned)
+        case_study_id = store_solution_provider_session(provider_session_id, cleaned, names, detected_language)
 
         return jsonify({
             "status": "success",
@@ -453,6 +456,159 @@ def generate_summary():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def sse_event(event, data):
+    """Format one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"  # Stop proxies from buffering the stream
+}
+
+@app.route("/generate_summary_stream", methods=["POST"])
+def generate_summary_stream():
+    """Streaming variant of /generate_summary that relays the summary over SSE as it is written.
+
+    Emits ``token`` events with cleaned text chunks, then one ``done`` event with the same
+    payload as /generate_summary (or an ``error`` event). The case study is stored only once
+    the stream has finished.
+    """
+    data = request.get_json()
+    transcript = data.get("transcript", "")
+
+    if not transcript:
+        return jsonify({"status": "error", "message": "Transcript is missing."}), 400
+
+    detected_language = detect_language(transcript)
+    print(detected_language)
+    prompt = build_provider_summary_prompt(transcript, detected_language)
+
+    def generate():
+        try:
+            stream = llm_client.chat_stream(
+                [{"role": "system", "content": prompt}],
+                model=openai_config["model"],
+                temperature=openai_config["temperature"],
+                top_p=openai_config["top_p"],
+                presence_penalty=openai_config["presence_penalty"],
+                frequency_penalty=openai_config["frequency_penalty"]
+            )
+            chunks = []
+            for delta in stream:
+                chunk = clean_text(delta)
+                chunks.append(chunk)
+                yield sse_event("token", {"text": chunk})
+            print(f"⏱️ /generate_summary_stream time to first token: {stream.first_token_ms} ms (total {stream.elapsed_ms} ms)")
+
+            cleaned = "".join(chunks)
+            names = extract_names_from_case_study(cleaned)
+            provider_session_id = str(uuid.uuid4())
+            case_study_id = store_solution_provider_session(provider_session_id, cleaned, names, detected_language)
+
+            yield sse_event("done", {
+                "status": "success",
+                "text": cleaned,
+                "names": names,
+                "provider_session_id": provider_session_id,
+                "case_study_id": case_study_id,
+                "time_to_first_token_ms": stream.first_token_ms
+            })
+        except Exception as e:
+            print(f"❌ Error streaming summary: {str(e)}")
+            yield sse_event("error", {"status": "error", "message": str(e)})
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=SSE_HEADERS)
+
+def wants_async(data=None):
+    """True when the caller asked for the job-queue variant of a long endpoint."""
+    if request.args.get("async") in ("1", "true"):
+        return True
+    return bool((data or {}).get("async", JOBS_ASYNC_DEFAULT))
+
+def enqueue_job_response(kind, payload, case_study_id=None, max_attempts=None):
+    """Queue a background job and return the 202 response pointing at its status URL."""
+    job_id = jobs.enqueue(
+        kind,
+        payload,
+        user_id=session.get('user_id'),
+        case_study_id=case_study_id,
+        max_attempts=max_attempts
+    )
+    return jsonify({
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": f"/api/jobs/{job_id}",
+        "result_url": f"/api/jobs/{job_id}/result"
+    }), 202
+
+def run_endpoint_job(runner, payload):
+    """Run a ``(payload, status_code)`` runner as a job: 4xx is permanent, 5xx is retried."""
+    result, status_code = runner(payload["case_study_id"])
+    if status_code >= 500:
+        raise Exception(result.get("message") or result.get("error") or "Job failed")
+    if status_code >= 400:
+        raise jobs.PermanentJobError(result.get("message") or result.get("error") or "Job rejected")
+    return result
+
+@jobs.handler("full_case_study")
+def full_case_study_job(payload):
+    return run_endpoint_job(run_full_case_study, payload)
+
+@jobs.handler("heygen_video")
+def heygen_video_job(payload):
+    return run_endpoint_job(start_heygen_video, payload)
+
+def get_visible_job(job_id):
+    """Job dict if it exists and belongs to the current user (anonymous client-page jobs are public by id)."""
+    job = jobs.get(job_id)
+    if not job:
+        return None
+    if job["user_id"] is not None and job["user_id"] != session.get('user_id'):
+        return None
+    job.pop("user_id")
+    return job
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job_status(job_id):
+    job = get_visible_job(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    return jsonify({"status": "success", "job": job})
+
+@app.route("/api/jobs/<job_id>/result", methods=["GET"])
+def get_job_result(job_id):
+    """Result of a finished job: 200 with the endpoint payload, 202 while pending, 500 on failure."""
+    job = get_visible_job(job_id)
+    if not job:
+        return jsonify({"status": "error", "message": "Job not found"}), 404
+    if job["status"] == "succeeded":
+        return jsonify(job["result"])
+    if job["status"] == "failed":
+        return jsonify({"status": "error", "message": job["error"], "job": job}), 500
+    return jsonify({"status": job["status"], "job": job}), 202
+
+@app.route("/api/events", methods=["GET"])
+def api_events():
+    """Server-sent stream of the user's ``media`` and ``job`` events.
+
+    Resumes after ``Last-Event-ID`` (sent by EventSource on reconnect) or ``?cursor=``;
+    without either it starts with the next event.
+    """
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('cursor')
+    if cursor is not None:
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            return jsonify({'success': False, 'message': 'Invalid cursor'}), 400
+    return Response(
+        stream_with_context(events.stream(user_id, cursor)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route("/save_provider_summary", methods=["POST"])
 def save_provider_summary():
     session = SessionLocal()
@@ -474,15 +630,11 @@ def save_provider_summary():
 
         # ✅ Extract names from the new summary
         names = extract_names_from_case_study(updated_summary)
-        lead_entity = names["lead_entity"]
-        partner_entity = names["partner_entity"]
-        project_title = names["project_title"]
-        new_title = f"{lead_entity} x {partner_entity}: {project_title}"
 
-        # ✅ Update CaseStudy title too
+        # ✅ Update CaseStudy title and name fields too
         case_study = session.query(CaseStudy).filter_by(id=interview.case_study_id).first()
         if case_study:
-            case_study.title = new_title
+            apply_names_to_case_study(case_study, names)
 
         session.commit()
 
@@ -570,13 +722,13 @@ def extract_names():
             return jsonify({"status": "error", "message": "Missing summary"}), 400
 
         print(f"🎯 Starting name extraction for summary length: {len(summary)}")
-        names = extract_names_from_case_study(summary)
-        print(f"🎯 Name extraction result: {names}")
+        names, method = extract_names_with_method(summary)
+        print(f"🎯 Name extraction result ({method}): {names}")
         
         return jsonify({
             "status": "success", 
             "names": names,
-            "method": "llm"  # Add method indicator
+            "method": method  # Add method indicator
         })
     except Exception as e:
         print(f"❌ Error in extract_names endpoint: {str(e)}")
@@ -594,7 +746,14 @@ def generate_client_summary():
             return jsonify({"status": "error", "message": "Transcript is missing."}), 400
         if not token:
             return jsonify({"status": "error", "message": "Missing token"}), 400
-        detected_language = detect_language(transcript)
+
+        invite = session.query(InviteToken).filter_by(token=token).first()
+        if not invite:
+            return jsonify({"status": "error", "message": "Invalid token"}), 404
+
+        # The client summary is written in the case study's language
+        case_study = session.query(CaseStudy).filter_by(id=invite.case_study_id).first()
+        detected_language = case_study_language(case_study, transcript) if case_study else detect_language(transcript)
         print(detected_language)
         
 
@@ -636,35 +795,21 @@ Transcript:
 {transcript}
 """
 
-        headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": openai_config["model"],
-            "messages": [
-                {"role": "system", "content": prompt},
-            ],
-            "temperature": openai_config["temperature"],
-            "top_p": openai_config["top_p"],
-            "presence_penalty": openai_config["presence_penalty"],
-            "frequency_penalty": openai_config["frequency_penalty"]
-        }
-
-        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-        result = response.json()
-        summary = result["choices"][0]["message"]["content"]
+        result = llm_client.chat(
+            [{"role": "system", "content": prompt}],
+            model=openai_config["model"],
+            temperature=openai_config["temperature"],
+            top_p=openai_config["top_p"],
+            presence_penalty=openai_config["presence_penalty"],
+            frequency_penalty=openai_config["frequency_penalty"]
+        )
+        summary = result["content"]
         cleaned = clean_text(summary)
 
-        invite = session.query(InviteToken).filter_by(token=token).first()
-        if not invite:
-            return jsonify({"status": "error", "message": "Invalid token"}), 404
-
         client_interview = session.query(ClientInterview).filter_by(case_study_id=invite.case_study_id).first()
         if client_interview:
             client_interview.summary = cleaned
-            session.commit()
+        session.commit()
 
         return jsonify({
             "status": "success",
@@ -698,10 +843,11 @@ def store_client_summary(case_study_id, client_summary):
 def download_pdf(filename):
     return send_file(os.path.join("generated_pdfs", filename), as_attachment=True)
 
-def store_solution_provider_session(provider_session_id, cleaned_case_study):
+def store_solution_provider_session(provider_session_id, cleaned_case_study, extracted_names=None, language=None):
     session_db = SessionLocal()
     try:
-        extracted_names = extract_names_from_case_study(cleaned_case_study)
+        if extracted_names is None:
+            extracted_names = extract_names_from_case_study(cleaned_case_study)
         # Use the currently logged-in user
         from flask import session as flask_session
         user_id = flask_session.get('user_id')
@@ -714,9 +860,10 @@ def store_solution_provider_session(provider_session_id, cleaned_case_study):
         # Create the CaseStudy (links to user)
         case_study = CaseStudy(
             user_id=user.id,
-            title=f"{extracted_names['lead_entity']} x {extracted_names['partner_entity']}: {extracted_names['project_title']}",
-            final_summary=None  # We fill this later, after full doc is generated
+            final_summary=None,  # We fill this later, after full doc is generated
+            language=language or detect_language(cleaned_case_study)
         )
+        apply_names_to_case_study(case_study, extracted_names)
         session_db.add(case_study)
         session_db.commit()
 
@@ -781,12 +928,13 @@ def client_interview(token):
         if not provider_interview:
             return jsonify({"status": "error", "message": "Provider interview not found"}), 404
 
-        # 3. Mark the invite token as used
+        # 3. Use the stored names (extracted once for rows saved before they were persisted)
+        extracted_names = case_study_names(case_study)
+
+        # 4. Mark the invite token as used
         invite.used = True
         session.commit()
 
-        # 4. Extract names using LLM for accuracy
-        extracted_names = extract_names_from_case_study(provider_interview.summary)
         provider_name = extracted_names.get("lead_entity", "Unknown")
         client_name = extracted_names.get("partner_entity", "")
         project_name = extracted_names.get("project_title", "Unknown Project")
@@ -843,38 +991,11 @@ def generate_client_interview_link():
     finally:
         session.close()
 
-@app.route("/generate_full_case_study", methods=["POST"])
-def generate_full_case_study():
-    session = SessionLocal()
-    try:
-        data = request.get_json()
-        case_study_id = data.get("case_study_id")
-
-        if not case_study_id:
-            return jsonify({"status": "error", "message": "Missing case_study_id"}), 400
-
-        case_study = session.query(CaseStudy).filter_by(id=case_study_id).first()
-        if not case_study:
-            return jsonify({"status": "error", "message": "Case study not found"}), 404
-
-        provider_interview = case_study.solution_provider_interview
-        client_interview = case_study.client_interview
-        
-
-        if not provider_interview:
-            return jsonify({"status": "error", "message": "Provider summary is required."}), 400
-
-        provider_summary = provider_interview.summary or ""
-        client_summary = client_interview.summary if client_interview else ""
-        detected_language = detect_language(provider_summary)
-        print(detected_language)
-        
-        # Check if client story exists
-        has_client_story = bool(client_interview and client_summary.strip())
-        
-        if has_client_story:
-            # Original prompt for when both provider and client stories exist
-            full_prompt = f"""
+def build_full_case_study_prompt(provider_summary, client_summary, has_client_story, detected_language):
+    """Prompt that merges the provider and (optional) client summaries into the full case study."""
+    if has_client_story:
+        # Original prompt for when both provider and client stories exist
+        return f"""
             You are a top-tier business case study writer, creating professional, detailed, and visually attractive stories for web or PDF (inspired by Storydoc, Adobe, and top SaaS companies).
  
             IMPORTANT: Write the entire case study in {detected_language}. This includes all sections, quotes, and any additional content.
@@ -921,9 +1042,9 @@ def generate_full_case_study():
             Client Summary:
             {client_summary}
                         """
-        else:
-            # New prompt for when only provider story exists
-            full_prompt = f"""
+    else:
+        # New prompt for when only provider story exists
+        return f"""
             You are a top-tier business case study writer, creating professional, detailed, and visually attractive stories for web or PDF (inspired by Storydoc, Adobe, and top SaaS companies).
  
             IMPORTANT: Write the entire case study in {detected_language}. This includes all sections, quotes, and any additional content.
@@ -983,312 +1104,290 @@ def generate_full_case_study():
             - **Provider:** "The client's feedback helped us refine the solution in unexpected ways."
             """
 
-        headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "Content-Type": "application/json"
-        }
 
-        payload = {
-            "model": openai_config["model"],
-            "messages": [
-                {"role": "system", "content": full_prompt},
-            ],
-            "temperature": 0.5,
-            "top_p": 0.9
-        }
+def build_case_study_metadata(cleaned, client_summary, language=None):
+    """Split the meta sections out of a generated case study, run the client analytics and render the PDF.
+
+    ``language`` (as returned by ``detect_language``) selects the satisfaction lexicon. The
+    independent stages run concurrently through ``stages``; their timings are stored in
+    ``meta_data["stage_timings_ms"]``. Returns ``(main_story, meta_data, pdf_filename, pdf_path)``.
+    """
+    main_story, meta_data = analytics.split_metadata_sections(cleaned, client_summary)
+
+    # takeaways (LLM) and sentiment run on threads, PDF rendering on a process. Raster chart and
+    # gauge lookups are memoised (only the first use of a bucket renders) and also run on a process;
+    # SVG charts are cheap enough for a thread.
+    graph = [Stage("pdf", renderers.render_case_study_pdf, args=(main_story,), kind="cpu")]
+    if client_summary:
+        graph += [
+            Stage("takeaways", analytics.extract_client_takeaways, args=(client_summary, openai_config["model"])),
+            Stage("sentiment", analytics.analyze_sentiment, args=(client_summary, language)),
+            Stage("sentiment_chart", artifacts.sentiment_chart_src, deps=("sentiment",),
+                  args=lambda r: (r["sentiment"]["overall_sentiment"]["score"],), kind=artifacts.STAGE_KIND, optional=True),
+            Stage("satisfaction_gauge", artifacts.satisfaction_visualization, deps=("sentiment",),
+                  args=lambda r: (r["sentiment"]["satisfaction"].get("category", "Neutral"),), kind=artifacts.STAGE_KIND, optional=True),
+        ]
+    results, timings = stages.run(graph, label="case study post-processing")
+
+    sentiment = results.get("sentiment") or {}
+    if sentiment.get("satisfaction", {}).get("category"):
+        if results.get("sentiment_chart"):
+            sentiment["visualizations"]["sentiment_chart_img"] = results["sentiment_chart"]
+        if results.get("satisfaction_gauge"):
+            sentiment["visualizations"].update(results["satisfaction_gauge"])
+
+    meta_data["sentiment"] = sentiment
+    meta_data["client_takeaways"] = results.get("takeaways") or ""
+    meta_data["stage_timings_ms"] = timings
+
+    pdf_filename, pdf_path = results["pdf"]
+    return main_story, meta_data, pdf_filename, pdf_path
+
+def run_full_case_study(case_study_id):
+    """Generate, store and render the full case study. Returns ``(payload, status_code)``."""
+    session = SessionLocal()
+    try:
+        case_study = session.query(CaseStudy).filter_by(id=case_study_id).first()
+        if not case_study:
+            return {"status": "error", "message": "Case study not found"}, 404
+
+        provider_interview = case_study.solution_provider_interview
+        client_interview = case_study.client_interview
+        
+
+        if not provider_interview:
+            return {"status": "error", "message": "Provider summary is required."}, 400
 
-        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-        result = response.json()
-        case_study_text = result["choices"][0]["message"]["content"]
+        provider_summary = provider_interview.summary or ""
+        client_summary = client_interview.summary if client_interview else ""
+        detected_language = case_study_language(case_study, provider_summary)
+        print(detected_language)
+        
+        # Check if client story exists
+        has_client_story = bool(client_interview and client_summary.strip())
+        full_prompt = build_full_case_study_prompt(provider_summary, client_summary, has_client_story, detected_language)
+
+        result = llm_client.chat(
+            [{"role": "system", "content": full_prompt}],
+            model=openai_config["model"],
+            temperature=0.5,
+            top_p=0.9
+        )
+        case_study_text = result["content"]
         cleaned = clean_text(case_study_text)
 
-        def draft_quote_from_summary(summary, speaker="Client"):
-            # Simple template-based fallback if OpenAI is not available
-            # You can make this smarter or use OpenAI if you wish
-            return f"As a {speaker.lower()}, I can say this project made a real difference for us. We're very happy with the results."
+        main_story, meta_data, pdf_filename, pdf_path = build_case_study_metadata(cleaned, client_summary, detected_language)
+        print("Meta data being saved:", meta_data)
+        case_study.final_summary = main_story
+        case_study.meta_data_text = json.dumps(meta_data, ensure_ascii=False, indent=2)
+        case_study.final_summary_pdf_path = pdf_path
+        session.commit()
 
-        def extract_and_remove_metadata_sections(text, client_summary=None):
-            # Patterns to extract meta sections
-            conflict_pattern = r"(?:\*\*|__)?Corrected\s*&\s*Conflicted Replies(?:\*\*|__)?\s*[\r\n]+(.*?)(?=(?:\*\*|__)?Quotes? Highlights(?:\*\*|__)?|$)"
-            quotes_pattern = r"(?:\*\*|__)?Quotes? Highlights(?:\*\*|__)?\s*[\r\n\-:]*([\s\S]*?)(?=(?:\*\*|__)?[A-Z][^:]*:|$)"
-            
-            # Extract meta sections
-            conflict_match = re.search(conflict_pattern, text, re.IGNORECASE | re.DOTALL)
-            quotes_match = re.search(quotes_pattern, text, re.IGNORECASE | re.DOTALL)
-            corrected_conflicts = conflict_match.group(1).strip() if conflict_match else ""
-            quote_highlights = quotes_match.group(1).strip() if quotes_match else ""
-
-            # Fallback: if quote_highlights is empty, try to extract blockquotes or bulleted quotes
-            if not quote_highlights:
-                # Try to extract lines like: - **Client:** "Quote here..."
-                blockquote_lines = re.findall(r'- \*\*(Client|Provider)\*\*:\s*["""]([\s\S]*?)["""]', text)
-                if blockquote_lines:
-                    quote_highlights = "\n".join(f'- **{who}:** "{q.strip()}"' for who, q in blockquote_lines)
-                else:
-                    # Fallback: extract multi-line quotes between quotes
-                    multiline_quotes = re.findall(r'["""]([\s\S]*?)["""]', text)
-                    if multiline_quotes:
-                        quote_highlights = "\n".join(f'- "{q.strip()}"' for q in multiline_quotes)
-                    elif client_summary:
-                        # Draft a quote from the client summary
-                        drafted = draft_quote_from_summary(client_summary, speaker="Client")
-                        quote_highlights = f'- "{drafted}"'
-
-            # Remove meta sections from the main story
-            text = re.sub(conflict_pattern, "", text, flags=re.IGNORECASE | re.DOTALL)
-            text = re.sub(quotes_pattern, "", text, flags=re.IGNORECASE | re.DOTALL)
-            
-            # Extract key takeaways
-            client_takeaways = extract_client_takeaways(client_summary) if client_summary else ""
-
-            # Ensure sentiment analysis is included in meta data
-            sentiment = analyze_sentiment(client_summary) if client_summary else {}
-
-            return text.strip(), {
-                "corrected_conflicts": corrected_conflicts,
-                "quote_highlights": quote_highlights,
-                "sentiment": sentiment,
-                "client_takeaways": client_takeaways,
-                # Add other meta data fields as needed
-            }
+        return {
+            "status": "success",
+            "text": main_story,
+            "pdf_url": f"/download/{pdf_filename}",
+            "stage_timings_ms": meta_data["stage_timings_ms"]
+        }, 200
 
-        def extract_client_takeaways(client_summary):
-            """Extract key takeaways from client interview using OpenAI."""
-            try:
-                prompt = f"""
-                Analyze the following client interview summary and extract the 3-5 most important key takeaways.
-                Focus on:
-                - Main pain points or challenges they faced
-                - Most valued aspects of the solution
-                - Key benefits or improvements they experienced
-                - Their overall satisfaction level
-                - Any specific metrics or results they mentioned
-
-                Format the response as a bullet-point list.
-
-                Client Summary:
-                {client_summary}
-                """
-
-                headers = {
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                }
+    except Exception as e:
+        session.rollback()
+        return {"status": "error", "message": str(e)}, 500
+    finally:
+        session.close()
 
-                payload = {
-                    "model": openai_config["model"],
-                    "messages": [{"role": "system", "content": prompt}],
-                    "temperature": 0.3,
-                    "max_tokens": 500
-                }
+@app.route("/generate_full_case_study", methods=["POST"])
+def generate_full_case_study():
+    data = request.get_json()
+    case_study_id = data.get("case_study_id")
 
-                response = requests.post("https://api.openai.com/v1/chat/completions", 
-                                      headers=headers, 
-                                      json=payload)
-                result = response.json()
-                return result["choices"][0]["message"]["content"].strip()
-            except Exception as e:
-                print(f"Error extracting client takeaways: {str(e)}")
-                return "Unable to extract key takeaways."
-
-        def generate_sentiment_chart(sentiment_score, output_dir="generated_pdfs"):
-            # Create a simple horizontal bar chart for sentiment
-            fig, ax = plt.subplots(figsize=(4, 1.5))
-            color = 'green' if sentiment_score > 6 else 'yellow' if sentiment_score > 4 else 'red'
-            ax.barh(['Sentiment'], [sentiment_score], color=color)
-            ax.set_xlim(0, 10)
-            ax.set_xlabel('Score (0-10)')
-            ax.set_title('Sentiment Score')
-            plt.tight_layout()
-            # Save to a unique file
-            os.makedirs(output_dir, exist_ok=True)
-            filename = f"sentiment_chart_{uuid.uuid4().hex}.png"
-            filepath = os.path.join(output_dir, filename)
-            plt.savefig(filepath)
-            plt.close(fig)
-            return filename
-
-        def extract_client_satisfaction(client_summary):
-            # Define categories and keywords
-            categories = [
-                ("Very Bad", ["terrible", "awful", "horrible", "very disappointed", "extremely dissatisfied", "never again", "worst"]),
-                ("Bad", ["bad", "disappointed", "dissatisfied", "not happy", "not satisfied", "issues", "problems", "concerns"]),
-                ("Neutral", ["okay", "neutral", "average", "fine", "acceptable", "neither good nor bad"]),
-                ("Good", ["good", "satisfied", "happy", "pleased", "helpful", "positive", "recommend", "valuable", "improved", "great help"]),
-                ("Very Good", ["excellent", "outstanding", "amazing", "fantastic", "very happy", "very satisfied", "delighted", "impressed", "exceptional", "game changer", "highly recommend", "best"])
-            ]
-            summary_lower = client_summary.lower()
-            found_category = "Neutral"
-            for cat, keywords in categories:
-                for kw in keywords:
-                    if kw in summary_lower:
-                        found_category = cat
-                        break
-                if found_category != "Neutral":
-                    break
+    if not case_study_id:
+        return jsonify({"status": "error", "message": "Missing case_study_id"}), 400
 
-            # Try to extract a satisfaction sentence
-            satisfaction_sentence = ""
-            for cat, keywords in categories:
-                for kw in keywords:
-                    match = re.search(r'([^.]*\b' + re.escape(kw) + r'\b[^.]*)\.', client_summary, re.IGNORECASE)
-                    if match:
-                        satisfaction_sentence = match.group(1).strip()
-                        break
-                if satisfaction_sentence:
-                    break
+    if wants_async(data):
+        return enqueue_job_response("full_case_study", {"case_study_id": case_study_id}, case_study_id)
 
-            return {
-                "category": found_category,
-                "statement": satisfaction_sentence or "No explicit satisfaction statement found."
-            }
+    payload, status_code = run_full_case_study(case_study_id)
+    return jsonify(payload), status_code
 
-        def generate_client_satisfaction_gauge(category):
-            # Map categories to values and colors for the gauge
-            category_map = {
-                "Very Bad": (1, "#ef4444"),
-                "Bad": (3, "#f59e42"),
-                "Neutral": (5, "#fbbf24"),
-                "Good": (7, "#a3e635"),
-                "Very Good": (9, "#22c55e")
-            }
-            value, color = category_map.get(category, (5, "#fbbf24"))
-            fig = go.Figure(go.Indicator(
-                mode="gauge+number",
-                value=value,
-                number={'valueformat': '', 'font': {'size': 1}, 'suffix': ''},  # Hide the number
-                title={'text': f"Client Satisfaction: <b>{category}</b>", 'font': {'size': 22}},
-                gauge={
-                    'axis': {'range': [0, 10], 'tickvals': [1, 3, 5, 7, 9], 'ticktext': ["Very Bad", "Bad", "Neutral", "Good", "Very Good"], 'tickwidth': 2, 'tickcolor': "#888"},
-                    'bar': {'color': color, 'thickness': 0.3},
-                    'steps': [
-                        {'range': [0, 2], 'color': "#ef4444"},
-                        {'range': [2, 4], 'color': "#f59e42"},
-                        {'range': [4, 6], 'color': "#fbbf24"},
-                        {'range': [6, 8], 'color': "#a3e635"},
-                        {'range': [8, 10], 'color': "#22c55e"},
-                    ],
-                    'threshold': {
-                        'line': {'color': "black", 'width': 8},
-                        'thickness': 0.9,
-                        'value': value
-                    }
-                }
-            ))
-            fig.update_layout(height=300, margin=dict(t=40, b=0, l=0, r=0))
-            return fig.to_json()
+# Sections that build_case_study_metadata moves out of the main story
+META_SECTION_PATTERN = re.compile(r"^(?:QUOTES?\s+HIGHLIGHTS|CORRECTED\s*&\s*CONFLICTED\s+REPLIES)\b", re.IGNORECASE)
 
-        def analyze_sentiment(client_summary):
-            try:
-                analyzer = SentimentIntensityAnalyzer()
-                scores = analyzer.polarity_scores(client_summary)
-                compound = scores['compound']
-                if compound >= 0.05:
-                    sentiment = "positive"
-                elif compound <= -0.05:
-                    sentiment = "negative"
-                else:
-                    sentiment = "neutral"
+# Header forms the full case study prompt produces: a markdown heading or bold line, or a short numbered title
+MARKDOWN_HEADER_PATTERN = re.compile(r"^(?:#{1,6}\s+\S.*|\*\*[^*]+\*\*:?)$")
+NUMBERED_HEADER_PATTERN = re.compile(r"^\d{1,2}[.)]\s+\S.*$")
+MAX_NUMBERED_HEADER_WORDS = 8
 
-                final_analysis = {
-                    "overall_sentiment": {
-                        "sentiment": sentiment,
-                        "confidence": abs(compound),
-                        "score": round((compound + 1) * 5, 2)  # scale -1..1 to 0..10
-                    },
-                    "emotional_analysis": {
-                        "primary_emotion": sentiment,
-                        "secondary_emotions": [],
-                        "emotional_intensity": max(scores['pos'], scores['neg'])
-                    },
-                    "key_points": {
-                        "positive": [],
-                        "negative": []
-                    },
-                    "metrics": [],
-                    "satisfaction": {
-                        "score": 0,
-                        "confidence": abs(compound),
-                        "key_factors": [],
-                        "statement": ""
-                    },
-                    "visualizations": {}
-                }
-                # Generate and attach the sentiment chart image
-                sentiment_score = final_analysis["overall_sentiment"]["score"]
-                chart_filename = generate_sentiment_chart(sentiment_score)
-                final_analysis["visualizations"]["sentiment_chart_img"] = f"/generated_pdfs/{chart_filename}"
-
-                # Add client satisfaction analysis
-                satisfaction_info = extract_client_satisfaction(client_summary)
-                final_analysis["satisfaction"]["category"] = satisfaction_info["category"]
-                final_analysis["satisfaction"]["statement"] = satisfaction_info["statement"]
-
-                # Generate and attach the Plotly gauge for client satisfaction
-                gauge_json = generate_client_satisfaction_gauge(satisfaction_info["category"])
-                final_analysis["visualizations"]["client_satisfaction_gauge"] = gauge_json
-
-                return final_analysis
-            except Exception as e:
-                print(f"Error in sentiment analysis: {str(e)}")
-                return {
-                    "overall_sentiment": {
-                        "sentiment": "unknown",
-                        "confidence": 0,
-                        "score": 0
-                    },
-                    "emotional_analysis": {
-                        "primary_emotion": "unknown",
-                        "secondary_emotions": [],
-                        "emotional_intensity": 0
-                    },
-                    "key_points": {
-                        "positive": [],
-                        "negative": []
-                    },
-                    "metrics": [],
-                    "satisfaction": {
-                        "score": 0,
-                        "confidence": 0,
-                        "key_factors": [],
-                        "statement": "No explicit satisfaction statement found."
-                    },
-                    "visualizations": {}
-                }
+def is_section_header(line):
+    """True for the section header lines the full case study prompt asks for.
 
-        main_story, meta_data = extract_and_remove_metadata_sections(cleaned, client_summary)
-        print("Meta data being saved:", meta_data)
-        case_study.final_summary = main_story
-        case_study.meta_data_text = json.dumps(meta_data, ensure_ascii=False, indent=2)
+    ALL-CAPS lines only count when every letter is an upper-case letter, so lines in scripts
+    without case (CJK, Arabic, ...) are headers only in the markdown or numbered forms.
+    """
+    stripped = line.strip()
+    header = stripped.strip("*#").strip()
+    if len(header) < 3 or len(header) > 120 or header.endswith((".", "。")):
+        return False
+    if MARKDOWN_HEADER_PATTERN.match(stripped):
+        return True
+    if NUMBERED_HEADER_PATTERN.match(header) and len(header.split()) <= MAX_NUMBERED_HEADER_WORDS:
+        return True
+    letters = [c for c in header if c.isalpha()]
+    return bool(letters) and all(c.isupper() for c in letters)
+
+class CaseStudySectionSplitter:
+    """Splits streamed case study text into sections at ALL-CAPS header lines.
+
+    ``feed`` returns the sections completed by the new text; ``close`` returns the last one.
+    """
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        pdf_filename = f"final_case_study_{timestamp}.pdf"
-        pdf_path = os.path.join("generated_pdfs", pdf_filename)
-        os.makedirs("generated_pdfs", exist_ok=True)
+    def __init__(self):
+        self.buffer = ""
+        self.title = None
+        self.lines = []
+        self.index = 0
+
+    def _flush(self):
+        text = "\n".join(self.lines).strip()
+        title = self.title
+        self.lines = []
+        if not title and not text:
+            return None
+        if title and META_SECTION_PATTERN.match(title):
+            return None
+        section = {"index": self.index, "title": title, "text": text}
+        self.index += 1
+        return section
+
+    def _add_line(self, line, completed):
+        if is_section_header(line):
+            section = self._flush()
+            if section:
+                completed.append(section)
+            self.title = line.strip().strip("*#").strip()
+        else:
+            self.lines.append(line)
+
+    def feed(self, text):
+        completed = []
+        self.buffer += text
+        while "\n" in self.buffer:
+            line, self.buffer = self.buffer.split("\n", 1)
+            self._add_line(line, completed)
+        return completed
+
+    def close(self):
+        completed = []
+        if self.buffer:
+            self._add_line(self.buffer, completed)
+            self.buffer = ""
+        section = self._flush()
+        if section:
+            completed.append(section)
+        return completed
+
+@app.route("/generate_full_case_study_stream", methods=["POST"])
+def generate_full_case_study_stream():
+    """Streaming variant of /generate_full_case_study.
+
+    Emits a ``section`` event as soon as each ALL-CAPS section is complete, then ``metadata``
+    and ``pdf`` once the post-processing stages (takeaways, sentiment, PDF) finish and finally
+    ``done`` with the same payload as /generate_full_case_study (or ``error``).
+    """
+    data = request.get_json()
+    case_study_id = data.get("case_study_id")
+
+    if not case_study_id:
+        return jsonify({"status": "error", "message": "Missing case_study_id"}), 400
+
+    def generate():
+        # The session is only open while loading and saving, not for the minutes the LLM streams
+        session = SessionLocal()
+        try:
+            case_study = session.query(CaseStudy).filter_by(id=case_study_id).first()
+            if not case_study:
+                yield sse_event("error", {"status": "error", "message": "Case study not found"})
+                return
+
+            provider_interview = case_study.solution_provider_interview
+            client_interview = case_study.client_interview
+            if not provider_interview:
+                yield sse_event("error", {"status": "error", "message": "Provider summary is required."})
+                return
+
+            provider_summary = provider_interview.summary or ""
+            client_summary = client_interview.summary if client_interview else ""
+            detected_language = case_study_language(case_study, provider_summary)
+            has_client_story = bool(client_interview and client_summary.strip())
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error streaming full case study: {str(e)}")
+            yield sse_event("error", {"status": "error", "message": str(e)})
+            return
+        finally:
+            session.close()
 
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.set_font("Arial", size=12)
-        for line in main_story.split("\n"):
-            pdf.multi_cell(0, 10, line)
+        try:
+            full_prompt = build_full_case_study_prompt(provider_summary, client_summary, has_client_story, detected_language)
+            stream = llm_client.chat_stream(
+                [{"role": "system", "content": full_prompt}],
+                model=openai_config["model"],
+                temperature=0.5,
+                top_p=0.9
+            )
+            splitter = CaseStudySectionSplitter()
+            chunks = []
+            first_section_logged = False
+            for delta in stream:
+                chunk = clean_text(delta)
+                chunks.append(chunk)
+                for section in splitter.feed(chunk):
+                    if not first_section_logged:
+                        print(f"⏱️ /generate_full_case_study_stream first section after {(time.perf_counter() - stream.started) * 1000:.0f} ms")
+                        first_section_logged = True
+                    yield sse_event("section", section)
+            for section in splitter.close():
+                yield sse_event("section", section)
+
+            cleaned = "".join(chunks)
+            main_story, meta_data, pdf_filename, pdf_path = build_case_study_metadata(cleaned, client_summary, detected_language)
+        except Exception as e:
+            print(f"❌ Error streaming full case study: {str(e)}")
+            yield sse_event("error", {"status": "error", "message": str(e)})
+            return
+
+        session = SessionLocal()
+        try:
+            case_study = session.query(CaseStudy).filter_by(id=case_study_id).first()
+            if not case_study:
+                yield sse_event("error", {"status": "error", "message": "Case study not found"})
+                return
+            case_study.final_summary = main_story
+            case_study.meta_data_text = json.dumps(meta_data, ensure_ascii=False, indent=2)
+            case_study.final_summary_pdf_path = pdf_path
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Error saving streamed full case study: {str(e)}")
+            yield sse_event("error", {"status": "error", "message": str(e)})
+            return
+        finally:
+            session.close()
 
-        pdf.output(pdf_path)
+        yield sse_event("metadata", {"meta_data": meta_data})
 
-        case_study.final_summary_pdf_path = pdf_path
-        session.commit()
+        pdf_url = f"/download/{pdf_filename}"
+        yield sse_event("pdf", {"pdf_url": pdf_url})
 
-        return jsonify({
+        yield sse_event("done", {
             "status": "success",
             "text": main_story,
-            "pdf_url": f"/download/{pdf_filename}"
+            "pdf_url": pdf_url,
+            "time_to_first_token_ms": stream.first_token_ms
         })
 
-    except Exception as e:
-        session.rollback()
-        return jsonify({"status": "error", "message": str(e)}), 500
-    finally:
-        session.close()
+    return Response(stream_with_context(generate()), mimetype="text/event-stream", headers=SSE_HEADERS)
 
 @app.route("/save_final_summary", methods=["POST"])
 def save_final_summary():
@@ -1311,16 +1410,9 @@ def save_final_summary():
 
         # ✅ Extract names from the new final summary
         names = extract_names_from_case_study(final_summary)
-        lead_entity = names["lead_entity"]
-        partner_entity = names["partner_entity"]
-        project_title = names["project_title"]
-        new_title = f"{lead_entity} x {partner_entity}: {project_title}"
 
         # ✅ Update CaseStudy title and name fields
-        case_study.title = new_title
-        case_study.provider_name = lead_entity
-        case_study.client_name = partner_entity
-        case_study.project_name = project_title
+        apply_names_to_case_study(case_study, names)
 
         session.commit()
 
@@ -1472,48 +1564,251 @@ def api_logout():
     session.clear()
     return jsonify({'success': True})
 
+# Fields of /api/case_studies/<id> that map straight to CaseStudy columns
+CASE_STUDY_COLUMN_FIELDS = (
+    'title', 'provider_name', 'client_name', 'project_name', 'language',
+    'final_summary', 'meta_data_text', 'linkedin_post',
+    'created_at', 'updated_at',
+)
+# Fields read off the case study's newest media job of a vendor:
+# field -> (provider, MediaJob column or key of its JSON details)
+MEDIA_JOB_FIELDS = {
+    'video_url': ('heygen', 'url'),
+    'video_id': ('heygen', 'external_id'),
+    'video_status': ('heygen', 'status'),
+    'video_created_at': ('heygen', 'created_at'),
+    'pictory_video_url': ('pictory', 'url'),
+    'pictory_storyboard_id': ('pictory', 'external_id'),
+    'pictory_render_id': ('pictory', 'render_id'),
+    'pictory_video_status': ('pictory', 'status'),
+    'pictory_video_created_at': ('pictory', 'created_at'),
+    'pictory_storyboard_done_at': ('pictory', 'storyboard_done_at'),
+    'pictory_render_started_at': ('pictory', 'render_started_at'),
+    'pictory_finished_at': ('pictory', 'finished_at'),
+    'podcast_url': ('wondercraft', 'url'),
+    'podcast_job_id': ('wondercraft', 'external_id'),
+    'podcast_status': ('wondercraft', 'status'),
+    'podcast_script': ('wondercraft', 'script'),
+    'podcast_created_at': ('wondercraft', 'created_at'),
+}
+MEDIA_JOB_COLUMNS = ('external_id', 'status', 'url', 'created_at')
+# Fields that come from related rows
+CASE_STUDY_RELATED_FIELDS = ('solution_provider_summary', 'client_summary', 'client_link_url', 'labels')
+CASE_STUDY_FIELDS = CASE_STUDY_COLUMN_FIELDS + tuple(MEDIA_JOB_FIELDS) + CASE_STUDY_RELATED_FIELDS
+
+# Small fields returned for every story by /api/case_studies; the large texts come from the detail endpoint
+CASE_STUDY_LIST_FIELDS = (
+    'title', 'provider_name', 'client_name', 'project_name', 'language',
+    'video_status', 'pictory_video_status', 'podcast_status', 'created_at', 'updated_at', 'labels',
+)
+
+def case_study_query_options(fields):
+    """Loader options that fetch only the columns and relationships the fields need."""
+    columns = [getattr(CaseStudy, f) for f in fields if f in CASE_STUDY_COLUMN_FIELDS]
+    options = [load_only(CaseStudy.id, *columns)]
+    provider_columns = [
+        getattr(SolutionProviderInterview, column)
+        for field, column in (('solution_provider_summary', 'summary'), ('client_link_url', 'client_link_url'))
+        if field in fields
+    ]
+    if provider_columns:
+        options.append(selectinload(CaseStudy.solution_provider_interview).load_only(
+            SolutionProviderInterview.case_study_id, *provider_columns))
+    if 'client_summary' in fields:
+        options.append(selectinload(CaseStudy.client_interview).load_only(
+            ClientInterview.case_study_id, ClientInterview.summary))
+    if 'labels' in fields:
+        options.append(selectinload(CaseStudy.labels).load_only(Label.id, Label.name))
+    media_keys = {MEDIA_JOB_FIELDS[f][1] for f in fields if f in MEDIA_JOB_FIELDS}
+    if media_keys:
+        # The jobs of all rows come from one query on media_jobs.case_study_id
+        media_columns = [getattr(MediaJob, key) for key in MEDIA_JOB_COLUMNS if key in media_keys]
+        if media_keys - set(MEDIA_JOB_COLUMNS):
+            media_columns.append(MediaJob.details)
+        options.append(selectinload(CaseStudy.media_jobs).load_only(
+            MediaJob.case_study_id, MediaJob.provider, *media_columns))
+    return options
+
+def serialize_case_study(cs, fields):
+    result = {'id': cs.id}
+    # media_jobs is in id order, so the newest job of each vendor wins
+    media_jobs = {job.provider: job for job in cs.media_jobs} if any(f in MEDIA_JOB_FIELDS for f in fields) else {}
+    for field in fields:
+        if field in CASE_STUDY_COLUMN_FIELDS:
+            value = getattr(cs, field)
+            result[field] = value.isoformat() if isinstance(value, datetime) else value
+        elif field in MEDIA_JOB_FIELDS:
+            provider, key = MEDIA_JOB_FIELDS[field]
+            job = media_jobs.get(provider)
+            value = None if job is None else getattr(job, key) if key in MEDIA_JOB_COLUMNS else job.detail(key)
+            result[field] = value.isoformat() if isinstance(value, datetime) else value
+        elif field == 'solution_provider_summary':
+            result[field] = getattr(cs.solution_provider_interview, 'summary', None)
+        elif field == 'client_link_url':
+            result[field] = getattr(cs.solution_provider_interview, 'client_link_url', None)
+        elif field == 'client_summary':
+            result[field] = getattr(cs.client_interview, 'summary', None)
+        elif field == 'labels':
+            result[field] = [{'id': l.id, 'name': l.name} for l in cs.labels]
+    return result
+
+CASE_STUDY_PAGE_SIZE = 50
+CASE_STUDY_MAX_PAGE_SIZE = 200
+# sort parameter -> (column, descending); every sort is keyset-paginated on (column, id)
+CASE_STUDY_SORTS = {
+    '-updated_at': ('updated_at', True),
+    'updated_at': ('updated_at', False),
+    '-created_at': ('created_at', True),
+    'created_at': ('created_at', False),
+}
+
+def encode_cursor(value, row_id):
+    """Opaque cursor pointing just after the row with this sort value and id."""
+    payload = json.dumps([value.isoformat() if value else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Return ``(value, row_id)`` from a cursor, or raise ValueError."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(value) if value else None), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def dashboard_state(db_session, user_id):
+    """``(data_version, max updated_at, case study count, label count, media max updated_at)`` in one query."""
+    return db_session.query(
+        User.data_version,
+        select(func.max(CaseStudy.updated_at)).where(CaseStudy.user_id == user_id).scalar_subquery(),
+        select(func.count(CaseStudy.id)).where(CaseStudy.user_id == user_id).scalar_subquery(),
+        select(func.count(Label.id)).where(Label.user_id == user_id).scalar_subquery(),
+        # Media job progress is written by the reconciler without touching the case study or user
+        select(func.max(MediaJob.updated_at))
+        .join(CaseStudy, CaseStudy.id == MediaJob.case_study_id)
+        .where(CaseStudy.user_id == user_id).scalar_subquery(),
+    ).filter(User.id == user_id).first()
+
+def dashboard_etag(state, resource):
+    """Weak ETag for ``resource`` (a route name) as seen with the current query string."""
+    data_version, last_updated, case_study_count, label_count, media_updated = state
+    key = json.dumps([
+        resource, data_version, last_updated.isoformat() if last_updated else None,
+        case_study_count, label_count, media_updated.isoformat() if media_updated else None,
+        sorted(request.args.items(multi=True)),
+    ])
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+def not_modified(etag, last_modified=None):
+    """A 304 response if the request's If-None-Match matches ``etag``, else None.
+
+    Only the ETag decides: Last-Modified cannot see deleted case studies or label changes.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return with_validators(Response(status=304), etag, last_modified)
+
+def with_validators(response, etag, last_modified=None):
+    """Attach the ETag/Last-Modified headers; clients must revalidate before reusing the body."""
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
 @app.route('/api/case_studies')
 def api_case_studies():
-    user_id = session.get('user_id')
+    """List the user's case studies with their titles, labels, statuses and timestamps.
+
+    Pages are ``limit`` rows long (default 50, max 200) in ``sort`` order (``-updated_at`` by
+    default, also ``updated_at``, ``-created_at``, ``created_at``). Pass the returned
+    ``next_cursor`` as ``cursor`` to get the next page; it is null on the last page.
+
+    Responses carry a weak ETag and Last-Modified; a matching If-None-Match gets a 304 after
+    a single aggregate query.
+    """
+    user_id = session.get('user_id')
     if not user_id:
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     label_id = request.args.get('label', type=int)
+    limit = min(max(request.args.get('limit', CASE_STUDY_PAGE_SIZE, type=int), 1), CASE_STUDY_MAX_PAGE_SIZE)
+    sort = request.args.get('sort', '-updated_at')
+    if sort not in CASE_STUDY_SORTS:
+        return jsonify({'success': False, 'message': f"Unknown sort: {sort}"}), 400
+    column_name, descending = CASE_STUDY_SORTS[sort]
+    column = getattr(CaseStudy, column_name)
+
     db_session = SessionLocal()
     try:
-        query = db_session.query(CaseStudy).filter_by(user_id=user_id)
+        state = dashboard_state(db_session, user_id)
+        if not state:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+        etag = dashboard_etag(state, 'case_studies')
+        last_modified = max((t for t in (state[1], state[4]) if t), default=None)
+        cached = not_modified(etag, last_modified)
+        if cached:
+            return cached
+
+        # Labels for all rows come from one extra query instead of one per row
+        query = (
+            db_session.query(CaseStudy)
+            .options(*case_study_query_options(CASE_STUDY_LIST_FIELDS))
+            .filter_by(user_id=user_id)
+        )
         if label_id:
             query = query.join(CaseStudy.labels).filter(Label.id == label_id)
-        case_studies = query.all()
-        result = []
-        for cs in case_studies:
-            result.append({
-                'id': cs.id,
-                'title': cs.title,
-                'solution_provider_summary': getattr(cs.solution_provider_interview, 'summary', None),
-                'client_summary': getattr(cs.client_interview, 'summary', None),
-                'final_summary': cs.final_summary,
-                'meta_data_text': cs.meta_data_text,
-                'linkedin_post': cs.linkedin_post,
-                'labels': [{'id': l.id, 'name': l.name} for l in cs.labels],
-                'client_link_url': getattr(cs.solution_provider_interview, 'client_link_url', None),  
-                'video_url': cs.video_url,
-                'video_id': cs.video_id,
-                'video_status': cs.video_status,
-                'video_created_at': cs.video_created_at.isoformat() if cs.video_created_at else None,
-                # Pictory video fields
-                'pictory_video_url': cs.pictory_video_url,
-                'pictory_storyboard_id': cs.pictory_storyboard_id,
-                'pictory_render_id': cs.pictory_render_id,
-                'pictory_video_status': cs.pictory_video_status,
-                'pictory_video_created_at': cs.pictory_video_created_at.isoformat() if cs.pictory_video_created_at else None,
-                # Podcast fields
-                'podcast_url': cs.podcast_url,
-                'podcast_job_id': cs.podcast_job_id,
-                'podcast_status': cs.podcast_status,
-                'podcast_script': cs.podcast_script,
-                'podcast_created_at': cs.podcast_created_at.isoformat() if cs.podcast_created_at else None,
-            })
-        return jsonify({'success': True, 'case_studies': result})
+
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                value, row_id = decode_cursor(cursor)
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            # Rows strictly after (value, row_id) in the page order; served by the (user_id, column, id) index
+            if descending:
+                query = query.filter(or_(column < value, and_(column == value, CaseStudy.id < row_id)))
+            else:
+                query = query.filter(or_(column > value, and_(column == value, CaseStudy.id > row_id)))
+
+        order = (column.desc(), CaseStudy.id.desc()) if descending else (column.asc(), CaseStudy.id.asc())
+        # One extra row tells whether there is a next page
+        rows = query.order_by(*order).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(getattr(rows[-1], column_name), rows[-1].id)
+
+        result = [serialize_case_study(cs, CASE_STUDY_LIST_FIELDS) for cs in rows]
+        return with_validators(
+            jsonify({'success': True, 'case_studies': result, 'next_cursor': next_cursor}), etag, last_modified)
+    finally:
+        db_session.close()
+
+@app.route('/api/case_studies/<int:case_study_id>')
+def api_case_study_detail(case_study_id):
+    """One case study. ``?fields=a,b`` limits the response (and the query) to those fields."""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Unauthorized'}), 401
+    fields_param = request.args.get('fields')
+    if fields_param:
+        fields = [f.strip() for f in fields_param.split(',') if f.strip()]
+        unknown = [f for f in fields if f not in CASE_STUDY_FIELDS]
+        if unknown:
+            return jsonify({'success': False, 'message': f"Unknown fields: {', '.join(unknown)}"}), 400
+    else:
+        fields = list(CASE_STUDY_FIELDS)
+    db_session = SessionLocal()
+    try:
+        cs = (
+            db_session.query(CaseStudy)
+            .options(*case_study_query_options(fields))
+            .filter_by(id=case_study_id, user_id=user_id)
+            .first()
+        )
+        if not cs:
+            return jsonify({'success': False, 'message': 'Case study not found'}), 404
+        return jsonify({'success': True, 'case_study': serialize_case_study(cs, fields)})
     finally:
         db_session.close()
 
@@ -1524,8 +1819,16 @@ def get_labels():
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     db_session = SessionLocal()
     try:
+        state = dashboard_state(db_session, user_id)
+        if not state:
+            return jsonify({'success': False, 'message': 'User not found'}), 404
+        etag = dashboard_etag(state, 'labels')
+        cached = not_modified(etag)
+        if cached:
+            return cached
         labels = db_session.query(Label).filter_by(user_id=user_id).all()
-        return jsonify({'success': True, 'labels': [{'id': l.id, 'name': l.name} for l in labels]})
+        return with_validators(
+            jsonify({'success': True, 'labels': [{'id': l.id, 'name': l.name} for l in labels]}), etag)
     finally:
         db_session.close()
 
@@ -1644,15 +1947,21 @@ def api_user():
         return jsonify({'success': False, 'message': 'Unauthorized'}), 401
     db_session = SessionLocal()
     try:
-        user = db_session.query(User).filter_by(id=user_id).first()
-        if not user:
+        # The profile only changes with data_version, so it alone is the validator
+        data_version = db_session.query(User.data_version).filter_by(id=user_id).scalar()
+        if data_version is None:
             return jsonify({'success': False, 'message': 'User not found'}), 404
-        return jsonify({
+        etag = dashboard_etag((data_version, None, None, None, None), 'user')
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        user = db_session.query(User).filter_by(id=user_id).first()
+        return with_validators(jsonify({
             'success': True,
             'first_name': user.first_name,
             'last_name': user.last_name,
             'email': user.email
-        })
+        }), etag)
     finally:
         db_session.close()
 
@@ -1739,6 +2048,13 @@ def get_provider_transcript():
 def serve_generated_file(filename):
     return send_from_directory('generated_pdfs', filename)
 
+@app.route('/artifacts/<filename>')
+def serve_artifact(filename):
+    # Artifact names encode their content (style version + bucket), so they never change
+    response = send_from_directory(artifacts.ARTIFACT_DIR, filename, max_age=31536000)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
 def generate_linkedin_post(case_study_text):
     """Generate a LinkedIn post from a case study using AI."""
     prompt = f"""
@@ -1799,21 +2115,13 @@ The post should feel like a personal reflection from someone in the company (e.g
     """
 
 
-    headers = {
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "model": "gpt-4",
-        "messages": [{"role": "system", "content": prompt}],
-        "temperature": 0.7,
-        "max_tokens": 500
-    }
-
-    response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-    result = response.json()
-    return result["choices"][0]["message"]["content"]
+    result = llm_client.chat(
+        [{"role": "system", "content": prompt}],
+        model="gpt-4",
+        temperature=0.7,
+        max_tokens=500
+    )
+    return result["content"]
 
 @app.route("/generate_linkedin_post", methods=["POST"])
 def generate_linkedin_post_endpoint():
@@ -1850,7 +2158,37 @@ def generate_linkedin_post_endpoint():
     finally:
         session.close()
 
-def generate_heygen_input_text(final_summary):
+def case_study_language(case_study, fallback_text=None):
+    """Language stored on the case study, detected (and stored) from its own text if missing.
+
+    The caller commits the session.
+    """
+    if case_study.language:
+        return case_study.language
+    text = fallback_text
+    if not text:
+        provider_interview = case_study.solution_provider_interview
+        text = case_study.final_summary or (provider_interview.summary if provider_interview else "")
+    case_study.language = detect_language(text or "")
+    return case_study.language
+
+def format_names_for_prompt(names):
+    """Render stored case study names as prompt context lines."""
+    if not names:
+        return ""
+    return (
+        f"Solution Provider: {names['lead_entity']}\n"
+        f"Client: {names['partner_entity'] or 'Unknown'}\n"
+        f"Project: {names['project_title']}\n"
+    )
+
+def format_language_for_prompt(language):
+    """Instruction to write in the case study's language; English needs none."""
+    if not language or language == "English":
+        return ""
+    return f"IMPORTANT: Write everything in {language}.\n"
+
+def generate_heygen_input_text(final_summary, names=None, language=None):
     """Generate optimized input text for HeyGen video using OpenAI."""
     try:
         prompt = f"""You are a professional business scriptwriter creating a short video script for a HeyGen AI avatar. Your task is to turn the success story summary below into a concise, professional, and clearly structured spoken script — as if it's being presented by a company representative in a formal setting (e.g. on LinkedIn, in a client meeting, or at a company showcase).
@@ -1883,29 +2221,22 @@ Length:
 - Keep the full script under 1300 characters.
 - Do not include any titles, labels, line breaks, or extra notes — return only the final clean block of spoken text.
 
+{format_names_for_prompt(names)}{format_language_for_prompt(language)}
 Success Story Summary:
 {final_summary}
 
 Return only the final video script. Nothing else."""
 
-        headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": openai_config["model"],
-            "messages": [
+        result = llm_client.chat(
+            [
                 {"role": "system", "content": "You are a professional video script writer who specializes in creating engaging, conversational scripts for AI avatar presentations. Your scripts are known for being clear, impactful, and perfectly timed for avatar delivery."},
                 {"role": "user", "content": prompt}
             ],
-            "temperature": 0.7,
-            "max_tokens": 500
-        }
-
-        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-        result = response.json()
-        script = result["choices"][0]["message"]["content"].strip()
+            model=openai_config["model"],
+            temperature=0.7,
+            max_tokens=500
+        )
+        script = result["content"].strip()
         
         # Ensure the script doesn't exceed 1300 characters
         if len(script) > 1300:
@@ -1916,8 +2247,8 @@ Return only the final video script. Nothing else."""
         print(f"Error generating HeyGen input text: {str(e)}")
         return None
 
-def get_pictory_access_token():
-    """Get access token from Pictory API."""
+def fetch_pictory_access_token():
+    """Request a new access token from the Pictory API: ``(access_token, expires_in)`` or None."""
     try:
         headers = {
             "Content-Type": "application/json"
@@ -1931,11 +2262,13 @@ def get_pictory_access_token():
         response = requests.post(
             f"{PICTORY_API_BASE_URL}/pictoryapis/v1/oauth2/token",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=30  # Other processes wait on the refresh lock meanwhile
         )
         
         if response.status_code == 200:
-            return response.json().get("access_token")
+            token_data = response.json()
+            return token_data.get("access_token"), token_data.get("expires_in")
         else:
             print(f"Pictory token error: {response.status_code} - {response.text}")
             return None
@@ -1943,7 +2276,25 @@ def get_pictory_access_token():
         print(f"Error getting Pictory access token: {str(e)}")
         return None
 
-def generate_pictory_scenes_text(final_summary):
+def get_pictory_access_token():
+    """Pictory access token, shared by all processes and refreshed shortly before it expires."""
+    return token_cache.get_token("pictory", fetch_pictory_access_token)
+
+def pictory_request(method, url, **kwargs):
+    """Send a Pictory API request with ``reconciler.request``.
+
+    Raises reconciler.VendorError when Pictory is unavailable; a rejected token is dropped from
+    the cache so that the next call fetches a new one.
+    """
+    try:
+        return reconciler.request(method, url, **kwargs)
+    except reconciler.VendorError as e:
+        if e.status_code == 401:
+            # Revoked before its expiry
+            token_cache.invalidate("pictory")
+        raise
+
+def generate_pictory_scenes_text(final_summary, names=None, language=None):
     """Generate scene-based text for Pictory video using OpenAI."""
     try:
         prompt = f"""You are a video scriptwriter for StoryBoom AI. Your task is to turn the case study below into a compelling 8-scene short-form video script. Each sentence should reflect a real moment or idea from the story, written clearly enough to be visualized as a separate scene.
@@ -1972,29 +2323,22 @@ Structure the 8 scenes like this:
 Output format:
 Return exactly 8 sentences, separated by a period and a space. No line breaks. No bullet points. No extra text or titles.
 
+{format_names_for_prompt(names)}{format_language_for_prompt(language)}
 Here is the case study:
 {final_summary}
 
 Return only the final 8-scene script, nothing else."""
 
-        headers = {
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "model": openai_config["model"],
-            "messages": [
+        result = llm_client.chat(
+            [
                 {"role": "system", "content": "You are a professional short-form video scriptwriter who creates engaging, visual scenes for social media videos."},
                 {"role": "user", "content": prompt}
             ],
-            "temperature": 0.7,
-            "max_tokens": 800
-        }
-
-        response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-        result = response.json()
-        scenes_text = result["choices"][0]["message"]["content"].strip()
+            model=openai_config["model"],
+            temperature=0.7,
+            max_tokens=800
+        )
+        scenes_text = result["content"].strip()
         
         # Split into individual scenes
         scenes = [scene.strip() for scene in scenes_text.split('\n') if scene.strip()]
@@ -2060,8 +2404,8 @@ def create_pictory_storyboard(token, scenes, video_name):
             }
         }
         
-        response = requests.post(
-            f"{PICTORY_API_BASE_URL}/pictoryapis/v2/video/storyboard",
+        response = pictory_request(
+            "POST", f"{PICTORY_API_BASE_URL}/pictoryapis/v2/video/storyboard",
             headers=headers,
             json=payload
         )
@@ -2076,87 +2420,65 @@ def create_pictory_storyboard(token, scenes, video_name):
         return None
 
 def render_pictory_video(token, storyboard_job_id):
-    """Render the storyboard to video using Pictory API."""
-    try:
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "X-Pictory-User-Id": PICTORY_USER_ID,
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.put(
-            f"{PICTORY_API_BASE_URL}/pictoryapis/v2/video/render/{storyboard_job_id}",
-            headers=headers
-        )
-        
-        if response.status_code == 200:
-            return response.json().get("data", {}).get("jobId")
-        else:
-            print(f"Pictory render error: {response.status_code} - {response.text}")
-            return None
-    except Exception as e:
-        print(f"Error rendering Pictory video: {str(e)}")
-        return None
+    """Start rendering the storyboard to video. Returns ``(render_job_id, error)``, one of them None.
+
+    Raises reconciler.VendorError when Pictory is unavailable; ``error`` says why Pictory
+    refused to render this storyboard.
+    """
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "X-Pictory-User-Id": PICTORY_USER_ID,
+        "Content-Type": "application/json"
+    }
+    response = pictory_request(
+        "PUT", f"{PICTORY_API_BASE_URL}/pictoryapis/v2/video/render/{storyboard_job_id}",
+        headers=headers
+    )
+    if response.status_code == 200:
+        render_job_id = response.json().get("data", {}).get("jobId")
+        if render_job_id:
+            return render_job_id, None
+        return None, "Pictory returned no render job ID"
+    print(f"Pictory render error: {response.status_code} - {response.text}")
+    return None, f"Pictory render error {response.status_code}: {response.text[:200]}"
 
 def check_pictory_job_status(token, job_id):
-    """Check the status of a Pictory job."""
-    try:
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "X-Pictory-User-Id": PICTORY_USER_ID,
-            "accept": "application/json",
-            "Content-Type": "application/json"
-        }
-        
-        print(f"Checking Pictory job status for job_id: {job_id}")
-        print(f"Using headers: {headers}")
-        
-        # Use the "Get Job" endpoint from the Jobs section
-        response = requests.get(
-            f"{PICTORY_API_BASE_URL}/pictoryapis/v1/jobs/{job_id}",
-            headers=headers
-        )
-        
-        print(f"Pictory job status response: {response.status_code} - {response.text}")
-        
-        if response.status_code == 200:
-            data = response.json().get("data", {})
-            print(f"Pictory job data: {data}")
-            return data
-        else:
-            print(f"Pictory job status error: {response.status_code} - {response.text}")
-            return None
-    except Exception as e:
-        print(f"Error checking Pictory job status: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return None
+    """Return the data of a Pictory job, or None if Pictory does not know it (yet).
 
-@app.route("/api/generate_video", methods=["POST"])
-def generate_video():
+    Raises reconciler.VendorError when Pictory is unavailable.
+    """
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "X-Pictory-User-Id": PICTORY_USER_ID,
+        "accept": "application/json",
+        "Content-Type": "application/json"
+    }
+    # Use the "Get Job" endpoint from the Jobs section
+    response = pictory_request("GET", f"{PICTORY_API_BASE_URL}/pictoryapis/v1/jobs/{job_id}", headers=headers)
+    if response.status_code == 200:
+        return response.json().get("data", {})
+    print(f"Pictory job status error: {response.status_code} - {response.text}")
+    return None
+
+def start_heygen_video(case_study_id):
+    """Write the script and submit the HeyGen video for a case study. Returns ``(payload, status_code)``."""
     session_db = SessionLocal()
     try:
-        data = request.get_json()
-        case_study_id = data.get('case_study_id')
-        
-        if not case_study_id:
-            return jsonify({"error": "Case study ID is required"}), 400
-            
         case_study = session_db.query(CaseStudy).filter_by(id=case_study_id).first()
         if not case_study:
-            return jsonify({"error": "Case study not found"}), 404
+            return {"error": "Case study not found"}, 404
             
         if not case_study.final_summary:
-            return jsonify({"error": "Final summary is required for video generation"}), 400
+            return {"error": "Final summary is required for video generation"}, 400
 
         # Prevent multiple video generations for the same case study
-        if case_study.video_id:
-            return jsonify({"error": "A video has already been generated for this case study."}), 400
+        if latest_media_job(session_db, case_study.id, "heygen"):
+            return {"error": "A video has already been generated for this case study."}, 400
 
         # Generate optimized input text for HeyGen
-        input_text = generate_heygen_input_text(case_study.final_summary)
+        input_text = generate_heygen_input_text(case_study.final_summary, case_study_names(case_study), case_study_language(case_study))
         if not input_text:
-            return jsonify({"error": "Failed to generate optimized input text"}), 500
+            return {"error": "Failed to generate optimized input text"}, 500
 
         # Prepare the request to HeyGen API V2
         headers = {
@@ -2202,7 +2524,8 @@ def generate_video():
         response = requests.post(
             f"{HEYGEN_API_BASE_URL}/video/generate",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=60
         )
 
         print(f"HeyGen API response status: {response.status_code}")
@@ -2214,141 +2537,143 @@ def generate_video():
             
             if not video_id:
                 print("No video_id in response:", video_data)
-                return jsonify({
+                return {
                     "status": "error",
                     "error": "No video ID received from HeyGen API"
-                }), 500
+                }, 500
             
-            # Update case study with video information
-            case_study.video_id = video_id
-            case_study.video_status = 'processing'
-            case_study.video_created_at = datetime.now(UTC)  # Use timezone-aware datetime
+            # Track the video until the media reconciler sees it finish
+            session_db.add(MediaJob(case_study_id=case_study.id, provider="heygen", external_id=video_id,
+                                    status='processing', created_at=datetime.now(UTC)))
             session_db.commit()
             print(f"Saved video_id {video_id} to case study {case_study.id}")
             
-            return jsonify({
+            return {
                 "status": "success",
                 "video_id": video_id,
                 "message": "Video generation started"
-            })
+            }, 200
         else:
             error_message = f"HeyGen API error: {response.text}"
             print(error_message)
-            return jsonify({
+            return {
                 "status": "error",
                 "error": error_message
-            }), response.status_code
+            }, response.status_code
 
     except Exception as e:
         session_db.rollback()
         print(f"Error in generate_video: {str(e)}")
-        return jsonify({"status": "error", "error": str(e)}), 500
+        return {"status": "error", "error": str(e)}, 500
     finally:
         session_db.close()
 
+@app.route("/api/generate_video", methods=["POST"])
+def generate_video():
+    data = request.get_json()
+    case_study_id = data.get('case_study_id')
+    
+    if not case_study_id:
+        return jsonify({"error": "Case study ID is required"}), 400
+
+    if wants_async(data):
+        # The HeyGen submission is not idempotent, so it is never retried automatically
+        return enqueue_job_response("heygen_video", {"case_study_id": case_study_id}, case_study_id, max_attempts=1)
+
+    payload, status_code = start_heygen_video(case_study_id)
+    return jsonify(payload), status_code
+
+# Log the case study matched by every status endpoint call
+STATUS_POLL_DEBUG = os.getenv("STATUS_POLL_DEBUG", "0") == "1"
+
+def find_media_job(session_db, provider, external_id, user_id):
+    """The user's job at ``provider`` with the vendor's ``external_id``."""
+    job = (
+        session_db.query(MediaJob)
+        .join(CaseStudy, CaseStudy.id == MediaJob.case_study_id)
+        .filter(MediaJob.provider == provider, MediaJob.external_id == external_id, CaseStudy.user_id == user_id)
+        .first()
+    )
+    if STATUS_POLL_DEBUG:
+        print(f"🔎 {provider} {external_id}: " + (
+            f"media job {job.id} of case study {job.case_study_id} (status={job.status}, url={job.url})"
+            if job else "no matching media job"))
+    return job
+
+def latest_media_job(session_db, case_study_id, provider):
+    """The case study's newest job at ``provider``, or None."""
+    return (
+        session_db.query(MediaJob)
+        .filter_by(case_study_id=case_study_id, provider=provider)
+        .order_by(MediaJob.id.desc())
+        .first()
+    )
+
+def media_details(job, **changes):
+    """The job's JSON details with ``changes`` applied."""
+    details = json.loads(job.details) if job.details else {}
+    details.update(changes)
+    return json.dumps(details, ensure_ascii=False)
+
 @app.route("/api/video_status/<video_id>", methods=["GET"])
 def check_video_status(video_id):
+    """Status of one of the user's HeyGen videos, as last stored by the media reconciler."""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
     if not video_id:
         return jsonify({"error": "Video ID is required"}), 400
-        
+
+    session_db = SessionLocal()
     try:
-        headers = {
-            "accept": "application/json",
-            "x-api-key": HEYGEN_API_KEY
-        }
-        
-        print(f"Checking status for video ID: {video_id}")
-        # Use the correct v1 endpoint for status check
-        response = requests.get(
-            f"https://api.heygen.com/v1/video_status.get",
-            headers=headers,
-            params={"video_id": video_id}
-        )
-        
-        print(f"HeyGen API response status: {response.status_code}")
-        print(f"HeyGen API response: {response.text}")
-        
-        if response.status_code == 404:
-            print("HeyGen video not ready yet (404).")
-            return jsonify({"status": "not_ready", "message": "Video not ready yet"}), 200
-        
-        if response.status_code != 200:
-            error_msg = f"HeyGen API error: {response.text}"
-            print(error_msg)
-            return jsonify({"error": error_msg}), 500
-            
-        video_data = response.json()
-        print(f"HeyGen video status response: {video_data}")
-        
-        # Update case study with video status and URL if completed
-        session_db = SessionLocal()
-        try:
-            # Print all video IDs in DB for debugging
-            all_ids = [cs.video_id for cs in session_db.query(CaseStudy).all()]
-            print("All video IDs in DB:", all_ids)
-            case_study = session_db.query(CaseStudy).filter_by(video_id=video_id).first()
-            
-            if case_study:
-                # The status is in the data object
-                status = video_data.get("data", {}).get("status")
-                print(f"Video status from API: {status}")
-                case_study.video_status = status
-                
-                if status == "completed":
-                    # Get the video URL from the API response
-                    video_url = video_data.get("data", {}).get("video_url")
-                    print(f"Video URL from API: {video_url}")
-                    
-                    if video_url:
-                        case_study.video_url = video_url
-                        session_db.commit()
-                        print(f"Video URL saved to database: {case_study.video_url}")
-                        return jsonify({
-                            "status": "completed",
-                            "video_url": video_url
-                        })
-                    else:
-                        print("Video completed but no URL in response")
-                        return jsonify({
-                            "status": "completed",
-                            "message": "Video completed but URL not available yet"
-                        })
-                elif status == "failed":
-                    error = video_data.get("data", {}).get("error")
-                    return jsonify({
-                        "status": "failed",
-                        "message": f"Video generation failed: {error}" if error else "Video generation failed"
-                    })
-                elif status in ["processing", "pending"]:
-                    return jsonify({
-                        "status": status,
-                        "message": "Video is being processed"
-                    })
-                else:
-                    # For any other status, return it as is
-                    return jsonify({
-                        "status": status,
-                        "message": f"Video is {status}"
-                    })
-                
-                session_db.commit()
-            
-            print(f"No case study found for video ID: {video_id}")
-            return jsonify(video_data)
-            
-        except Exception as db_error:
-            session_db.rollback()
-            print(f"Database error: {str(db_error)}")
-            return jsonify({"error": "Database error occurred"}), 500
-        finally:
-            session_db.close()
-            
-    except requests.RequestException as e:
-        print(f"Request error: {str(e)}")
-        return jsonify({"error": f"Failed to connect to HeyGen API: {str(e)}"}), 500
-    except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+        job = find_media_job(session_db, "heygen", video_id, user_id)
+        if not job:
+            return jsonify({"status": "not_found", "message": "Video not found"}), 404
+
+        status = job.status or "pending"
+        if status == "completed":
+            if job.url:
+                return jsonify({"status": "completed", "video_url": job.url})
+            return jsonify({"status": "completed", "message": "Video completed but URL not available yet"})
+        if status == "failed":
+            error = job.error
+            return jsonify({
+                "status": "failed",
+                "message": f"Video generation failed: {error}" if error else "Video generation failed"
+            })
+        if status in ["processing", "pending"]:
+            return jsonify({"status": status, "message": "Video is being processed"})
+        return jsonify({"status": status, "message": f"Video is {status}"})
+    finally:
+        session_db.close()
+
+@reconciler.provider("heygen", ("pending", "processing", "waiting"))
+def reconcile_heygen_video(job):
+    """Poll HeyGen for one in-flight video and return the columns to update."""
+    response = reconciler.request(
+        "GET", "https://api.heygen.com/v1/video_status.get",
+        headers={"accept": "application/json", "x-api-key": HEYGEN_API_KEY},
+        params={"video_id": job.external_id}
+    )
+    if response.status_code == 404:
+        # Not ready yet
+        return {}
+    if response.status_code != 200:
+        return {"status": "failed", "error": f"HeyGen API error: {response.text}"}
+
+    # The status is in the data object
+    video_data = response.json().get("data", {})
+    status = video_data.get("status")
+    if status == "completed":
+        video_url = video_data.get("video_url")
+        # Keep polling until HeyGen hands out the URL
+        return {"status": "completed", "url": video_url} if video_url else {}
+    if status == "failed":
+        error = video_data.get("error")
+        return {"status": "failed", "error": str(error) if error else "Video generation failed"}
+    if status and status != job.status:
+        return {"status": status}
+    return {}
 
 @app.route("/api/generate_pictory_video", methods=["POST"])
 def generate_pictory_video():
@@ -2368,7 +2693,7 @@ def generate_pictory_video():
             return jsonify({"error": "Final summary is required for video generation"}), 400
 
         # Prevent multiple Pictory video generations for the same case study
-        if case_study.pictory_storyboard_id:
+        if latest_media_job(session_db, case_study.id, "pictory"):
             return jsonify({"error": "A Pictory video has already been generated for this case study."}), 400
 
         # Get Pictory access token
@@ -2377,7 +2702,7 @@ def generate_pictory_video():
             return jsonify({"error": "Failed to get Pictory access token"}), 500
 
         # Generate scene-based text for Pictory
-        scenes = generate_pictory_scenes_text(case_study.final_summary)
+        scenes = generate_pictory_scenes_text(case_study.final_summary, case_study_names(case_study), case_study_language(case_study))
         if not scenes:
             return jsonify({"error": "Failed to generate scenes text"}), 500
 
@@ -2389,10 +2714,9 @@ def generate_pictory_video():
         if not storyboard_job_id:
             return jsonify({"error": "Failed to create Pictory storyboard"}), 500
 
-        # Update case study with Pictory information
-        case_study.pictory_storyboard_id = storyboard_job_id
-        case_study.pictory_video_status = 'storyboard_processing'
-        case_study.pictory_video_created_at = datetime.now(UTC)
+        # The media reconciler takes the video through storyboard and render from here
+        session_db.add(MediaJob(case_study_id=case_study.id, provider="pictory", external_id=storyboard_job_id,
+                                status='storyboard_processing', created_at=datetime.now(UTC)))
         session_db.commit()
         
         print(f"Saved Pictory storyboard_id {storyboard_job_id} to case study {case_study.id}")
@@ -2412,150 +2736,147 @@ def generate_pictory_video():
 
 @app.route("/api/pictory_video_status/<storyboard_job_id>", methods=["GET"])
 def check_pictory_video_status(storyboard_job_id):
+    """Status of one of the user's Pictory videos, as last stored by the media reconciler."""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
     if not storyboard_job_id:
         return jsonify({"error": "Storyboard job ID is required"}), 400
-        
+
+    session_db = SessionLocal()
     try:
-        print(f"Checking Pictory video status for storyboard_job_id: {storyboard_job_id}")
-        
-        # Get Pictory access token
-        token = get_pictory_access_token()
-        if not token:
-            print("Failed to get Pictory access token")
-            return jsonify({"error": "Failed to get Pictory access token"}), 500
+        job = find_media_job(session_db, "pictory", storyboard_job_id, user_id)
+        if not job:
+            return jsonify({"status": "not_found", "message": "Pictory video not found"}), 404
 
-        # Check storyboard status
-        storyboard_status = check_pictory_job_status(token, storyboard_job_id)
-        if not storyboard_status:
-            print("Failed to check storyboard status")
-            return jsonify({"error": "Failed to check storyboard status"}), 500
+        status = job.status or "storyboard_processing"
+        if status == "completed":
+            return jsonify({
+                "status": "completed",
+                "video_url": job.url,
+                "message": "Video is ready"
+            })
+        if status == "failed":
+            return jsonify({
+                "status": "failed",
+                "error": job.error or "Video rendering failed"
+            })
+        if status in ("storyboard_done", "rendering"):
+            return jsonify({
+                "status": "rendering",
+                "render_job_id": job.detail("render_id"),
+                "message": "Video is rendering"
+            })
+        return jsonify({"status": status, "message": f"Storyboard is {status}"})
+    finally:
+        session_db.close()
 
-        status = storyboard_status.get("status", "unknown")
-        print(f"Storyboard status: {status}")
-        
-        # If storyboard is completed, start rendering
-        if status == "completed" and storyboard_status.get("renderParams"):
-            # Get case study to check if we need to start rendering
-            session_db = SessionLocal()
-            try:
-                case_study = session_db.query(CaseStudy).filter_by(pictory_storyboard_id=storyboard_job_id).first()
-                if case_study and not case_study.pictory_render_id:
-                    # Start rendering
-                    render_job_id = render_pictory_video(token, storyboard_job_id)
-                    if render_job_id:
-                        case_study.pictory_render_id = render_job_id
-                        case_study.pictory_video_status = 'rendering'
-                        session_db.commit()
-                        
-                        return jsonify({
-                            "status": "rendering",
-                            "render_job_id": render_job_id,
-                            "message": "Video rendering started"
-                        })
-                    else:
-                        return jsonify({
-                            "status": "error",
-                            "error": "Failed to start video rendering"
-                        }), 500
-            finally:
-                session_db.close()
-        
-        # Check if storyboard status already contains video URL (completed video)
-        if status == "completed" and storyboard_status.get("videoURL"):
-            print(f"Storyboard already contains video URL: {storyboard_status.get('videoURL')}")
-            # Video is already completed in storyboard status
-            session_db = SessionLocal()
-            try:
-                case_study = session_db.query(CaseStudy).filter_by(pictory_storyboard_id=storyboard_job_id).first()
-                if case_study:
-                    video_url = storyboard_status.get("videoURL")
-                    case_study.pictory_video_url = video_url
-                    case_study.pictory_video_status = 'completed'
-                    session_db.commit()
-                    
-                    return jsonify({
-                        "status": "completed",
-                        "video_url": video_url,
-                        "message": "Video is ready"
-                    })
-            finally:
-                session_db.close()
-        
-        # If we have a render job, check its status
-        session_db = SessionLocal()
-        try:
-            case_study = session_db.query(CaseStudy).filter_by(pictory_storyboard_id=storyboard_job_id).first()
-            if case_study and case_study.pictory_render_id:
-                print(f"Checking render job status for render_id: {case_study.pictory_render_id}")
-                render_status = check_pictory_job_status(token, case_study.pictory_render_id)
-                if render_status:
-                    render_status_value = render_status.get("status", "unknown")
-                    print(f"Render status: {render_status_value}")
-                    
-                    if render_status_value == "completed":
-                        # Video is ready - check for video URL in various possible fields
-                        video_url = (
-                            render_status.get("videoURL") or  # Try videoURL first
-                            render_status.get("videoUrl") or  # Try videoUrl
-                            render_status.get("output", {}).get("videoUrl") or  # Try nested output.videoUrl
-                            render_status.get("output", {}).get("videoURL")  # Try nested output.videoURL
-                        )
-                        if video_url:
-                            case_study.pictory_video_url = video_url
-                            case_study.pictory_video_status = 'completed'
-                            session_db.commit()
-                            
-                            return jsonify({
-                                "status": "completed",
-                                "video_url": video_url,
-                                "message": "Video is ready"
-                            })
-                        else:
-                            print(f"No video URL found in render status: {render_status}")
-                            return jsonify({
-                                "status": "error",
-                                "error": "Video completed but no URL found"
-                            }), 500
-                    elif render_status_value == "failed":
-                        case_study.pictory_video_status = 'failed'
-                        session_db.commit()
-                        
-                        return jsonify({
-                            "status": "failed",
-                            "error": "Video rendering failed"
-                        }), 500
-                    else:
-                        return jsonify({
-                            "status": "rendering",
-                            "message": f"Video is {render_status_value}"
-                        })
-        finally:
-            session_db.close()
-        
-        # Return storyboard status
-        return jsonify({
-            "status": status,
-            "message": f"Storyboard is {status}"
-        })
-        
-    except Exception as e:
-        print(f"Error checking Pictory video status: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({"status": "error", "error": str(e)}), 500
+def pictory_render_url(render_status):
+    """The video URL of a completed render job, from whichever field Pictory used."""
+    return (
+        render_status.get("videoURL") or
+        render_status.get("videoUrl") or
+        render_status.get("output", {}).get("videoUrl") or
+        render_status.get("output", {}).get("videoURL")
+    )
+
+# Pictory videos move through these states, advanced by the media reconciler:
+#   storyboard_processing -> storyboard_done -> rendering -> completed | failed
+# The details key stamped when each later state is entered (the first one starts at created_at)
+PICTORY_STATE_STARTED = {
+    "storyboard_done": "storyboard_done_at",
+    "rendering": "render_started_at",
+    "completed": "finished_at",
+    "failed": "finished_at",
+}
 
-def generate_podcast_prompt(final_summary):
+def pictory_transition(job, status, details=None, **updates):
+    """Column updates that move a Pictory job to ``status``, stamping and logging the transition."""
+    now = datetime.now(UTC)
+    entered = job.created_at
+    if job.status in PICTORY_STATE_STARTED:
+        stamp = job.detail(PICTORY_STATE_STARTED[job.status])
+        entered = datetime.fromisoformat(stamp) if stamp else None
+    if entered:
+        if entered.tzinfo is None:
+            entered = entered.replace(tzinfo=UTC)
+        print(f"⏱️ Pictory case study {job.case_study_id}: {job.status} → {status} "
+              f"after {(now - entered).total_seconds():.1f}s")
+    updates.update({
+        "status": status,
+        "details": media_details(job, **(details or {}), **{PICTORY_STATE_STARTED[status]: now.isoformat()}),
+    })
+    return updates
+
+def pictory_check_storyboard(token, job):
+    storyboard_status = check_pictory_job_status(token, job.external_id)
+    if not storyboard_status:
+        return {}
+    status = storyboard_status.get("status")
+    if status == "completed" and storyboard_status.get("videoURL"):
+        # The storyboard job already produced the video
+        return pictory_transition(job, "completed", url=storyboard_status.get("videoURL"))
+    if status == "completed" and storyboard_status.get("renderParams"):
+        return pictory_transition(job, "storyboard_done")
+    if status == "failed":
+        return pictory_transition(job, "failed", error="Storyboard creation failed")
+    return {}
+
+def pictory_start_render(token, job):
+    render_job_id, error = render_pictory_video(token, job.external_id)
+    if not render_job_id:
+        # Pictory answered but will not render this storyboard; retrying would not help
+        return pictory_transition(job, "failed", error=f"Failed to start video rendering: {error}")
+    return pictory_transition(job, "rendering", details={"render_id": render_job_id})
+
+def pictory_check_render(token, job):
+    render_status = check_pictory_job_status(token, job.detail("render_id"))
+    if not render_status:
+        return {}
+    status = render_status.get("status")
+    if status == "completed":
+        video_url = pictory_render_url(render_status)
+        if video_url:
+            return pictory_transition(job, "completed", url=video_url)
+        return pictory_transition(job, "failed", error="Video completed but no URL found")
+    if status == "failed":
+        return pictory_transition(job, "failed", error="Video rendering failed")
+    return {}
+
+# The step that runs for a Pictory video in each in-flight state
+PICTORY_STEPS = {
+    "storyboard_processing": pictory_check_storyboard,
+    "storyboard_done": pictory_start_render,
+    "rendering": pictory_check_render,
+}
+
+@reconciler.provider("pictory", tuple(PICTORY_STEPS))
+def reconcile_pictory_video(job):
+    """Run the Pictory state machine step for the video's current state.
+
+    A storyboard that turns ``storyboard_done`` is picked up again immediately, so the render
+    starts as soon as the storyboard finishes.
+    """
+    token = get_pictory_access_token()
+    if not token:
+        raise reconciler.VendorError("Failed to get Pictory access token")
+    return PICTORY_STEPS[job.status](token, job)
+
+def generate_podcast_prompt(final_summary, names=None, language=None):
     """Generate a podcast prompt based on the final case study summary."""
     try:
         # Extract key information from the case study
         lines = final_summary.split('\n')
         
-        # Find the actual title
+        # Find the actual title, preferring the names stored on the case study
         title = "Business Case Study"
-        for line in lines:
-            if line.strip() and not line.startswith('**') and not line.startswith('-') and ':' in line:
-                title = line.split(':')[0].strip()
-                break
+        if names and names["project_title"] != "Unknown Project":
+            title = names["project_title"]
+        else:
+            for line in lines:
+                if line.strip() and not line.startswith('**') and not line.startswith('-') and ':' in line:
+                    title = line.split(':')[0].strip()
+                    break
         
         # Extract a clean summary (first 800 characters)
         content = ""
@@ -2584,6 +2905,7 @@ The conversation should feel human and real — like the host and guest are riff
 
 Use only the information provided below. Return a natural, high-energy podcast episode description (max 300 words) that captures the vibe of a modern, conversational business story.
 
+{format_names_for_prompt(names)}{format_language_for_prompt(language)}
 Success story summary:
 {content}
 
@@ -2619,18 +2941,8 @@ def generate_podcast():
         if not WONDERCRAFT_API_KEY:
             return jsonify({"error": "Wondercraft API key not configured"}), 500
 
-        # Clear any previous failed podcast data if this is a retry
-        if case_study.podcast_status == 'failed':
-            print(f"Clearing previous failed podcast data for case study {case_study.id}")
-            case_study.podcast_job_id = None
-            case_study.podcast_url = None
-            case_study.podcast_script = None
-            case_study.podcast_status = None
-            case_study.podcast_created_at = None
-            session_db.commit()
-
         # Generate podcast prompt
-        podcast_prompt = generate_podcast_prompt(case_study.final_summary)
+        podcast_prompt = generate_podcast_prompt(case_study.final_summary, case_study_names(case_study), case_study_language(case_study))
         if not podcast_prompt:
             return jsonify({"error": "Failed to generate podcast prompt"}), 500
 
@@ -2672,10 +2984,9 @@ def generate_podcast():
                     "error": "No job ID received from Wondercraft API"
                 }), 500
             
-            # Update case study with podcast information
-            case_study.podcast_job_id = job_id
-            case_study.podcast_status = 'processing'
-            case_study.podcast_created_at = datetime.now(UTC)
+            # A retry adds a new job; the newest one is the case study's podcast
+            session_db.add(MediaJob(case_study_id=case_study.id, provider="wondercraft", external_id=job_id,
+                                    status='processing', created_at=datetime.now(UTC)))
             session_db.commit()
             print(f"Saved podcast_job_id {job_id} to case study {case_study.id}")
             
@@ -2711,99 +3022,57 @@ def generate_podcast():
 
 @app.route("/api/podcast_status/<job_id>", methods=["GET"])
 def check_podcast_status(job_id):
+    """Status of one of the user's Wondercraft podcasts, as last stored by the media reconciler."""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({"error": "Unauthorized"}), 401
     if not job_id:
         return jsonify({"error": "Job ID is required"}), 400
-        
+
+    session_db = SessionLocal()
     try:
-        headers = {
-            "X-API-KEY": WONDERCRAFT_API_KEY  # Fixed header format
-        }
-        
-        print(f"Checking podcast status for job ID: {job_id}")
-        response = requests.get(
-            f"{WONDERCRAFT_API_BASE_URL}/podcast/{job_id}",
-            headers=headers,
-            timeout=10
-        )
-        
-        print(f"Wondercraft API response status: {response.status_code}")
-        print(f"Wondercraft API response: {response.text}")
-        
-        if response.status_code == 404:
-            print("Wondercraft podcast not ready yet (404).")
-            return jsonify({"status": "not_ready", "message": "Podcast not ready yet"}), 200
-        
-        if response.status_code != 200:
-            error_msg = f"Wondercraft API error: {response.text}"
-            print(error_msg)
-            return jsonify({"error": error_msg}), 500
-            
-        podcast_data = response.json()
-        print(f"Wondercraft podcast status response: {podcast_data}")
-        
-        # Update case study with podcast status and URL if completed
-        session_db = SessionLocal()
-        try:
-            case_study = session_db.query(CaseStudy).filter_by(podcast_job_id=job_id).first()
-            if case_study:
-                status = podcast_data.get('finished', False)
-                error = podcast_data.get('error', False)
-                url = podcast_data.get('url')
-                script = podcast_data.get('script')
-                
-                print(f"Status: {status}, Error: {error}, URL: {url}, Script: {script is not None}")
-                
-                if status and not error and url:
-                    # Podcast generation completed successfully
-                    case_study.podcast_status = 'completed'
-                    case_study.podcast_url = url
-                    case_study.podcast_script = script
-                    session_db.commit()
-                    print(f"Podcast completed for case study {case_study.id}")
-                    
-                    return jsonify({
-                        "status": "completed",
-                        "url": url,
-                        "script": script,
-                        "message": "Podcast generation completed"
-                    })
-                elif error:
-                    # Podcast generation failed
-                    case_study.podcast_status = 'failed'
-                    session_db.commit()
-                    print(f"Podcast generation failed for case study {case_study.id}")
-                    
-                    return jsonify({
-                        "status": "failed",
-                        "message": "Podcast generation failed",
-                        "details": podcast_data
-                    })
-                else:
-                    # Still processing
-                    case_study.podcast_status = 'processing'
-                    session_db.commit()
-                    
-                    return jsonify({
-                        "status": "processing",
-                        "message": "Podcast is being generated"
-                    })
-                
-            print(f"No case study found for podcast job ID: {job_id}")
-            return jsonify(podcast_data)
-            
-        except Exception as db_error:
-            session_db.rollback()
-            print(f"Database error: {str(db_error)}")
-            return jsonify({"error": "Database error occurred"}), 500
-        finally:
-            session_db.close()
-            
-    except requests.RequestException as e:
-        print(f"Request error: {str(e)}")
-        return jsonify({"error": f"Failed to connect to Wondercraft API: {str(e)}"}), 500
-    except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
+        job = find_media_job(session_db, "wondercraft", job_id, user_id)
+        if not job:
+            return jsonify({"status": "not_found", "message": "Podcast not found"}), 404
+
+        if job.status == "completed":
+            return jsonify({
+                "status": "completed",
+                "url": job.url,
+                "script": job.detail("script"),
+                "message": "Podcast generation completed"
+            })
+        if job.status == "failed":
+            return jsonify({
+                "status": "failed",
+                "message": "Podcast generation failed",
+                "details": job.error
+            })
+        return jsonify({"status": "processing", "message": "Podcast is being generated"})
+    finally:
+        session_db.close()
+
+@reconciler.provider("wondercraft", ("processing",))
+def reconcile_wondercraft_podcast(job):
+    """Poll Wondercraft for one in-flight podcast and return the columns to update."""
+    response = reconciler.request(
+        "GET", f"{WONDERCRAFT_API_BASE_URL}/podcast/{job.external_id}",
+        headers={"X-API-KEY": WONDERCRAFT_API_KEY}
+    )
+    if response.status_code == 404:
+        # Not ready yet
+        return {}
+    if response.status_code != 200:
+        return {"status": "failed", "error": f"Wondercraft API error: {response.text}"}
+
+    podcast_data = response.json()
+    error = podcast_data.get('error', False)
+    url = podcast_data.get('url')
+    if podcast_data.get('finished', False) and not error and url:
+        return {"status": "completed", "url": url, "details": media_details(job, script=podcast_data.get('script'))}
+    if error:
+        return {"status": "failed", "error": json.dumps(podcast_data, ensure_ascii=False)}
+    return {}
 
 @app.route("/save_as_word", methods=["POST"])
 def save_as_word():
@@ -2893,13 +3162,13 @@ def serve_podcast_audio(case_study_id):
     """Proxy endpoint to serve podcast audio files to avoid CORS issues."""
     try:
         session_db = SessionLocal()
-        case_study = session_db.query(CaseStudy).filter_by(id=case_study_id).first()
+        podcast = latest_media_job(session_db, case_study_id, "wondercraft")
         
-        if not case_study or not case_study.podcast_url:
+        if not podcast or not podcast.url:
             return jsonify({"error": "Podcast not found"}), 404
         
         # Fetch the audio file from the external URL
-        response = requests.get(case_study.podcast_url, stream=True, timeout=30)
+        response = requests.get(podcast.url, stream=True, timeout=30)
         
         if response.status_code != 200:
             return jsonify({"error": "Failed to fetch audio file"}), 500
@@ -2931,6 +3200,53 @@ def serve_podcast_audio(case_study_id):
     finally:
         session_db.close()
 
+@app.cli.command("backfill-names")
+@click.option("--batch-size", default=100, show_default=True, help="Rows committed per batch.")
+@click.option("--local-only", is_flag=True, help="Only use the local title parser, never the LLM.")
+def backfill_names_command(batch_size, local_only):
+    """Populate provider/client/project name columns on existing case studies."""
+    session_db = SessionLocal()
+    try:
+        last_id = 0
+        updated = 0
+        while True:
+            batch = (
+                session_db.query(CaseStudy)
+                .filter(CaseStudy.id > last_id)
+                .filter(CaseStudy.provider_name.is_(None), CaseStudy.project_name.is_(None))
+                .order_by(CaseStudy.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+            for case_study in batch:
+                last_id = case_study.id
+                provider_interview = case_study.solution_provider_interview
+                source = case_study.final_summary or (provider_interview.summary if provider_interview else "") or ""
+                if local_only:
+                    names, _confidence = name_parser.parse_names(source)
+                else:
+                    names = extract_names_from_case_study(source)
+                case_study.provider_name = names["lead_entity"]
+                case_study.client_name = names["partner_entity"]
+                case_study.project_name = names["project_title"]
+                updated += 1
+            session_db.commit()
+            print(f"✅ Backfilled names for {updated} case studies (up to id {last_id})")
+    except Exception as e:
+        session_db.rollback()
+        print(f"❌ Name backfill failed: {str(e)}")
+        raise
+    finally:
+        session_db.close()
+
+startup.mark("routes")
+startup.report()
+
 if __name__ == "__main__":
+    # Spawned stage processes would import this file again (as __mp_main__) and build the whole
+    # app, so the development server renders on its threads instead
+    stages.STAGE_PROCESSES = 0
     port = int(os.environ.get("PORT", 10000))
     app.run(host="0.0.0.0", port=port)
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""Small dependency-graph runner for the independent post-processing stages of a request.
+
+I/O-bound stages (LLM round trips, light text analysis) run on a shared thread pool and
+CPU-bound rendering (matplotlib, plotly, FPDF) on a process pool, so a request takes about as
+long as its slowest chain of stages instead of the sum of all of them.
+
+The pools are created lazily, one set per process. Every gunicorn worker gets its own, so the
+process pool defaults to a single process (``STAGE_PROCESSES``); ``worker.py`` sizes its own
+with ``--stage-processes``.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+STAGE_THREADS = int(os.getenv("STAGE_THREADS", "4"))
+STAGE_PROCESSES = int(os.getenv("STAGE_PROCESSES", "1"))  # per process; 0 runs CPU stages on the thread pool
+
+_thread_pool = None
+_process_pool = None
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+
+class Stage:
+    """One unit of work in a stage graph.
+
+    ``args`` is a tuple, or a callable that receives the results of the finished stages and
+    returns the tuple, for stages whose input comes from a dependency. ``kind="cpu"`` stages
+    run in the process pool, so their ``fn`` and arguments must be picklable. A failing
+    ``optional`` stage is logged and yields None (as do the stages depending on it) instead of
+    failing the whole graph.
+    """
+
+    def __init__(self, name, fn, args=(), deps=(), kind="io", optional=False):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.deps = tuple(deps)
+        self.kind = kind
+        self.optional = optional
+
+
+def _timed(fn, *args):
+    # Module-level so it can be pickled into the process pool
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def _executors():
+    """Return this process's (thread pool, process pool), recreating them after a fork."""
+    global _thread_pool, _process_pool, _pools_pid
+    pid = os.getpid()
+    if _thread_pool is None or _pools_pid != pid:
+        with _pools_lock:
+            if _thread_pool is None or _pools_pid != pid:
+                _thread_pool = ThreadPoolExecutor(max_workers=STAGE_THREADS, thread_name_prefix="stage")
+                _process_pool = _new_process_pool()
+                _pools_pid = pid
+    return _thread_pool, _process_pool
+
+
+def _new_process_pool():
+    if STAGE_PROCESSES <= 0:
+        return None
+    # Spawned children do not inherit the parent's threads and locks (LLM pool, job workers)
+    return ProcessPoolExecutor(max_workers=STAGE_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _reset_process_pool():
+    global _process_pool
+    with _pools_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = _new_process_pool()
+
+
+def _stage_failed(stage, error, results, failed):
+    """Record an optional stage's failure, or re-raise it for a required stage."""
+    if not stage.optional:
+        raise error
+    print(f"⚠️ Optional stage '{stage.name}' failed: {str(error)}")
+    results[stage.name] = None
+    failed.add(stage.name)
+
+
+def run(stages, label="stages"):
+    """Run the stages as soon as their dependencies finish and return ``(results, timings_ms)``.
+
+    ``results`` maps stage names to return values. ``timings_ms`` has the time spent inside each
+    stage plus ``total``, the wall time of the whole graph.
+    """
+    started = time.perf_counter()
+    thread_pool, process_pool = _executors()
+    pending = {stage.name: stage for stage in stages}
+    results, timings, failed = {}, {}, set()
+    running = {}
+
+    try:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(dep in failed for dep in stage.deps):
+                    del pending[name]
+                    results[name] = None
+                    failed.add(name)
+                    continue
+                if not all(dep in results for dep in stage.deps):
+                    continue
+                del pending[name]
+                try:
+                    args = stage.args(results) if callable(stage.args) else stage.args
+                except Exception as e:
+                    _stage_failed(stage, e, results, failed)
+                    continue
+                executor = process_pool if stage.kind == "cpu" and process_pool else thread_pool
+                running[executor.submit(_timed, stage.fn, *args)] = stage
+
+            if not running:
+                if not pending:
+                    # The last stages were skipped because their arguments could not be built
+                    break
+                raise ValueError(f"Unresolvable stage dependencies: {sorted(pending)}")
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                try:
+                    results[stage.name], timings[stage.name] = future.result()
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        _reset_process_pool()
+                    _stage_failed(stage, e, results, failed)
+    finally:
+        for future in running:
+            future.cancel()
+
+    timings = {name: round(ms, 1) for name, ms in timings.items()}
+    timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"⏱️ {label}: {timings['total']:.0f} ms total ("
+          + ", ".join(f"{name} {ms:.0f} ms" for name, ms in timings.items() if name != "total") + ")")
+    return results, timings
@@ -0,0 +1,100 @@
+"""Boot-time budget for server.py.
+
+``server.py`` calls ``mark`` after each boot phase (imports, database init, route setup) and
+``report`` once the module is loaded, so every worker logs where its start-up time went.
+``warm`` loads the lazily imported heavy dependencies up front; the gunicorn ``when_ready``
+hook calls it under ``--preload`` so workers share those pages copy-on-write.
+
+For a per-module breakdown of the imports run:
+
+    cd backend && python startup.py [--top N]
+
+which imports server.py under ``python -X importtime`` and summarises the slowest modules.
+"""
+import os
+import time
+
+_started = time.perf_counter()
+_last = _started
+_phases = []
+
+
+def mark(phase):
+    """Record the time since the previous mark (or since this module was imported) as ``phase``."""
+    global _last
+    now = time.perf_counter()
+    _phases.append((phase, (now - _last) * 1000))
+    _last = now
+
+
+def report():
+    """Print and return the boot phases in milliseconds, with their ``total``."""
+    timings = {phase: round(ms, 1) for phase, ms in _phases}
+    timings["total"] = round((_last - _started) * 1000, 1)
+    print(f"🚀 Boot (pid {os.getpid()}): {timings['total']:.0f} ms ("
+          + ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in _phases) + ")")
+    return timings
+
+
+def warm():
+    """Import and initialise the lazily loaded heavy dependencies now instead of on first use."""
+    import analytics
+    import artifacts
+    import language
+
+    started = time.perf_counter()
+    analytics.get_analyzer()
+    mark("warm vader")
+    language.warm()
+    mark("warm langdetect")
+    if artifacts.CHART_RENDERER != "svg":
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot  # noqa: F401
+        import plotly.graph_objects  # noqa: F401
+        mark("warm matplotlib/plotly")
+    import fpdf  # noqa: F401
+    mark("warm fpdf")
+    print(f"🔥 Heavy dependencies warmed in {(time.perf_counter() - started) * 1000:.0f} ms (pid {os.getpid()})")
+
+
+def importtime_summary(module="server", top=15):
+    """Import ``module`` in a child ``python -X importtime`` and return ``(total_us, slowest)``.
+
+    ``slowest`` lists ``(cumulative_us, self_us, name)`` for the top-level imports that took longest.
+    """
+    import subprocess
+    import sys
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # One space separates the column from the name; nested imports are indented further
+        rows.append((int(cumulative_us), int(self_us), name[1:].rstrip()))
+    if result.returncode != 0 and not rows:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+
+    # Top-level modules are the ones printed without indentation; their cumulative times add up
+    top_level = [row for row in rows if not row[2].startswith(" ")]
+    total_us = sum(row[0] for row in top_level)
+    return total_us, sorted(top_level, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarise the import time of server.py.")
+    parser.add_argument("--top", type=int, default=15, help="Number of modules to list.")
+    parser.add_argument("--module", default="server")
+    args = parser.parse_args()
+
+    total_us, slowest = importtime_summary(args.module, args.top)
+    print(f"Importing {args.module}: {total_us / 1000:.0f} ms")
+    for cumulative_us, self_us, name in slowest:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {name.strip()}")
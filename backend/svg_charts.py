@@ -0,0 +1,98 @@
+"""Dependency-free SVG versions of the sentiment bar chart and the client satisfaction gauge.
+
+Both charts are fixed templates with a little geometry, so building one takes microseconds and
+needs neither matplotlib nor plotly. The output is small enough to store inline in
+``meta_data_text``; ``data_uri`` turns a chart into an ``<img src>`` value.
+"""
+import math
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+FONT = "font-family=\"Helvetica, Arial, sans-serif\""
+
+# Same colours and positions as the plotly gauge in renderers.py
+GAUGE_CATEGORIES = {
+    "Very Bad": (1, "#ef4444"),
+    "Bad": (3, "#f59e42"),
+    "Neutral": (5, "#fbbf24"),
+    "Good": (7, "#a3e635"),
+    "Very Good": (9, "#22c55e")
+}
+GAUGE_STEPS = [(0, 2, "#ef4444"), (2, 4, "#f59e42"), (4, 6, "#fbbf24"), (6, 8, "#a3e635"), (8, 10, "#22c55e")]
+
+
+def _bar_color(score):
+    # Same thresholds as the matplotlib chart
+    return "#22c55e" if score > 6 else "#facc15" if score > 4 else "#ef4444"
+
+
+def sentiment_bar(score):
+    """Horizontal 0-10 bar for the sentiment score, as an SVG string."""
+    score = min(max(float(score), 0.0), 10.0)
+    width, height = 400, 150
+    left, right, top, bar_height = 80, 380, 45, 40
+    scale = (right - left) / 10
+
+    ticks = "".join(
+        f'<line x1="{left + i * scale:.1f}" y1="{top + bar_height}" x2="{left + i * scale:.1f}" y2="{top + bar_height + 5}" stroke="#333"/>'
+        f'<text x="{left + i * scale:.1f}" y="{top + bar_height + 18}" font-size="11" text-anchor="middle" {FONT}>{i}</text>'
+        for i in range(0, 11, 2)
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" role="img" aria-label="Sentiment score {score:.2f} out of 10">'
+        f'<rect width="{width}" height="{height}" fill="#fff"/>'
+        f'<text x="{(left + right) / 2}" y="25" font-size="14" text-anchor="middle" {FONT}>Sentiment Score</text>'
+        f'<rect x="{left}" y="{top}" width="{right - left}" height="{bar_height}" fill="none" stroke="#333"/>'
+        f'<rect x="{left}" y="{top + 4}" width="{score * scale:.1f}" height="{bar_height - 8}" fill="{_bar_color(score)}"/>'
+        f'<text x="{left - 8}" y="{top + bar_height / 2 + 4}" font-size="11" text-anchor="end" {FONT}>Sentiment</text>'
+        f'{ticks}'
+        f'<text x="{(left + right) / 2}" y="{height - 10}" font-size="12" text-anchor="middle" {FONT}>Score (0-10)</text>'
+        '</svg>'
+    )
+
+
+def _point(cx, cy, radius, value):
+    # 0 is on the left end of the half circle, 10 on the right
+    angle = math.pi * (1 - value / 10)
+    return cx + radius * math.cos(angle), cy - radius * math.sin(angle)
+
+
+def _arc(cx, cy, outer, inner, start, end, color):
+    x1, y1 = _point(cx, cy, outer, start)
+    x2, y2 = _point(cx, cy, outer, end)
+    x3, y3 = _point(cx, cy, inner, end)
+    x4, y4 = _point(cx, cy, inner, start)
+    return (
+        f'<path d="M{x1:.1f},{y1:.1f} A{outer},{outer} 0 0 1 {x2:.1f},{y2:.1f} '
+        f'L{x3:.1f},{y3:.1f} A{inner},{inner} 0 0 0 {x4:.1f},{y4:.1f} Z" fill="{color}"/>'
+    )
+
+
+def satisfaction_gauge(category):
+    """Half-circle gauge pointing at the satisfaction category, as an SVG string."""
+    value, color = GAUGE_CATEGORIES.get(category, GAUGE_CATEGORIES["Neutral"])
+    width, height = 420, 260
+    cx, cy, outer, inner = 210, 220, 150, 100
+
+    steps = "".join(_arc(cx, cy, outer, inner, start, end, step_color) for start, end, step_color in GAUGE_STEPS)
+    bar = _arc(cx, cy, outer - 18, inner + 18, 0, value, color)
+    tx1, ty1 = _point(cx, cy, inner - 6, value)
+    tx2, ty2 = _point(cx, cy, outer + 6, value)
+    labels = ""
+    for name, (tick, _) in GAUGE_CATEGORIES.items():
+        lx, ly = _point(cx, cy, outer + 22, tick)
+        labels += f'<text x="{lx:.1f}" y="{ly:.1f}" font-size="11" fill="#555" text-anchor="middle" {FONT}>{name}</text>'
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" role="img" aria-label="Client satisfaction: {escape(category)}">'
+        f'<text x="{cx}" y="28" font-size="20" text-anchor="middle" {FONT}>Client Satisfaction: <tspan font-weight="bold">{escape(category)}</tspan></text>'
+        f'{steps}{bar}'
+        f'<line x1="{tx1:.1f}" y1="{ty1:.1f}" x2="{tx2:.1f}" y2="{ty2:.1f}" stroke="#000" stroke-width="6"/>'
+        f'{labels}'
+        '</svg>'
+    )
+
+
+def data_uri(svg):
+    """``data:`` URI for using an SVG string as an ``<img src>``."""
+    return "data:image/svg+xml;charset=utf-8," + quote(svg)
@@ -0,0 +1,76 @@
+"""Fixtures for the backend tests: the Flask app on a throwaway SQLite database.
+
+DATABASE_URL must be set before ``db`` is imported, so it is set here at collection time.
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_db_file.close()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file.name}"
+sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import event  # noqa: E402
+
+import db  # noqa: E402
+from models import Base, User  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    import server
+    server.app.config["TESTING"] = True
+    yield server.app
+    db.engine.dispose()
+    os.unlink(_db_file.name)
+
+
+@pytest.fixture
+def db_session(app):
+    session_db = db.SessionLocal()
+    yield session_db
+    session_db.close()
+    # Empty every table between tests, children first
+    with db.engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(db_session):
+    def make(email="owner@example.com"):
+        user = User(first_name="Test", last_name="User", email=email, password_hash="x")
+        db_session.add(user)
+        db_session.commit()
+        return user.id
+    return make
+
+
+def login(client, user_id):
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+
+
+@contextmanager
+def count_statements():
+    """Collect the SQL statements executed inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
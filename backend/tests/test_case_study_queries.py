@@ -0,0 +1,68 @@
+"""/api/case_studies runs a fixed number of statements however many rows it returns."""
+import uuid
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from conftest import count_statements, login
+from models import CaseStudy, ClientInterview, Label, MediaJob, SolutionProviderInterview
+
+
+def seed_case_studies(db_session, user_id, count):
+    labels = [Label(name=f"label-{i}", user_id=user_id) for i in range(3)]
+    db_session.add_all(labels)
+    for i in range(count):
+        case_study = CaseStudy(user_id=user_id, title=f"Provider {i} x Client {i}: Project {i}", labels=labels[:2])
+        db_session.add(case_study)
+        db_session.flush()
+        db_session.add_all([
+            SolutionProviderInterview(case_study_id=case_study.id, session_id=str(uuid.uuid4()), summary="Provider"),
+            ClientInterview(case_study_id=case_study.id, session_id=str(uuid.uuid4()), summary="Client"),
+            MediaJob(case_study_id=case_study.id, provider="heygen", external_id=uuid.uuid4().hex, status="processing"),
+        ])
+    db_session.commit()
+
+
+def list_statements(client):
+    with count_statements() as statements:
+        response = client.get("/api/case_studies")
+    assert response.status_code == 200
+    return statements, response.get_json()["case_studies"]
+
+
+@pytest.mark.parametrize("count", [1, 40])
+def test_case_study_list_statement_count_is_constant(client, db_session, make_user, count):
+    baseline_user = make_user("baseline@example.com")
+    seed_case_studies(db_session, baseline_user, 1)
+    login(client, baseline_user)
+    baseline, _ = list_statements(client)
+
+    user_id = make_user()
+    seed_case_studies(db_session, user_id, count)
+    login(client, user_id)
+    statements, rows = list_statements(client)
+
+    assert len(rows) == count
+    assert all(row["labels"] and row["video_status"] == "processing" for row in rows)
+    assert len(statements) == len(baseline)
+
+
+def test_media_job_progress_changes_the_list_etag_without_touching_users(client, db_session, make_user):
+    user_id = make_user()
+    seed_case_studies(db_session, user_id, 2)
+    # SQLite's CURRENT_TIMESTAMP has one-second resolution
+    db_session.query(MediaJob).update({"updated_at": datetime.now(UTC) - timedelta(hours=1)})
+    db_session.commit()
+    login(client, user_id)
+    etag = client.get("/api/case_studies").headers["ETag"]
+
+    job = db_session.query(MediaJob).first()
+    with count_statements() as statements:
+        job.status = "completed"
+        job.url = "https://example.com/video.mp4"
+        db_session.commit()
+
+    assert not any(statement.lstrip().upper().startswith("UPDATE USERS") for statement in statements)
+    response = client.get("/api/case_studies", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
@@ -0,0 +1,63 @@
+"""The media status endpoints look a job up with one indexed query scoped to the user."""
+import pytest
+
+import db
+from conftest import count_statements, login
+from models import CaseStudy, MediaJob
+
+# endpoint -> provider
+STATUS_ENDPOINTS = {
+    "/api/video_status": "heygen",
+    "/api/pictory_video_status": "pictory",
+    "/api/podcast_status": "wondercraft",
+}
+
+
+def seed_media_jobs(db_session, user_id, count):
+    for i in range(count):
+        case_study = CaseStudy(user_id=user_id, title=f"Case study {i}")
+        db_session.add(case_study)
+        db_session.flush()
+        db_session.add_all(
+            MediaJob(case_study_id=case_study.id, provider=provider, external_id=f"{user_id}-{provider}-{i}",
+                     status="processing")
+            for provider in STATUS_ENDPOINTS.values()
+        )
+    db_session.commit()
+
+
+def query_plan(statement):
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", (None,) * statement.count("?"))
+        return " ".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("endpoint, provider", STATUS_ENDPOINTS.items())
+def test_status_lookup_is_one_indexed_query_scoped_to_the_user(client, db_session, make_user, endpoint, provider):
+    user_id = make_user()
+    other_user = make_user("other@example.com")
+    seed_media_jobs(db_session, user_id, 50)
+    seed_media_jobs(db_session, other_user, 50)
+    login(client, user_id)
+
+    with count_statements() as statements:
+        response = client.get(f"{endpoint}/{user_id}-{provider}-17")
+
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "processing"
+    assert len(statements) == 1
+    assert "case_studies.user_id = ?" in statements[0]
+    assert "USING INDEX ix_media_jobs_provider_external_id" in query_plan(statements[0])
+
+
+@pytest.mark.parametrize("endpoint, provider", STATUS_ENDPOINTS.items())
+def test_status_lookup_does_not_find_another_users_job(client, db_session, make_user, endpoint, provider):
+    user_id = make_user()
+    other_user = make_user("other@example.com")
+    seed_media_jobs(db_session, other_user, 3)
+    login(client, user_id)
+
+    response = client.get(f"{endpoint}/{other_user}-{provider}-1")
+
+    assert response.status_code == 404
+    assert response.get_json()["status"] == "not_found"
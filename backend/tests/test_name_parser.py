@@ -0,0 +1,50 @@
+"""Title parsing by the local name parser, before the cache and LLM tiers."""
+import name_parser
+
+# The default NAME_PARSER_MIN_CONFIDENCE in server.py
+PARSER_THRESHOLD = 0.8
+
+
+def test_markdown_title_is_parsed_confidently():
+    names, confidence = name_parser.parse_names("**Acme x Globex: Warehouse Automation**\n\nAcme built it.")
+
+    assert names == {"lead_entity": "Acme", "partner_entity": "Globex", "project_title": "Warehouse Automation"}
+    assert confidence >= PARSER_THRESHOLD
+
+
+def test_all_caps_title_keeps_acronyms_the_body_writes_in_capitals():
+    text = ("1. TITLE BLOCK\nAWS X NASA: DATA LAKE\n\nEXECUTIVE SUMMARY\n"
+            "AWS helped NASA consolidate mission telemetry into a single data lake.")
+
+    names, confidence = name_parser.parse_names(text)
+
+    assert names == {"lead_entity": "AWS", "partner_entity": "NASA", "project_title": "Data Lake"}
+    assert confidence >= PARSER_THRESHOLD
+
+
+def test_all_caps_title_uses_the_bodys_mixed_case_spelling():
+    text = "MCKINSEY X DATABRICKS: LAKEHOUSE MIGRATION\n\nMcKinsey moved Databricks' analytics to a lakehouse."
+
+    names, confidence = name_parser.parse_names(text)
+
+    assert names["lead_entity"] == "McKinsey"
+    assert names["partner_entity"] == "Databricks"
+    assert confidence >= PARSER_THRESHOLD
+
+
+def test_all_caps_title_with_guessed_casing_is_left_to_the_llm():
+    # NASA appears only in the title, so "Nasa" would be a guess
+    text = "AWS X NASA: DATA LAKE\n\nAmazon helped the agency consolidate its telemetry."
+
+    _, confidence = name_parser.parse_names(text)
+
+    assert confidence < PARSER_THRESHOLD
+
+
+def test_all_caps_section_headers_are_not_evidence_of_an_acronym():
+    text = "ACME ROBOTICS X GLOBEX: WAREHOUSE AUTOMATION\n\nABOUT ACME ROBOTICS\nGlobex runs warehouses."
+
+    names, confidence = name_parser.parse_names(text)
+
+    assert names["partner_entity"] == "Globex"
+    assert confidence < PARSER_THRESHOLD
@@ -0,0 +1,68 @@
+"""Starting a Pictory render: a rejected storyboard fails its job, an unavailable Pictory backs off."""
+from datetime import datetime, UTC
+
+import pytest
+import requests
+
+import reconciler
+from models import MediaJob
+
+
+class FakeSession:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+        response = requests.Response()
+        response.status_code = self.status_code
+        response._content = self.body.encode()
+        return response
+
+
+@pytest.fixture
+def pictory(app, monkeypatch):
+    import server
+
+    def respond(status_code, body="{}"):
+        session = FakeSession(status_code, body)
+        monkeypatch.setattr(reconciler, "get_session", lambda: session)
+        return session
+    return server, respond
+
+
+def storyboard_done_job():
+    return MediaJob(id=1, case_study_id=1, provider="pictory", external_id="storyboard-1", status="storyboard_done",
+                    created_at=datetime.now(UTC))
+
+
+def test_started_render_moves_the_job_to_rendering(pictory):
+    server, respond = pictory
+    session = respond(200, '{"data": {"jobId": "render-1"}}')
+
+    updates = server.pictory_start_render("token", storyboard_done_job())
+
+    assert updates["status"] == "rendering"
+    assert '"render_id": "render-1"' in updates["details"]
+    assert session.calls[0][2]["timeout"] == reconciler.VENDOR_TIMEOUT
+
+
+def test_rejected_storyboard_fails_the_job(pictory):
+    server, respond = pictory
+    respond(400, '{"message": "Invalid storyboard"}')
+
+    updates = server.pictory_start_render("token", storyboard_done_job())
+
+    assert updates["status"] == "failed"
+    assert "400" in updates["error"] and "Invalid storyboard" in updates["error"]
+
+
+@pytest.mark.parametrize("status_code", [401, 429, 503])
+def test_unavailable_pictory_raises_vendor_error(pictory, status_code):
+    server, respond = pictory
+    respond(status_code)
+
+    with pytest.raises(reconciler.VendorError):
+        server.pictory_start_render("token", storyboard_done_job())
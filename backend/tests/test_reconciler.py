@@ -0,0 +1,57 @@
+"""The media reconciler's choice of jobs to poll."""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, UTC
+
+import reconciler
+from models import CaseStudy, MediaJob
+
+HEYGEN = reconciler.Provider("heygen", ("pending", "processing"), poll=None)
+PICTORY = reconciler.Provider("pictory", ("storyboard_processing", "rendering"), poll=None)
+
+
+def seed_jobs(db_session, user_id, provider, status, count, age):
+    case_study = CaseStudy(user_id=user_id, title=f"{provider} case study")
+    db_session.add(case_study)
+    db_session.flush()
+    updated_at = datetime.now(UTC) - age
+    db_session.add_all(
+        MediaJob(case_study_id=case_study.id, provider=provider, external_id=f"{provider}-{i}", status=status,
+                 updated_at=updated_at)
+        for i in range(count)
+    )
+    db_session.commit()
+
+
+def test_a_vendor_backlog_does_not_starve_other_vendors(db_session, make_user):
+    user_id = make_user()
+    seed_jobs(db_session, user_id, "heygen", "processing", reconciler.RECONCILE_BATCH_SIZE * 3, timedelta(hours=1))
+    seed_jobs(db_session, user_id, "pictory", "rendering", 2, timedelta(minutes=1))
+
+    batch = reconciler.in_flight_batch(db_session, [HEYGEN, PICTORY])
+
+    providers = [job.provider for job, _ in batch]
+    assert providers.count("heygen") == reconciler.RECONCILE_BATCH_SIZE
+    assert providers.count("pictory") == 2
+    assert {found_user for _, found_user in batch} == {user_id}
+
+
+def test_batches_rotate_through_jobs_whose_polls_change_nothing(db_session, make_user, monkeypatch):
+    quiet = reconciler.Provider("quiet", ("processing",), poll=lambda job: {})
+    monkeypatch.setitem(reconciler._providers, "quiet", quiet)
+    monkeypatch.setattr(reconciler, "RECONCILE_BATCH_SIZE", 2)
+    user_id = make_user()
+    seed_jobs(db_session, user_id, "quiet", "processing", 5, timedelta(hours=1))
+    updated = {job.id: job.updated_at for job in db_session.query(MediaJob)}
+
+    polled = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        for _ in range(3):
+            polled.append({job.id for job, _ in reconciler.in_flight_batch(db_session, [quiet])})
+            reconciler.reconcile([quiet], executor)
+            db_session.expire_all()
+
+    assert [len(ids) for ids in polled] == [2, 2, 2]
+    assert set().union(*polled) == set(updated)
+    jobs = db_session.query(MediaJob).all()
+    assert all(job.last_polled_at for job in jobs if job.id in polled[0] | polled[1])
+    assert {job.id: job.updated_at for job in jobs} == updated
@@ -0,0 +1,109 @@
+"""Vendor OAuth access tokens shared by every process through the database.
+
+``get_token`` returns a cached token until it is within ``TOKEN_REFRESH_MARGIN`` seconds of
+expiring, then refreshes it ahead of time. Refreshes are single-flight: a lock per provider
+inside the process and, on Postgres, an advisory lock across the gunicorn workers and the job
+worker, so only one of them calls the token endpoint while the rest reuse its token. The
+database (not a file) is the shared store because the web and worker services do not share a
+disk.
+"""
+import os
+import threading
+import zlib
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy import text
+
+from db import SessionLocal
+from models import ApiToken
+
+TOKEN_REFRESH_MARGIN = int(os.getenv("TOKEN_REFRESH_MARGIN", "300"))  # seconds before expiry to refresh
+DEFAULT_TOKEN_LIFETIME = 3600  # seconds, when the token response has no expires_in
+# Base of the Postgres advisory lock keys, one per provider
+TOKEN_LOCK_BASE = 7264100
+
+_tokens = {}  # provider -> (access_token, expires_at)
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _aware(value):
+    # SQLite hands back naive datetimes
+    return value.replace(tzinfo=UTC) if value and value.tzinfo is None else value
+
+
+def _fresh(expires_at):
+    return expires_at is not None and expires_at - datetime.now(UTC) > timedelta(seconds=TOKEN_REFRESH_MARGIN)
+
+
+def _lock(provider):
+    with _locks_guard:
+        return _locks.setdefault(provider, threading.Lock())
+
+
+def get_token(provider, fetch):
+    """Return a valid access token for ``provider``, or None if none can be obtained.
+
+    ``fetch()`` performs the OAuth request and returns ``(access_token, expires_in)`` or None.
+    """
+    cached = _tokens.get(provider)
+    if cached and _fresh(cached[1]):
+        return cached[0]
+    with _lock(provider):
+        cached = _tokens.get(provider)
+        if cached and _fresh(cached[1]):
+            return cached[0]
+        token, expires_at = _load_or_refresh(provider, fetch)
+        if token:
+            _tokens[provider] = (token, expires_at)
+        return token
+
+
+def _load_or_refresh(provider, fetch):
+    """The stored token if it is still fresh, else a new one from ``fetch`` (stored for the others)."""
+    session_db = SessionLocal()
+    try:
+        if session_db.bind.dialect.name == "postgresql":
+            # Held until commit: the other processes wait here and then find the new token
+            session_db.execute(text("SELECT pg_advisory_xact_lock(:id)"),
+                               {"id": TOKEN_LOCK_BASE + zlib.crc32(provider.encode()) % 1000})
+        row = session_db.query(ApiToken).filter_by(provider=provider).first()
+        if row and _fresh(_aware(row.expires_at)):
+            return row.access_token, _aware(row.expires_at)
+
+        fetched = fetch()
+        if not fetched or not fetched[0]:
+            # Keep using a token that is inside the refresh margin but has not expired yet
+            if row and _aware(row.expires_at) > datetime.now(UTC):
+                return row.access_token, _aware(row.expires_at)
+            return None, None
+
+        access_token, expires_in = fetched
+        expires_at = datetime.now(UTC) + timedelta(seconds=expires_in or DEFAULT_TOKEN_LIFETIME)
+        if row is None:
+            row = ApiToken(provider=provider)
+            session_db.add(row)
+        row.access_token = access_token
+        row.expires_at = expires_at
+        session_db.commit()
+        print(f"🔑 Refreshed {provider} access token (valid until {expires_at:%H:%M:%S} UTC)")
+        return access_token, expires_at
+    except Exception:
+        session_db.rollback()
+        raise
+    finally:
+        session_db.close()
+
+
+def invalidate(provider):
+    """Forget the provider's token, e.g. after the vendor rejected it."""
+    _tokens.pop(provider, None)
+    session_db = SessionLocal()
+    try:
+        session_db.query(ApiToken).filter_by(provider=provider).delete(synchronize_session=False)
+        session_db.commit()
+    except Exception:
+        session_db.rollback()
+        raise
+    finally:
+        session_db.close()
@@ -0,0 +1,78 @@
+"""Background worker that runs queued generation jobs outside the gunicorn web workers.
+
+It also runs the media reconciler, which tracks HeyGen, Pictory and Wondercraft jobs until they
+finish (see reconciler.py).
+
+Usage:
+    cd backend && python worker.py [--concurrency N] [--poll-interval SECONDS] [--stage-processes N]
+                                   [--no-reconciler]
+"""
+import argparse
+import os
+import signal
+import socket
+import threading
+
+# The spawned stage processes import this file again (as __mp_main__), so the app modules are
+# imported in main(): those processes must not build the Flask app or migrate the database
+import stages
+
+
+def work_loop(run_next, worker_id, poll_interval, stop_event):
+    while not stop_event.is_set():
+        try:
+            if not run_next(worker_id):
+                stop_event.wait(poll_interval)
+        except Exception as e:
+            print(f"❌ {worker_id} could not poll the job queue: {str(e)}")
+            stop_event.wait(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued StoryAI generation jobs.")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("WORKER_CONCURRENCY", "2")),
+                        help="Jobs run in parallel by this process.")
+    parser.add_argument("--poll-interval", type=float, default=float(os.getenv("WORKER_POLL_INTERVAL", "2")),
+                        help="Seconds to wait when the queue is empty.")
+    parser.add_argument("--stage-processes", type=int, default=int(os.getenv("WORKER_STAGE_PROCESSES", "2")),
+                        help="Processes that render the CPU-bound post-processing stages (0: use threads).")
+    parser.add_argument("--no-reconciler", action="store_true",
+                        help="Do not poll the media vendors from this process.")
+    args = parser.parse_args()
+    stages.STAGE_PROCESSES = args.stage_processes
+
+    import jobs
+    import reconciler
+    import server  # noqa: F401  (registers the job handlers)
+
+    stop_event = threading.Event()
+
+    def shutdown(signum, frame):
+        print("🛑 Worker shutting down after the current jobs finish...")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    threads = []
+    for i in range(args.concurrency):
+        thread = threading.Thread(
+            target=work_loop,
+            args=(jobs.run_next, f"{prefix}:{i}", args.poll_interval, stop_event),
+            name=f"job-worker-{i}"
+        )
+        thread.start()
+        threads.append(thread)
+    if not args.no_reconciler:
+        thread = threading.Thread(target=reconciler.run, args=(stop_event,), name="media-reconciler")
+        thread.start()
+        threads.append(thread)
+
+    print(f"👷 Worker {prefix} started with concurrency {args.concurrency}")
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -325,6 +325,65 @@ function isFarewell(text) {
   );
 }
 
+// Read a Server-Sent Events response body, calling onEvent(event, data) for each message
+async function readEventStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = "message";
+      let data = "";
+      message.split("\n").forEach(line => {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      });
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
+// Stream the provider summary, showing text as it is written; resolves with the /generate_summary payload
+async function streamSummary(transcript) {
+  const response = await fetch("/generate_summary_stream", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ transcript })
+  });
+
+  if (!response.ok || !response.body) {
+    return await response.json();
+  }
+
+  const loadingText = document.getElementById('summaryLoadingText');
+  let preview = "";
+  let result = { status: "error", message: "Summary stream ended unexpectedly" };
+
+  await readEventStream(response, (event, data) => {
+    if (event === "token") {
+      preview += data.text;
+      if (loadingText) {
+        loadingText.style.whiteSpace = "pre-wrap";
+        loadingText.style.textAlign = "left";
+        loadingText.textContent = preview;
+      }
+    } else if (event === "done" || event === "error") {
+      result = data;
+    }
+  });
+
+  return result;
+}
+
 async function endConversation(reason) {
   if (hasEnded) return;
   hasEnded = true;
@@ -362,14 +421,8 @@ async function endConversation(reason) {
       .join("\n");
 
     try {
-      // 1. Generate summary first
-      const summaryResponse = await fetch(`/generate_summary?provider_session_id=${providerSessionId}`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ transcript: formattedTranscript })
-      });
-
-      const summaryData = await summaryResponse.json();
+      // 1. Generate summary first (streamed so text shows up as it is written)
+      const summaryData = await streamSummary(formattedTranscript);
       providerSessionId = summaryData.provider_session_id;
      
       // Store the case study ID for database operations
@@ -395,11 +448,13 @@ async function endConversation(reason) {
           const fullRes = await fetch("/generate_full_case_study", {
             method: "POST",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ case_study_id: summaryData.case_study_id })
+            body: JSON.stringify({ case_study_id: summaryData.case_study_id, async: true })
           });
 
           const fullResData = await fullRes.json();
-          if (fullResData.status === "success") {
+          if (fullResData.status === "queued") {
+            console.log("✅ Final story generation queued as job", fullResData.job_id);
+          } else if (fullResData.status === "success") {
             console.log("✅ Final story automatically generated for provider interview.");
           } else {
             console.warn("⚠️ Failed to generate final story:", fullResData.message);
@@ -1132,13 +1187,7 @@ function showCaseStudyControls() {
       .map(e => `${e.speaker.toUpperCase()}: ${e.text}`)
       .join("\n");
 
-    const response = await fetch("/generate_summary", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ transcript: formattedTranscript })
-    });
-
-    const data = await response.json();
+    const data = await streamSummary(formattedTranscript);
 
     if (data.status === "success") {
       // Store the case study ID for database operations
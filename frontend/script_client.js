@@ -173,11 +173,13 @@ async function endConversation(reason) {
     const fullRes = await fetch("/generate_full_case_study", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ case_study_id: summaryData.case_study_id })
+      body: JSON.stringify({ case_study_id: summaryData.case_study_id, async: true })
     });
 
     const fullResData = await fullRes.json();
-    if (fullResData.status === "success") {
+    if (fullResData.status === "queued") {
+      console.log("✅ Full merged case study queued as job", fullResData.job_id);
+    } else if (fullResData.status === "success") {
       console.log("✅ Full merged case study generated.");
     } else {
       console.warn("⚠️ Failed to generate full case study:", fullResData.message);